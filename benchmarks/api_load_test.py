@@ -0,0 +1,118 @@
+"""
+Load test for the search API.
+
+Sends `--requests` GET /search calls from `--concurrency` client threads
+(one keep-alive connection each) and reports throughput, p50/p90/p99
+latency, and the mean server-side queue/embed/search split taken from the
+Server-Timing header.
+
+Usage (with the API running, from the repository root):
+    python -m benchmarks.api_load_test --url http://localhost:8000 --requests 500 --concurrency 16
+"""
+import argparse
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from urllib.parse import urlencode, urlparse
+
+DEFAULT_QUERIES = [
+    "quarterly revenue growth", "cloud migration roadmap", "customer discovery interviews",
+    "release risk assessment", "product catalog integration", "agile delivery metrics",
+    "enterprise service design", "analytics platform budget"
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    timings = {}
+    for metric in (header or "").split(","):
+        name, _, duration = metric.strip().partition(";dur=")
+        if duration:
+            timings[name] = float(duration)
+    return timings
+
+
+class Client:
+    """One keep-alive HTTP connection per client thread."""
+
+    def __init__(self, url: str):
+        self.url = urlparse(url)
+        self.local = threading.local()
+
+    def get(self, path: str):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=60)
+            self.local.connection = connection
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader("Server-Timing")
+        except (http.client.HTTPException, OSError):
+            self.local.connection = None
+            connection.close()
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--query", action="append", help="query to send (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = args.query or DEFAULT_QUERIES
+    paths = [f"/search?{urlencode({'query': rng.choice(queries), 'limit': args.limit})}"
+             for _ in range(args.requests)]
+    client = Client(args.url)
+
+    def call(path):
+        start = time.perf_counter()
+        try:
+            status, server_timing = client.get(path)
+        except (http.client.HTTPException, OSError):
+            status, server_timing = None, None
+        return time.perf_counter() - start, status, parse_server_timing(server_timing)
+
+    # Warm the connections (and the server) before measuring
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(call, paths[:args.concurrency]))
+
+        start = time.perf_counter()
+        results = list(pool.map(call, paths))
+        wall = time.perf_counter() - start
+
+    latencies = [latency for latency, status, _ in results if status == 200]
+    errors = len(results) - len(latencies)
+    print(f"requests: {len(results)}  concurrency: {args.concurrency}  errors: {errors}")
+    if not latencies:
+        return
+
+    print(f"throughput: {len(results) / wall:.1f} req/s")
+    print("latency   : " + "  ".join(f"p{pct} {percentile(latencies, pct) * 1000:.1f}ms"
+                                    for pct in (50, 90, 99)))
+
+    server = {}
+    for _, status, timings in results:
+        for name, duration in timings.items():
+            server.setdefault(name, []).append(duration)
+    if server:
+        print("server    : " + "  ".join(f"{name} {sum(values) / len(values):.1f}ms"
+                                        for name, values in server.items()))
+
+
+if __name__ == "__main__":
+    main()
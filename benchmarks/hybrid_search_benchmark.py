@@ -0,0 +1,133 @@
+"""
+Latency and ranking-quality benchmark for HybridSearch.
+
+Runs HybridSearch against an in-process stand-in backend whose vector and
+BM25 legs each sleep for a configurable latency and rank a synthetic
+corpus by noisy views of known relevance. Compares the previous sequential
+legs + concatenation with concurrent legs + weighted reciprocal-rank
+fusion, reporting mean latency, nDCG@10 and recall@10.
+
+Usage (from the repository root):
+    python -m benchmarks.hybrid_search_benchmark --queries 50
+"""
+import argparse
+import math
+import random
+import time
+from typing import Any, Dict, List
+
+from src.search.hybrid_search import HybridSearch
+
+
+class FakeQueryProcessor:
+    def get_query_embedding(self, query: str) -> List[float]:
+        return [0.0]
+
+    def _apply_filters(self, results, filters):
+        return results
+
+
+class FakeBackend:
+    """Ranks documents by relevance plus independent per-leg noise."""
+
+    def __init__(self, relevance: Dict[str, Dict[str, int]], vector_latency: float,
+                 bm25_latency: float, noise: float = 1.0, seed: int = 0):
+        self.relevance = relevance
+        self.vector_latency = vector_latency
+        self.bm25_latency = bm25_latency
+        self.noise = noise
+        self.seed = seed
+        self.current_query = None
+
+    def _rank(self, leg: str, limit: int) -> List[Dict[str, Any]]:
+        rng = random.Random(f"{self.seed}:{leg}:{self.current_query}")
+        grades = self.relevance[self.current_query]
+        scored = [(grade + rng.gauss(0, self.noise), doc_id) for doc_id, grade in grades.items()]
+        scored.sort(reverse=True)
+        return [{"_additional": {"id": doc_id}, "content": doc_id} for _, doc_id in scored[:limit]]
+
+    def build_where_filter(self, filters):
+        return None, filters or {}
+
+    def search_by_vector(self, vector, limit: int = 10, where=None):
+        time.sleep(self.vector_latency)
+        return self._rank("vector", limit)
+
+    def search_bm25(self, query: str, limit: int = 10, where=None):
+        time.sleep(self.bm25_latency)
+        return self._rank("bm25", limit)
+
+
+def make_relevance(queries: int, corpus: int, relevant: int, seed: int = 0) -> Dict[str, Dict[str, int]]:
+    rng = random.Random(seed)
+    relevance = {}
+    for q in range(queries):
+        grades = {f"slide_{d}": 0 for d in range(corpus)}
+        for doc_id in rng.sample(sorted(grades), relevant):
+            grades[doc_id] = rng.choice([1, 2, 3])
+        relevance[f"query_{q}"] = grades
+    return relevance
+
+
+def ndcg_at_k(ranked: List[str], grades: Dict[str, int], k: int = 10) -> float:
+    dcg = sum((2 ** grades.get(doc_id, 0) - 1) / math.log2(i + 2) for i, doc_id in enumerate(ranked[:k]))
+    ideal = sorted(grades.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(i + 2) for i, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def recall_at_k(ranked: List[str], grades: Dict[str, int], k: int = 10) -> float:
+    relevant = {doc_id for doc_id, grade in grades.items() if grade > 0}
+    return len(relevant & set(ranked[:k])) / len(relevant) if relevant else 0.0
+
+
+def legacy_search(backend: FakeBackend, limit: int) -> List[Dict[str, Any]]:
+    """The previous implementation: sequential legs, concatenated and de-duplicated."""
+    vector_results = backend.search_by_vector(None, limit)
+    keyword_results = backend.search_bm25(backend.current_query, limit)
+    seen, combined = set(), []
+    for result in vector_results + keyword_results:
+        if result["_additional"]["id"] not in seen:
+            seen.add(result["_additional"]["id"])
+            combined.append(result)
+    return combined[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--corpus", type=int, default=2000)
+    parser.add_argument("--relevant", type=int, default=15)
+    parser.add_argument("--vector-latency", type=float, default=0.020)
+    parser.add_argument("--bm25-latency", type=float, default=0.015)
+    parser.add_argument("--overfetch", type=int, default=3)
+    args = parser.parse_args()
+
+    relevance = make_relevance(args.queries, args.corpus, args.relevant)
+    backend = FakeBackend(relevance, args.vector_latency, args.bm25_latency)
+    search = HybridSearch(overfetch=args.overfetch, native_hybrid=False,
+                          query_processor=FakeQueryProcessor(), vector_store=backend)
+
+    report = {}
+    for name, run in (("sequential+concat", lambda q: legacy_search(backend, 10)),
+                      ("concurrent+rrf", lambda q: search.search(q, limit=10))):
+        latency = ndcg = recall = 0.0
+        for query, grades in relevance.items():
+            backend.current_query = query
+            start = time.perf_counter()
+            results = run(query)
+            latency += time.perf_counter() - start
+            ranked = [r["_additional"]["id"] for r in results]
+            ndcg += ndcg_at_k(ranked, grades)
+            recall += recall_at_k(ranked, grades)
+        count = len(relevance)
+        report[name] = (latency / count, ndcg / count, recall / count)
+
+    print(f"queries: {args.queries}  vector {args.vector_latency * 1000:.0f}ms  "
+          f"bm25 {args.bm25_latency * 1000:.0f}ms  overfetch {args.overfetch}")
+    for name, (latency, ndcg, recall) in report.items():
+        print(f"{name:<18}: {latency * 1000:6.1f}ms  nDCG@10 {ndcg:.3f}  recall@10 {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark for the CPU inference backends of TextEmbedder and ImageEmbedder.
+
+Loads each embedder once per backend ("torch", "torch-int8", "onnx") with
+the embedding cache and query batching off, then reports load time
+(including the one-off ONNX export), single-input latency (p50/p99),
+batch throughput and the lowest cosine similarity to the torch backend's
+embeddings on the same inputs.
+
+Usage (from the repository root):
+    python -m benchmarks.inference_backend_benchmark --texts 256 --images 32 --threads 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_slides import make_image_slides
+from benchmarks.text_embedding_benchmark import make_texts
+from src.embedding.inference_backend import BACKENDS
+
+
+def write_config(base: dict, backend: str, threads: int, model_dir: str, path: str) -> str:
+    config = json.loads(json.dumps(base))
+    config['cache'] = {'enabled': False}
+    config['query_batching'] = {'enabled': False}
+    config['inference'] = {**config.get('inference', {}), 'backend': backend, 'threads': threads,
+                           'model_dir': model_dir, 'check_parity': False}
+    for section in ('text_embedding', 'image_embedding'):
+        config.get(section, {}).pop('backend', None)
+    with open(path, 'w') as f:
+        json.dump(config, f)
+    return path
+
+
+def measure(encode, inputs, singles, repeats):
+    encode(inputs[:4])  # warm up
+    latencies = []
+    for item in singles:
+        start = time.perf_counter()
+        encode([item])
+        latencies.append((time.perf_counter() - start) * 1000)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings = encode(inputs)
+        best = min(best, time.perf_counter() - start)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), len(inputs) / best, embeddings
+
+
+def min_cosine(reference: np.ndarray, embeddings: np.ndarray) -> float:
+    cosine = np.sum(reference * embeddings, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(embeddings, axis=1) + 1e-12)
+    return float(cosine.min())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default="config/embedding_config.json")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--images", type=int, default=32, help="0 skips the image embedder")
+    parser.add_argument("--singles", type=int, default=50, help="single-input calls for the latency percentiles")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0 = library default)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--model-dir", default="data/models", help="where ONNX exports are written and reused")
+    args = parser.parse_args()
+
+    from src.embedding.image_embedder import ImageEmbedder
+    from src.embedding.text_embedder import TextEmbedder
+
+    with open(args.config) as f:
+        base = json.load(f)
+
+    rng = random.Random(1)
+    texts = make_texts(args.texts)
+    queries = [" ".join(text.split()[:rng.randint(2, 6)]) for text in texts[:args.singles]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = [path for path, _ in make_image_slides(os.path.join(tmp, "slides"), args.images)]
+        embedders = [("text", TextEmbedder, texts, queries)]
+        if images:
+            embedders.append(("image", ImageEmbedder, images, images[:min(args.singles, len(images))]))
+
+        print(f"threads: {args.threads or 'default'}  texts: {len(texts)}  images: {len(images)}")
+        for kind, embedder_class, inputs, singles in embedders:
+            reference = None
+            print(f"\n{kind:<6} {'backend':<11} {'load s':>7} {'p50 ms':>8} {'p99 ms':>8} {'items/s':>9} {'min cos':>8}")
+            for backend in args.backends:
+                config_path = write_config(base, backend, args.threads, args.model_dir,
+                                           os.path.join(tmp, f"{backend}.json"))
+                start = time.perf_counter()
+                embedder = embedder_class(config_path)
+                load = time.perf_counter() - start
+
+                p50, p99, throughput, embeddings = measure(embedder._encode_uncached, inputs, singles, args.repeats)
+                if backend == "torch" or reference is None:
+                    reference = embeddings
+                print(f"{'':<6} {backend:<11} {load:>7.1f} {p50:>8.2f} {p99:>8.2f} {throughput:>9.1f} "
+                      f"{min_cosine(reference, embeddings):>8.4f}")
+                del embedder
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Minimal local stand-in for the OpenAI chat-completions API used by the benchmarks.
+
+It answers `POST /v1/chat/completions` after a fixed delay, approximating
+a model round trip. Prompts with numbered items ("[1]", "[2]", ...) get a
+JSON array with one deterministic answer per item, shaped like the one
+the prompt asks for; other prompts get a short topic line. Point an
+`openai.OpenAI(base_url=stub.url, api_key="stub")` client at it.
+"""
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+
+_ITEM = re.compile(r"^\[(\d+)\]\n(.*?)(?=^\[\d+\]\n|\Z)", re.S | re.M)
+_WORD = re.compile(r"[A-Za-z]{4,}")
+
+
+def _topic(text: str) -> str:
+    words = _WORD.findall(text.lower())
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    top = sorted(counts, key=lambda word: (-counts[word], word))[:2]
+    return " ".join(top).title() or "General"
+
+
+def answer(prompt: str) -> str:
+    items = [text for _, text in _ITEM.findall(prompt)]
+    if not items:
+        return _topic(prompt)
+
+    answers: List[Any] = []
+    for text in items:
+        if "[topic, confidence]" in prompt:
+            words = sorted(set(_WORD.findall(text.lower())))[:3]
+            answers.append([[word.title(), 0.9 - 0.1 * rank] for rank, word in enumerate(words)])
+        else:
+            answers.append(_topic(text))
+    return json.dumps(answers)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Avoid Nagle/delayed-ACK stalls between header and body writes
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any = None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+
+        self.server.count_request()
+        prompt = body["messages"][-1]["content"]
+        self._send(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": answer(prompt)}
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 16, "total_tokens": len(prompt) // 4 + 16}
+        })
+
+
+class CompletionStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.3):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.requests = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def start(self) -> "CompletionStub":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,129 @@
+"""
+Benchmark for the embedded LocalVectorIndex.
+
+Builds an index over synthetic clustered slide embeddings with slide-like
+text, then reports build time, vector search latency and recall@10 against
+exact search (with and without filters), BM25 latency, and save/load time.
+
+Usage (from the repository root):
+    python -m benchmarks.local_index_benchmark --slides 200000
+    python -m benchmarks.local_index_benchmark --slides 1000000 --nprobe 24
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from src.storage.local_index import LocalVectorIndex
+
+WORDS = (
+    "revenue growth strategy customer platform roadmap delivery cloud migration "
+    "quarter pipeline value stream agile release risk budget product catalog "
+    "enterprise service design discovery backlog integration analytics"
+).split()
+TOPICS = ["strategy", "finance", "engineering", "sales", "operations", "design", "hiring", "security"]
+
+
+def make_corpus(count: int, dimensions: int, clusters: int, seed: int = 0):
+    """Clustered unit vectors (one cluster per theme) and matching slide dicts."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimensions)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    vectors = centers[labels] + rng.normal(scale=0.6, size=(count, dimensions)).astype(np.float32)
+
+    words = random.Random(seed)
+    slides = []
+    for i in range(count):
+        slides.append({
+            "slide_number": i % 30 + 1,
+            "text_content": " ".join(words.choice(WORDS) for _ in range(words.randint(5, 40))),
+            "presentation_id": f"deck_{i // 30}",
+            "topics": [TOPICS[labels[i] % len(TOPICS)]]
+        })
+    return vectors, slides, centers
+
+
+def timed_queries(run, queries):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(run(query))
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=200000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    vectors, slides, centers = make_corpus(args.slides, args.dimensions, args.clusters)
+    index = LocalVectorIndex(nprobe=args.nprobe)
+
+    start = time.perf_counter()
+    chunk = 10000
+    for offset in range(0, args.slides, chunk):
+        index.store_slides(zip(slides[offset:offset + chunk], vectors[offset:offset + chunk]), batch_size=chunk)
+    build = time.perf_counter() - start
+    lists = len(index._ivf[0]) if index._ivf is not None else 0
+    print(f"slides: {args.slides}  dims: {args.dimensions}  build {build:.1f}s  "
+          f"IVF lists {lists}  nprobe {args.nprobe}")
+
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, args.slides, args.queries)
+    queries = vectors[picks] + rng.normal(scale=0.6, size=(args.queries, args.dimensions)).astype(np.float32)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def recall(results, query_vectors, mask=None):
+        hits = total = 0
+        for result, query in zip(results, query_vectors):
+            scores = normalized @ (query / np.linalg.norm(query))
+            if mask is not None:
+                scores = np.where(mask, scores, -np.inf)
+            exact = set(np.argsort(-scores)[:10])
+            got = {index._rows[r["_additional"]["id"]] for r in result}
+            hits += len(exact & got)
+            total += min(10, len(exact))
+        return hits / total
+
+    results, p50, p99 = timed_queries(lambda q: index.search_by_vector(q, 10), queries)
+    print(f"vector            : p50 {p50:6.2f}ms  p99 {p99:6.2f}ms  recall@10 {recall(results, queries):.3f}")
+
+    topic = TOPICS[0]
+    where = {"topics": [topic], "slideNumber": {"lte": 10}}
+    mask = np.array([s["topics"][0] == topic and s["slide_number"] <= 10 for s in slides])
+    results, p50, p99 = timed_queries(lambda q: index.search_by_vector(q, 10, where=where), queries[:50])
+    print(f"vector + filter   : p50 {p50:6.2f}ms  p99 {p99:6.2f}ms  recall@10 "
+          f"{recall(results, queries[:50], mask):.3f}  ({mask.mean() * 100:.0f}% of slides match)")
+
+    deck = {"presentationId": slides[picks[0]]["presentation_id"]}
+    _, p50, p99 = timed_queries(lambda q: index.search_by_vector(q, 10, where=deck), queries[:50])
+    print(f"vector + deck     : p50 {p50:6.2f}ms  p99 {p99:6.2f}ms")
+
+    texts = [" ".join(random.Random(i).sample(WORDS, 3)) for i in range(args.queries)]
+    _, p50, p99 = timed_queries(lambda q: index.search_bm25(q, 10), texts)
+    print(f"bm25              : p50 {p50:6.2f}ms  p99 {p99:6.2f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        start = time.perf_counter()
+        index.save(path)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        LocalVectorIndex(path=path)
+        load = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    print(f"persist           : save {save:.1f}s  load {load:.1f}s  {size / 2 ** 20:.0f} MiB on disk")
+
+
+if __name__ == "__main__":
+    main()
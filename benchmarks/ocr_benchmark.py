@@ -0,0 +1,72 @@
+"""
+OCR benchmark on synthetic image-only slides.
+
+Compares the previous two-pass OCR (image_to_string + image_to_data), the
+single-pass `OCRProcessor.process_image`, and the pooled
+`OCRProcessor.process_images` batch API.
+
+Usage (from the repository root):
+    python -m benchmarks.ocr_benchmark --slides 24
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import pytesseract
+from PIL import Image
+
+from benchmarks.ocr_preprocessing_benchmark import legacy_preprocess
+from benchmarks.synthetic_slides import make_image_slides, word_accuracy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ingestion"))
+from ocr_fallback import OCRProcessor  # noqa: E402
+
+
+def legacy_process_image(ocr: OCRProcessor, image_path: str) -> str:
+    """The previous implementation: fixed preprocessing and two full Tesseract passes per image."""
+    pil_image = Image.fromarray(legacy_preprocess(cv2.imread(image_path)))
+    lang = '+'.join(ocr.config['languages'])
+    text = pytesseract.image_to_string(pil_image, config=ocr.tesseract_config, lang=lang)
+    pytesseract.image_to_data(pil_image, config=ocr.tesseract_config, lang=lang,
+                              output_type=pytesseract.Output.DICT)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    ocr = OCRProcessor()
+    with tempfile.TemporaryDirectory() as tmp:
+        slides = make_image_slides(tmp, args.slides, size=(960, 540))
+        paths = [path for path, _ in slides]
+
+        start = time.perf_counter()
+        legacy_texts = [legacy_process_image(ocr, path) for path in paths]
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single_texts = [ocr.process_image(path)['text'] for path in paths]
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_texts = [result['text'] for result in ocr.process_images(paths, workers=args.workers)]
+        batch = time.perf_counter() - start
+
+    def accuracy(texts):
+        return sum(word_accuracy(truth, text) for (_, truth), text in zip(slides, texts)) / len(slides)
+
+    print(f"slides: {len(paths)}  workers: {args.workers}")
+    print(f"two-pass      : {legacy:.2f}s  ({len(paths) / legacy:.2f} slides/s)  accuracy {accuracy(legacy_texts):.3f}")
+    print(f"single-pass   : {single:.2f}s  ({len(paths) / single:.2f} slides/s)  accuracy {accuracy(single_texts):.3f}")
+    print(f"process_images: {batch:.2f}s  ({len(paths) / batch:.2f} slides/s)  accuracy {accuracy(batch_texts):.3f}")
+    print(f"speedup       : {legacy / single:.2f}x single-pass, {legacy / batch:.2f}x pooled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark for OCR preprocessing on synthetic slides.
+
+Times the previous fixed pipeline (2x upscale, color NL-means denoising,
+Otsu threshold) against the adaptive `OCRProcessor._preprocess_image`, on
+clean and noisy fixtures rendered at 2x, and checks that each default
+noise level takes the intended denoising branch. When Tesseract is
+installed it also checks that OCR word accuracy does not regress.
+
+Usage (from the repository root):
+    python -m benchmarks.ocr_preprocessing_benchmark --slides 6
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic_slides import make_image_slides, word_accuracy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ingestion"))
+from ocr_fallback import OCRProcessor  # noqa: E402
+
+# Denoiser each default fixture should get: none when clean, the median
+# filter for mild noise and NL-means for heavy noise
+EXPECTED_DENOISE = {0.0: None, 8.0: 'median', 25.0: 'nlmeans'}
+
+
+def legacy_preprocess(image: np.ndarray) -> np.ndarray:
+    """The previous implementation of OCRProcessor._preprocess_image."""
+    image = cv2.resize(image, None, fx=2, fy=2)
+    image = cv2.fastNlMeansDenoisingColored(image)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
+
+def ocr_text(ocr: OCRProcessor, image: np.ndarray) -> str:
+    import pytesseract
+    from PIL import Image
+    return pytesseract.image_to_string(Image.fromarray(image), config=ocr.tesseract_config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=6, help="slides per noise level")
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.0, 8.0, 25.0])
+    args = parser.parse_args()
+
+    ocr = OCRProcessor()
+    check_accuracy = shutil.which("tesseract") is not None
+    if not check_accuracy:
+        print("tesseract not found: reporting preprocessing time only")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for noise in args.noise:
+            slides = make_image_slides(os.path.join(tmp, f"noise_{noise}"), args.slides,
+                                       noise=noise, size=(1920, 1080))
+            legacy_time = adaptive_time = 0.0
+            legacy_acc = adaptive_acc = 0.0
+            step_totals = {}
+
+            for path, truth in slides:
+                color = cv2.imread(path)
+                start = time.perf_counter()
+                legacy_image = legacy_preprocess(color)
+                legacy_time += time.perf_counter() - start
+
+                timings = {}
+                start = time.perf_counter()
+                adaptive_image = ocr._preprocess_image(cv2.imread(path, cv2.IMREAD_GRAYSCALE), timings)
+                adaptive_time += time.perf_counter() - start
+                if noise in EXPECTED_DENOISE:
+                    method = ocr._denoise_method(timings['noise_sigma'])
+                    assert method == EXPECTED_DENOISE[noise], (
+                        f"noise {noise}: estimated sigma {timings['noise_sigma']:.2f} "
+                        f"picks {method}, expected {EXPECTED_DENOISE[noise]}")
+                for step in ('grayscale', 'estimate', 'denoise', 'resize', 'threshold'):
+                    step_totals[step] = step_totals.get(step, 0.0) + timings.get(step, 0.0)
+
+                if check_accuracy:
+                    legacy_acc += word_accuracy(truth, ocr_text(ocr, legacy_image))
+                    adaptive_acc += word_accuracy(truth, ocr_text(ocr, adaptive_image))
+
+            count = len(slides)
+            line = (f"noise {noise:>5.1f}: legacy {legacy_time / count:.3f}s/slide, "
+                    f"adaptive {adaptive_time / count:.3f}s/slide ({legacy_time / adaptive_time:.1f}x)")
+            if check_accuracy:
+                line += f", accuracy legacy {legacy_acc / count:.3f} adaptive {adaptive_acc / count:.3f}"
+            print(line)
+            print("    steps: " + ", ".join(f"{step} {total / count * 1000:.1f}ms"
+                                           for step, total in step_totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""
+End-to-end benchmark suite for ingestion and search.
+
+Generates a synthetic corpus of PPTX and PDF decks (text-only, image-heavy
+and scanned slides; see `make_corpus` in benchmarks/synthetic_slides.py)
+and times every stage on it:
+
+    parse.pptx, parse.pdf      PPTXParser / PDFParser
+    render.pptx, render.pdf    SlideRenderer thumbnails (PPTX needs LibreOffice)
+    ocr                        OCRProcessor on the scanned slides (needs Tesseract)
+    dedup                      SlideDeduplicator fingerprint, lookup and insert
+    ingest                     DocumentIngestionPipeline.iter_document, all stages together
+    embed.text, embed.image    TextEmbedder / ImageEmbedder with the embedding cache off
+    store                      LocalVectorIndex.store_slides
+    search.vector, search.bm25, search.hybrid, search.filtered, search.related
+                               per-query latency
+
+Search runs against LocalVectorIndex, the in-process vector store, so no
+Weaviate server is needed. Stages whose tools are missing are recorded as
+skipped and the rest still run. Every stage reports `ms_per_item` (per
+slide, or per query for search); search stages add p50/p95 latency.
+
+Results are printed and, with `--output`, written as JSON. `--compare`
+checks the results against a baseline results file and exits with status
+1 if any stage got slower than `--tolerance` allows.
+
+Usage (from the repository root):
+    python -m benchmarks.pipeline_benchmark --decks 8 --slides 12 --output baseline.json
+    python -m benchmarks.pipeline_benchmark --decks 8 --slides 12 --compare baseline.json
+    python -m benchmarks.pipeline_benchmark --results new.json --compare baseline.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic_slides import SLIDE_KINDS, make_corpus, word_accuracy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ingestion"))
+from ingestion_main import DocumentIngestionPipeline  # noqa: E402
+from ocr_fallback import OCRProcessor  # noqa: E402
+from pdf_parser import PDFParser  # noqa: E402
+from pptx_parser import PPTXParser  # noqa: E402
+from slide_dedup import SlideDeduplicator  # noqa: E402
+from slide_renderer import SlideRenderer  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Metrics compared against a baseline; all are "lower is better"
+COMPARED_METRICS = ("ms_per_item", "p95_ms")
+
+
+class SkipStage(Exception):
+    """A stage cannot run in this environment (missing tool or input)."""
+
+
+def throughput(seconds: float, items: int, **extra) -> Dict[str, Any]:
+    return {"seconds": seconds, "items": items, "ms_per_item": 1000 * seconds / max(items, 1),
+            "items_per_s": items / seconds if seconds else 0.0, **extra}
+
+
+def latency(samples_ms: List[float], **extra) -> Dict[str, Any]:
+    return {"items": len(samples_ms), "ms_per_item": float(np.mean(samples_ms)),
+            "p50_ms": float(np.percentile(samples_ms, 50)), "p95_ms": float(np.percentile(samples_ms, 95)), **extra}
+
+
+def time_calls(calls: List[Callable[[], Any]], warmup: int = 3) -> List[float]:
+    for call in calls[:warmup]:
+        call()
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+class PipelineSuite:
+    """Runs the stages in order; later stages reuse what earlier ones produced."""
+
+    def __init__(self, workdir: str, corpus: List[Dict[str, Any]], config_path: str, queries: int, seed: int = 0):
+        self.workdir = workdir
+        self.corpus = corpus
+        self.config_path = config_path
+        self.queries = queries
+        self.rng = random.Random(seed)
+        self.results = {}
+
+        self.parsed = {}        # deck path -> parsed slide dicts
+        self.thumbnails = {}    # (deck path, slide number) -> image path
+        self.slides = []        # (deck, slide number, text) for embedding and search
+        self.embeddings = None
+        self.store = None
+        self.text_embedder = None
+
+    def run(self, stages: List[str]) -> Dict[str, Any]:
+        for name in stages:
+            method = getattr(self, "stage_" + name.replace(".", "_"))
+            logger.info("Running %s", name)
+            try:
+                self.results[name] = method()
+            except SkipStage as e:
+                self.results[name] = {"skipped": str(e)}
+            except Exception as e:
+                logger.exception("Stage %s failed", name)
+                self.results[name] = {"error": f"{type(e).__name__}: {e}"}
+        return self.results
+
+    def _decks(self, fmt: str) -> List[Dict[str, Any]]:
+        return [deck for deck in self.corpus if deck["format"] == fmt]
+
+    def _parse(self, fmt: str, parser) -> Dict[str, Any]:
+        decks = self._decks(fmt)
+        if not decks:
+            raise SkipStage(f"no {fmt} decks")
+        start = time.perf_counter()
+        for deck in decks:
+            self.parsed[deck["path"]] = parser.parse(deck["path"])
+        return throughput(time.perf_counter() - start, sum(len(self.parsed[deck["path"]]) for deck in decks),
+                          decks=len(decks))
+
+    def stage_parse_pptx(self):
+        return self._parse("pptx", PPTXParser())
+
+    def stage_parse_pdf(self):
+        return self._parse("pdf", PDFParser())
+
+    def _render(self, fmt: str) -> Dict[str, Any]:
+        decks = self._decks(fmt)
+        if not decks:
+            raise SkipStage(f"no {fmt} decks")
+        if fmt == "pptx" and not (shutil.which("soffice") or shutil.which("libreoffice")):
+            raise SkipStage("LibreOffice (soffice) not found")
+
+        renderer = SlideRenderer(os.path.join(self.workdir, "rendered"))
+        start = time.perf_counter()
+        for deck in decks:
+            pdf_path = renderer.prepare_source(deck["path"])
+            try:
+                for number, path in renderer.render_document(pdf_path, deck["path"]).items():
+                    self.thumbnails[(deck["path"], number)] = path
+            finally:
+                renderer.release_source(deck["path"], pdf_path)
+        return throughput(time.perf_counter() - start, sum(len(deck["kinds"]) for deck in decks), decks=len(decks))
+
+    def stage_render_pptx(self):
+        return self._render("pptx")
+
+    def stage_render_pdf(self):
+        return self._render("pdf")
+
+    def stage_ocr(self):
+        if not shutil.which("tesseract"):
+            raise SkipStage("tesseract not found")
+        renderer = SlideRenderer(os.path.join(self.workdir, "rendered"))
+        pages, truths = [], []
+        for deck in self.corpus:
+            scanned = [index + 1 for index, kind in enumerate(deck["kinds"]) if kind == "scanned"]
+            if not scanned or (deck["format"] == "pptx" and not (shutil.which("soffice") or shutil.which("libreoffice"))):
+                continue
+            pdf_path = renderer.prepare_source(deck["path"])
+            try:
+                rendered = renderer.render_document(pdf_path, deck["path"], scanned, purpose='ocr')
+            finally:
+                renderer.release_source(deck["path"], pdf_path)
+            pages += [rendered[number] for number in scanned]
+            truths += [deck["texts"][number - 1] for number in scanned]
+        if not pages:
+            raise SkipStage("no scanned slides could be rendered")
+
+        start = time.perf_counter()
+        texts = [result['text'] for result in OCRProcessor().process_images(pages)]
+        seconds = time.perf_counter() - start
+        accuracy = sum(word_accuracy(truth, text) for truth, text in zip(truths, texts)) / len(texts)
+        return throughput(seconds, len(pages), word_accuracy=accuracy)
+
+    def stage_dedup(self):
+        if not self.thumbnails:
+            raise SkipStage("no rendered thumbnails")
+        deduplicator = SlideDeduplicator(os.path.join(self.workdir, "fingerprints.sqlite"))
+        texts = {deck["path"]: deck["texts"] for deck in self.corpus}
+        try:
+            start = time.perf_counter()
+            duplicates = 0
+            for (path, number), image in sorted(self.thumbnails.items()):
+                fingerprint = deduplicator.fingerprint(image, texts[path][number - 1])
+                canonical = deduplicator.find(fingerprint, os.path.basename(path), number)
+                if canonical is None:
+                    deduplicator.add(os.path.basename(path), number, fingerprint,
+                                     {'content': texts[path][number - 1], 'topics': []})
+                else:
+                    duplicates += 1
+            return throughput(time.perf_counter() - start, len(self.thumbnails), duplicates=duplicates)
+        finally:
+            deduplicator.close()
+
+    def stage_ingest(self):
+        decks = self.corpus
+        if any(kind == "scanned" for deck in decks for kind in deck["kinds"]) and not shutil.which("tesseract"):
+            raise SkipStage("tesseract not found (scanned slides need OCR)")
+        if not (shutil.which("soffice") or shutil.which("libreoffice")):
+            decks = self._decks("pdf")
+            if not decks:
+                raise SkipStage("LibreOffice (soffice) not found and no PDF decks")
+
+        upload_dir = os.path.join(self.workdir, "upload")
+        pipeline = DocumentIngestionPipeline(upload_dir, os.path.join(self.workdir, "processed"))
+        start = time.perf_counter()
+        slides = sum(1 for deck in decks for _ in pipeline.iter_document(deck["path"]))
+        return throughput(time.perf_counter() - start, slides, decks=len(decks))
+
+    def _slide_texts(self) -> List[str]:
+        """Parsed text, with the ground truth standing in for OCR on scanned slides."""
+        if not self.slides:
+            for deck in self.corpus:
+                parsed = self.parsed.get(deck["path"], [])
+                for index, truth in enumerate(deck["texts"]):
+                    text = parsed[index].get('text_content', '') if index < len(parsed) else ''
+                    self.slides.append((deck, index + 1, text.strip() or truth))
+        return [text for _, _, text in self.slides]
+
+    def stage_embed_text(self):
+        from src.embedding.text_embedder import TextEmbedder
+        texts = self._slide_texts()
+        self.text_embedder = TextEmbedder(self.config_path)
+        self.text_embedder._encode_uncached(texts[:4])  # warm up
+        start = time.perf_counter()
+        self.embeddings = self.text_embedder._encode_uncached(texts)
+        return throughput(time.perf_counter() - start, len(texts))
+
+    def stage_embed_image(self):
+        if not self.thumbnails:
+            raise SkipStage("no rendered thumbnails")
+        from src.embedding.image_embedder import ImageEmbedder
+        images = [path for _, path in sorted(self.thumbnails.items())]
+        embedder = ImageEmbedder(self.config_path)
+        embedder._encode_uncached(images[:2])  # warm up
+        start = time.perf_counter()
+        embedder._encode_uncached(images)
+        return throughput(time.perf_counter() - start, len(images))
+
+    def stage_store(self):
+        if self.embeddings is None:
+            raise SkipStage("embed.text did not run")
+        from src.storage.local_index import LocalVectorIndex
+        self.store = LocalVectorIndex()
+        records = [({
+            'slide_number': number,
+            'text_content': text,
+            'presentation_id': os.path.basename(deck["path"]),
+            'image_url': self.thumbnails.get((deck["path"], number), ''),
+            'topics': []
+        }, embedding.tolist()) for (deck, number, text), embedding in zip(self.slides, self.embeddings)]
+        start = time.perf_counter()
+        result = self.store.store_slides(records)
+        seconds = time.perf_counter() - start
+        if result['failed']:
+            raise RuntimeError(f"{len(result['failed'])} slides failed to store")
+        return throughput(seconds, result['stored'])
+
+    def _queries(self) -> List[str]:
+        queries = []
+        for _ in range(self.queries):
+            words = self.rng.choice(self.slides)[2].split()
+            start = self.rng.randrange(max(1, len(words) - 3))
+            queries.append(" ".join(words[start:start + self.rng.randint(1, 3)]))
+        return queries
+
+    def _require_store(self):
+        if self.store is None:
+            raise SkipStage("store did not run")
+
+    def stage_search_vector(self):
+        self._require_store()
+        vectors = [self.text_embedder._encode_uncached([query])[0].tolist() for query in self._queries()]
+        return latency(time_calls([lambda v=vector: self.store.search_by_vector(v, 10) for vector in vectors]))
+
+    def stage_search_bm25(self):
+        self._require_store()
+        return latency(time_calls([lambda q=query: self.store.search_bm25(q, 10) for query in self._queries()]))
+
+    def _hybrid(self, filtered: bool):
+        self._require_store()
+        from src.search.hybrid_search import HybridSearch
+        from src.search.query_processor import QueryProcessor
+        search = HybridSearch(query_processor=QueryProcessor(text_embedder=self.text_embedder,
+                                                             vector_store=self.store))
+        presentations = sorted({os.path.basename(deck["path"]) for deck, _, _ in self.slides})
+        calls = []
+        for query in self._queries():
+            filters = {"presentationId": self.rng.choice(presentations)} if filtered else None
+            calls.append(lambda q=query, f=filters: search.search(q, filters=f))
+        return latency(time_calls(calls))
+
+    def stage_search_hybrid(self):
+        return self._hybrid(filtered=False)
+
+    def stage_search_filtered(self):
+        return self._hybrid(filtered=True)
+
+    def stage_search_related(self):
+        self._require_store()
+        from src.search.related_slides import RelatedSlidesGraph
+        graph = RelatedSlidesGraph(k=10)
+        start = time.perf_counter()
+        graph.sync(self.store)
+        build = time.perf_counter() - start
+        ids = list(graph._rows)
+        calls = [lambda s=self.rng.choice(ids): graph.related(s, exclude_same_presentation=True)
+                 for _ in range(self.queries)]
+        return latency(time_calls(calls), build_seconds=build)
+
+
+STAGES = ["parse.pptx", "parse.pdf", "render.pptx", "render.pdf", "ocr", "dedup", "ingest",
+          "embed.text", "embed.image", "store", "search.vector", "search.bm25", "search.hybrid",
+          "search.filtered", "search.related"]
+
+
+def write_config(base_path: str, path: str) -> str:
+    with open(base_path) as f:
+        config = json.load(f)
+    config['cache'] = {'enabled': False}
+    config['query_batching'] = {'enabled': False}
+    with open(path, 'w') as f:
+        json.dump(config, f)
+    return path
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            min_ms: float) -> List[Dict[str, Any]]:
+    """
+    One row per stage and metric present in both runs. A metric regresses
+    when it is more than `tolerance` (a fraction) slower than the baseline
+    and the difference exceeds `min_ms`, which keeps tiny timings from
+    flagging on noise.
+    """
+    rows = []
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or "skipped" in current or "error" in current or "skipped" in previous or "error" in previous:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in current or metric not in previous:
+                continue
+            change = current[metric] / previous[metric] - 1 if previous[metric] else 0.0
+            regressed = change > tolerance and current[metric] - previous[metric] > min_ms
+            rows.append({"stage": stage, "metric": metric, "baseline": previous[metric],
+                         "current": current[metric], "change": change, "regressed": regressed})
+    return rows
+
+
+def print_results(results: Dict[str, Any]):
+    corpus = results["corpus"]
+    print(f"decks: {corpus['decks']}  slides: {corpus['slides']}  kinds: {corpus['kinds']}")
+    print(f"{'stage':<16} {'items':>6} {'ms/item':>9} {'items/s':>9} {'p95 ms':>8}  notes")
+    for stage, result in results["stages"].items():
+        if "skipped" in result or "error" in result:
+            print(f"{stage:<16} {'-':>6} {'-':>9} {'-':>9} {'-':>8}  {result.get('skipped') or result['error']}")
+            continue
+        notes = ", ".join(f"{key} {value:.3g}" if isinstance(value, float) else f"{key} {value}"
+                          for key, value in result.items()
+                          if key not in ("seconds", "items", "ms_per_item", "items_per_s", "p50_ms", "p95_ms"))
+        rate = result.get("items_per_s", 1000 / result["ms_per_item"] if result["ms_per_item"] else 0)
+        p95 = f"{result['p95_ms']:.2f}" if "p95_ms" in result else "-"
+        print(f"{stage:<16} {result['items']:>6} {result['ms_per_item']:>9.2f} {rate:>9.1f} {p95:>8}  {notes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--slides", type=int, default=12, help="slides per deck")
+    parser.add_argument("--mix", default="text=0.6,image=0.25,scanned=0.15",
+                        help=f"slide kind weights ({', '.join(SLIDE_KINDS)})")
+    parser.add_argument("--formats", nargs="+", default=["pptx", "pdf"], choices=["pptx", "pdf"])
+    parser.add_argument("--queries", type=int, default=100, help="queries per search stage")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--config", default="config/embedding_config.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--results", help="compare an existing results file instead of running the suite")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown as a fraction (0.2 = 20%%)")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.results:
+        with open(args.results) as f:
+            results = json.load(f)
+    else:
+        mix = {kind: float(weight) for kind, _, weight in (item.partition("=") for item in args.mix.split(","))}
+        with tempfile.TemporaryDirectory() as workdir:
+            corpus = make_corpus(os.path.join(workdir, "decks"), args.decks, args.slides, mix,
+                                 tuple(args.formats), seed=args.seed)
+            config_path = write_config(args.config, os.path.join(workdir, "embedding_config.json"))
+            suite = PipelineSuite(workdir, corpus, config_path, args.queries, seed=args.seed)
+            stages = suite.run([stage for stage in STAGES if stage in args.stages])
+
+        kinds = [kind for deck in corpus for kind in deck["kinds"]]
+        results = {
+            "environment": environment(),
+            "corpus": {"decks": args.decks, "slides": len(kinds), "formats": args.formats, "seed": args.seed,
+                       "kinds": {kind: kinds.count(kind) for kind in SLIDE_KINDS}},
+            "stages": stages
+        }
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    print_results(results)
+    if not args.compare:
+        return
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    if baseline.get("corpus", {}).get("slides") != results["corpus"]["slides"]:
+        print("\nwarning: baseline was run on a different corpus size")
+    rows = compare(results, baseline, args.tolerance, args.min_ms)
+    print(f"\n{'stage':<16} {'metric':<12} {'baseline':>9} {'current':>9} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['stage']:<16} {row['metric']:<12} {row['baseline']:>9.2f} {row['current']:>9.2f} "
+              f"{row['change']:>+8.1%}{flag}")
+    regressions = [row for row in rows if row["regressed"]]
+    print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} "
+          f"against {baseline.get('environment', {}).get('commit') or args.compare}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for micro-batched query embeddings.
+
+Simulates `--concurrency` search threads that each embed one query at a
+time, first with a single-item forward pass per request and then through
+a MicroBatcher, and reports throughput, p50/p99 latency and the batcher's
+batch-size distribution and queue wait. The embedding cache is bypassed so
+every request reaches the model.
+
+Usage (from the repository root):
+    python -m benchmarks.query_batching_benchmark --requests 512 --concurrency 32
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import numpy as np
+
+from src.embedding.micro_batcher import MicroBatcher
+from src.embedding.text_embedder import TextEmbedder
+
+WORDS = (
+    "revenue growth strategy customer platform roadmap delivery cloud "
+    "migration quarter pipeline value stream agile release risk budget"
+).split()
+
+
+def make_queries(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+
+
+def run(embed: Callable[[str], np.ndarray], queries: List[str], concurrency: int):
+    def timed(query):
+        start = time.perf_counter()
+        embed(query)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(timed, queries))
+        wall = time.perf_counter() - start
+    return wall, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    embedder = TextEmbedder()
+    queries = make_queries(args.requests)
+    embedder._encode_uncached(queries[:8])  # warm up
+
+    batcher = MicroBatcher(embedder._encode_uncached, max_batch_size=args.max_batch_size,
+                           max_wait_ms=args.max_wait_ms)
+    modes = (
+        ("single-item", lambda query: embedder._encode_uncached([query])[0]),
+        ("micro-batched", batcher.embed)
+    )
+
+    print(f"requests: {args.requests}  concurrency: {args.concurrency}  "
+          f"max batch {args.max_batch_size}  max wait {args.max_wait_ms}ms")
+    for name, embed in modes:
+        wall, latencies = run(embed, queries, args.concurrency)
+        print(f"{name:<14}: {args.requests / wall:7.1f} queries/s  "
+              f"p50 {np.percentile(latencies, 50):6.1f}ms  p99 {np.percentile(latencies, 99):6.1f}ms")
+
+    stats = batcher.stats()
+    print(f"batches: {stats['batches']}  mean size {stats['mean_batch_size']:.1f}  "
+          f"queue wait p50 {stats['queue_wait_p50_ms']:.2f}ms p99 {stats['queue_wait_p99_ms']:.2f}ms")
+    print("batch sizes: " + ", ".join(f"{size}x{count}" for size, count in stats['batch_sizes'].items()))
+
+
+if __name__ == "__main__":
+    main()
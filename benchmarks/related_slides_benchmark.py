@@ -0,0 +1,82 @@
+"""
+Benchmark for the precomputed related-slides graph.
+
+Builds a RelatedSlidesGraph over synthetic clustered embeddings, then
+compares a graph lookup against a fresh exact vector query per page view,
+measures an incremental add of one 30-slide deck and reports the recall of
+the (approximate above `--exact-threshold`) graph against exact kNN.
+
+Usage (from the repository root):
+    python -m benchmarks.related_slides_benchmark --slides 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.search.related_slides import RelatedSlidesGraph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--exact-threshold", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(args.clusters, args.dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(0, args.clusters, args.slides + 30)]
+    vectors += rng.normal(scale=0.8, size=vectors.shape).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    slides = [(f"slide_{i}", f"deck_{i // 30}", vectors[i]) for i in range(len(vectors))]
+
+    graph = RelatedSlidesGraph(k=args.k, exact_threshold=args.exact_threshold)
+    start = time.perf_counter()
+    graph.build(slides[:args.slides])
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "related")
+        graph.save(path)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        graph = RelatedSlidesGraph(path)
+
+        probes = rng.integers(0, args.slides, args.lookups)
+        start = time.perf_counter()
+        for row in probes:
+            graph.related(f"slide_{row}", 10, exclude_same_presentation=True)
+        lookup = (time.perf_counter() - start) / args.lookups
+
+        corpus = vectors[:args.slides]
+        start = time.perf_counter()
+        for row in probes[:100]:
+            scores = corpus @ corpus[row]
+            np.argpartition(-scores, 11)[:11]
+        query = (time.perf_counter() - start) / 100
+
+        hits = 0
+        for row in probes[:100]:
+            scores = corpus @ corpus[row]
+            scores[row] = -np.inf
+            exact = {f"slide_{i}" for i in np.argpartition(-scores, 10)[:10]}
+            hits += len(exact & {r["id"] for r in graph.related(f"slide_{row}", 10)})
+
+        start = time.perf_counter()
+        graph.add(slides[args.slides:])
+        add = time.perf_counter() - start
+
+    print(f"slides: {args.slides}  k: {args.k}  build {build:.1f}s  on disk {size / 2 ** 20:.0f} MiB")
+    print(f"graph lookup      : {lookup * 1e6:8.1f}us")
+    print(f"fresh exact query : {query * 1e6:8.1f}us")
+    print(f"recall@10         : {hits / 1000:.3f}")
+    print(f"add one deck (30) : {add * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
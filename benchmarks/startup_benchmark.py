@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark for the API and ingest processes.
+
+Each scenario runs in a fresh interpreter and reports the time to import
+its entry module, the time until it is ready to serve (models and clients
+loaded and warmed up), resident and peak memory, and which heavy
+libraries were already imported before anything was loaded. Numbers are
+medians over `--runs` processes.
+
+Scenarios:
+    api-import      import src.api.main
+    api-ready       ... and run its startup (store, embedder, warm-up)
+    ingest-import   import the ingestion pipeline and build it
+    ingest-embed    ... and load the shared TextEmbedder for storing slides
+
+Usage (from the repository root):
+    python -m benchmarks.startup_benchmark --runs 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "sklearn", "openai", "weaviate", "onnxruntime")
+
+CHILD = r"""
+import json, os, sys, time
+
+def memory():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "VmHWM"):
+                fields[name] = int(value.split()[0]) / 1024
+    return fields.get("VmRSS", float("nan")), fields.get("VmHWM", float("nan"))
+
+scenario = sys.argv[1]
+start = time.perf_counter()
+if scenario.startswith("api"):
+    import src.api.main as entry
+else:
+    sys.path.insert(0, os.path.join("src", "ingestion"))
+    from ingestion_main import DocumentIngestionPipeline
+    entry = DocumentIngestionPipeline(sys.argv[2], sys.argv[3])
+imported = time.perf_counter() - start
+heavy = [name for name in json.loads(sys.argv[4]) if name in sys.modules]
+
+if scenario == "api-ready":
+    entry.load_search(entry.app)
+elif scenario == "ingest-embed":
+    from src.utils.model_registry import get_text_embedder
+    get_text_embedder()._encode_uncached(["warm up"])
+ready = time.perf_counter() - start
+
+rss, peak = memory()
+print(json.dumps({"import": imported, "ready": ready, "rss": rss, "peak": peak, "heavy": heavy}))
+"""
+
+
+def run_scenario(scenario: str, runs: int, workdir: str, env: dict):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, scenario, os.path.join(workdir, "input"),
+             os.path.join(workdir, "processed"), json.dumps(HEAVY_MODULES)],
+            env=env, capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            error = output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "no output"
+            return {"error": error}
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return {
+        "import": float(np.median([r["import"] for r in results])),
+        "ready": float(np.median([r["ready"] for r in results])),
+        "rss": float(np.median([r["rss"] for r in results])),
+        "peak": float(np.median([r["peak"] for r in results])),
+        "heavy": results[0]["heavy"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scenarios", nargs="+", default=["api-import", "api-ready", "ingest-import", "ingest-embed"],
+                        choices=["api-import", "api-ready", "ingest-import", "ingest-embed"])
+    parser.add_argument("--vector-store", default="local",
+                        help="VECTOR_STORE for the API scenarios ('local' needs no Weaviate server)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, VECTOR_STORE=args.vector_store)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    print(f"{'scenario':<14} {'import s':>9} {'ready s':>8} {'RSS MiB':>8} {'peak MiB':>9}  heavy modules at import")
+    with tempfile.TemporaryDirectory() as workdir:
+        for scenario in args.scenarios:
+            result = run_scenario(scenario, args.runs, workdir, env)
+            if "error" in result:
+                print(f"{scenario:<14} failed: {result['error']}")
+                continue
+            print(f"{scenario:<14} {result['import']:>9.2f} {result['ready']:>8.2f} {result['rss']:>8.0f} "
+                  f"{result['peak']:>9.0f}  {', '.join(result['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
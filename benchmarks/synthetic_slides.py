@@ -0,0 +1,206 @@
+"""
+Synthetic slide fixtures for the benchmarks.
+
+Generates image-only slides (text drawn into a bitmap, optionally with
+scanner-like noise) together with their ground-truth text, and whole
+PPTX and PDF decks mixing text-only, image-heavy and scanned slides.
+"""
+import io
+import os
+import random
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+WORDS = (
+    "revenue growth strategy customer platform roadmap delivery cloud migration "
+    "quarter pipeline value stream agile release risk budget product catalog "
+    "enterprise service design discovery backlog integration analytics"
+).split()
+
+
+def _font(size: int):
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "/System/Library/Fonts/Helvetica.ttc"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def slide_lines(rng: random.Random, count: int = 6) -> List[str]:
+    lines = [" ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 4)))]
+    for _ in range(count - 1):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 7))))
+    return lines
+
+
+def render_text_slide(path: str, lines: List[str], size: Tuple[int, int] = (1920, 1080),
+                      font_size: int = 40, noise: float = 0.0, seed: int = 0) -> str:
+    """Draw `lines` onto a white slide and save it; `noise` is the Gaussian sigma."""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    title_font, body_font = _font(int(font_size * 1.5)), _font(font_size)
+
+    y = size[1] // 10
+    for index, line in enumerate(lines):
+        font = title_font if index == 0 else body_font
+        draw.text((size[0] // 12, y), line, fill=(20, 20, 20), font=font)
+        y += int((font_size * 1.5 if index == 0 else font_size) * 1.8)
+
+    if noise:
+        rng = np.random.default_rng(seed)
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += rng.normal(0, noise, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    image.save(path)
+    return path
+
+
+def make_image_slides(out_dir: str, count: int, noise: float = 0.0, seed: int = 0,
+                      size: Tuple[int, int] = (1920, 1080)) -> List[Tuple[str, str]]:
+    """Write `count` image-only slides and return (path, ground-truth text) pairs."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    slides = []
+    for index in range(count):
+        lines = slide_lines(rng)
+        path = os.path.join(out_dir, f"synthetic_{index + 1}.png")
+        render_text_slide(path, lines, size=size, noise=noise, seed=seed + index)
+        slides.append((path, "\n".join(lines)))
+    return slides
+
+
+def word_accuracy(expected: str, actual: str) -> float:
+    """Fraction of expected words (case-insensitive, as a multiset) found in the OCR output."""
+    expected_words = expected.lower().split()
+    if not expected_words:
+        return 1.0
+    remaining = {}
+    for word in actual.lower().split():
+        remaining[word] = remaining.get(word, 0) + 1
+    hits = 0
+    for word in expected_words:
+        if remaining.get(word, 0) > 0:
+            remaining[word] -= 1
+            hits += 1
+    return hits / len(expected_words)
+
+
+SLIDE_KINDS = ("text", "image", "scanned")
+
+
+def _chart_png(rng: random.Random, size: Tuple[int, int] = (640, 400)) -> bytes:
+    """A bar chart-like picture, so image-heavy slides carry realistic embedded images."""
+    image = Image.new("RGB", size, (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    bars = rng.randint(4, 9)
+    width = size[0] // (bars * 2)
+    for bar in range(bars):
+        height = rng.randint(size[1] // 8, size[1] - 40)
+        x = width // 2 + bar * width * 2
+        color = tuple(rng.randint(40, 220) for _ in range(3))
+        draw.rectangle([x, size[1] - 20 - height, x + width, size[1] - 20], fill=color)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _scan_png(rng: random.Random, lines: List[str], seed: int) -> bytes:
+    """A noisy full-slide bitmap of `lines`, like a scanned handout with no text layer."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = render_text_slide(os.path.join(tmp, "scan.png"), lines, size=(1600, 900),
+                                 font_size=34, noise=12.0, seed=seed)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _slide_content(rng: random.Random, kind: str, seed: int) -> Dict[str, Any]:
+    lines = slide_lines(rng, rng.randint(3, 7))
+    content = {"kind": kind, "lines": lines, "images": []}
+    if kind == "image":
+        content["lines"] = lines[:2]
+        content["images"] = [_chart_png(rng) for _ in range(rng.randint(2, 4))]
+    elif kind == "scanned":
+        content["images"] = [_scan_png(rng, lines, seed)]
+    return content
+
+
+def _write_pptx(path: str, slides: List[Dict[str, Any]]):
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    presentation = Presentation()
+    presentation.slide_width, presentation.slide_height = Inches(13.333), Inches(7.5)
+    blank = presentation.slide_layouts[6]
+    for content in slides:
+        slide = presentation.slides.add_slide(blank)
+        if content["kind"] == "scanned":
+            slide.shapes.add_picture(io.BytesIO(content["images"][0]), 0, 0,
+                                     presentation.slide_width, presentation.slide_height)
+            continue
+
+        title = slide.shapes.add_textbox(Inches(0.6), Inches(0.4), Inches(12), Inches(1)).text_frame
+        title.text = content["lines"][0]
+        title.paragraphs[0].runs[0].font.size = Pt(36)
+        body = slide.shapes.add_textbox(Inches(0.6), Inches(1.6), Inches(12), Inches(5)).text_frame
+        body.text = "\n".join(content["lines"][1:])
+        for index, image in enumerate(content["images"]):
+            slide.shapes.add_picture(io.BytesIO(image), Inches(0.6 + 3.1 * index), Inches(3.2), width=Inches(3))
+    presentation.save(path)
+
+
+def _write_pdf(path: str, slides: List[Dict[str, Any]]):
+    import fitz  # PyMuPDF
+
+    document = fitz.open()
+    for content in slides:
+        page = document.new_page(width=960, height=540)
+        if content["kind"] == "scanned":
+            page.insert_image(page.rect, stream=content["images"][0])
+            continue
+
+        page.insert_text((48, 64), content["lines"][0], fontsize=28)
+        for index, line in enumerate(content["lines"][1:]):
+            page.insert_text((48, 120 + 30 * index), line, fontsize=18)
+        for index, image in enumerate(content["images"]):
+            page.insert_image(fitz.Rect(48 + 222 * index, 250, 258 + 222 * index, 382), stream=image)
+    document.save(path)
+    document.close()
+
+
+def make_corpus(out_dir: str, decks: int, slides_per_deck: int, mix: Dict[str, float] = None,
+                formats: Tuple[str, ...] = ("pptx", "pdf"), seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Write `decks` synthetic decks, alternating between `formats`, and return
+    one dict per deck with its path, format and per-slide kinds and text.
+
+    `mix` weights the slide kinds: "text" (title and bullets), "image"
+    (title, one line and several embedded charts) and "scanned" (one noisy
+    full-slide bitmap of text, with no text layer, so it needs OCR).
+    """
+    mix = mix or {"text": 0.6, "image": 0.25, "scanned": 0.15}
+    kinds, weights = zip(*[(kind, weight) for kind, weight in mix.items() if weight > 0])
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    corpus = []
+    for deck in range(decks):
+        fmt = formats[deck % len(formats)]
+        slides = [_slide_content(rng, rng.choices(kinds, weights)[0], seed + deck * slides_per_deck + index)
+                  for index in range(slides_per_deck)]
+        path = os.path.join(out_dir, f"synthetic_deck_{deck + 1}.{fmt}")
+        (_write_pptx if fmt == "pptx" else _write_pdf)(path, slides)
+        corpus.append({
+            "path": path,
+            "format": fmt,
+            "kinds": [content["kind"] for content in slides],
+            "texts": ["\n".join(content["lines"]) for content in slides]
+        })
+    return corpus
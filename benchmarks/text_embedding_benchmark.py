@@ -0,0 +1,90 @@
+"""
+Throughput benchmark for TextEmbedder.
+
+Compares the length-bucketed, chunked embedding path against the previous
+single padded tensor path (bypassing the embedding cache) on a synthetic deck
+of mixed-length slide texts.
+
+Usage (from the repository root):
+    python -m benchmarks.text_embedding_benchmark --slides 300
+"""
+import argparse
+import random
+import time
+from typing import List
+
+import numpy as np
+import torch
+
+from src.embedding.text_embedder import TextEmbedder
+
+WORDS = (
+    "revenue growth strategy customer platform roadmap delivery cloud "
+    "migration quarter pipeline value stream agile release risk budget"
+).split()
+
+
+def make_texts(count: int, seed: int = 0) -> List[str]:
+    """Generate slide-like texts: mostly short titles, some dense bodies."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        length = rng.choice([3, 5, 8, 12, 20, 40, 80, 200])
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(length)))
+    return texts
+
+
+def legacy_embeddings(embedder: TextEmbedder, texts: List[str]) -> np.ndarray:
+    """The previous implementation: one padded tensor for the whole input."""
+    encoded = embedder.tokenizer(
+        texts,
+        padding=True,
+        truncation=True,
+        max_length=512,
+        return_tensors="pt"
+    ).to(embedder.device)
+
+    with torch.no_grad():
+        outputs = embedder.model(**encoded)
+        embeddings = embedder._mean_pooling(outputs, encoded['attention_mask'])
+
+    return np.asarray(embeddings.cpu().numpy().tolist(), dtype=np.float32)
+
+
+def time_call(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    embedder = TextEmbedder()
+    texts = make_texts(args.slides)
+
+    # Warm up both paths so model loading is not measured
+    embedder._encode_uncached(texts[:8])
+    legacy_embeddings(embedder, texts[:8])
+
+    legacy = time_call(lambda: legacy_embeddings(embedder, texts), args.repeats)
+    batched = time_call(lambda: embedder._encode_uncached(texts), args.repeats)
+
+    reference = legacy_embeddings(embedder, texts)
+    result = embedder._encode_uncached(texts)
+    max_diff = float(np.abs(reference - result).max())
+
+    print(f"texts: {len(texts)}  batch_size: {embedder.batch_size}  device: {embedder.device}")
+    print(f"legacy  : {legacy:.3f}s  ({len(texts) / legacy:.1f} texts/s)")
+    print(f"batched : {batched:.3f}s  ({len(texts) / batched:.1f} texts/s)")
+    print(f"speedup : {legacy / batched:.2f}x  max |diff|: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for corpus-level topic tagging against per-slide extraction.
+
+Tags the same synthetic slides two ways, with the LLM served by the local
+completion stub (benchmarks/llm_stub.py):
+
+    per-slide   TopicAutoTagger.extract_slide_topics: sentence clustering
+                and LLM naming for every slide
+    corpus      CorpusTopicModel: fit over all slide embeddings in a local
+                index, name each centroid once, then tag every slide by
+                nearest centroid
+
+For each it reports wall time, chat-completion requests and how many
+distinct topic labels the slides ended up with (the same subject named
+the same way keeps this number low). Corpus tagging throughput is
+reported separately from the one-off fit and naming.
+
+Usage (from the repository root):
+    python -m benchmarks.topic_model_benchmark --slides 500 --latency 0.2
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.llm_stub import CompletionStub
+from benchmarks.topic_tagging_benchmark import make_slides
+
+
+def distinct_topics(results) -> int:
+    return len({topic['topic'] for topics in results for topic in topics})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default="config/embedding_config.json")
+    parser.add_argument("--slides", type=int, default=500)
+    parser.add_argument("--clusters", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the stub waits per request")
+    parser.add_argument("--skip-per-slide", action="store_true", help="only measure the corpus model")
+    args = parser.parse_args()
+
+    from openai import OpenAI
+    from src.embedding.topic_auto_tagger import TopicAutoTagger
+    from src.storage.local_index import LocalVectorIndex
+
+    stub = CompletionStub(latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(args.config) as f:
+                config = json.load(f)
+            config['topic_extraction'].update({
+                'requests_per_minute': 0,
+                'cache_path': os.path.join(tmp, "topic_labels.sqlite")
+            })
+            config['topic_model'] = {**config.get('topic_model', {}), 'enabled': True,
+                                     'path': os.path.join(tmp, "topics"), 'n_clusters': args.clusters}
+            config_path = os.path.join(tmp, "embedding_config.json")
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+
+            tagger = TopicAutoTagger(config_path)
+            tagger._client = OpenAI(base_url=stub.url, api_key="stub")
+            texts = make_slides(args.slides, tagger.max_topics)
+            embeddings = tagger.embedder.encode(texts)
+
+            print(f"slides: {len(texts)}  clusters: {args.clusters}  latency: {args.latency}s")
+            print(f"{'mode':<18} {'seconds':>8} {'requests':>9} {'topics':>7}")
+
+            if not args.skip_per_slide:
+                before = stub.requests
+                start = time.perf_counter()
+                results = tagger.extract_slide_topics(texts)
+                print(f"{'per-slide':<18} {time.perf_counter() - start:>8.2f} {stub.requests - before:>9} "
+                      f"{distinct_topics(results):>7}")
+
+            store = LocalVectorIndex()
+            store.store_slides(({'slide_number': index + 1, 'text_content': text,
+                                 'presentation_id': f"deck-{index // 20}", 'image_url': '', 'topics': []},
+                                embedding.tolist()) for index, (text, embedding) in enumerate(zip(texts, embeddings)))
+
+            before = stub.requests
+            start = time.perf_counter()
+            tagger.update_topic_model(store)
+            fitted = time.perf_counter() - start
+            print(f"{'corpus fit+name':<18} {fitted:>8.2f} {stub.requests - before:>9} {'-':>7}")
+
+            before = stub.requests
+            start = time.perf_counter()
+            results = tagger.tag_embeddings(embeddings)
+            tagged = time.perf_counter() - start
+            print(f"{'corpus tag':<18} {tagged:>8.4f} {stub.requests - before:>9} {distinct_topics(results):>7}")
+            print(f"corpus tagging: {len(texts) / max(tagged, 1e-9):,.0f} slides/s, "
+                  f"{np.mean([len(topics) for topics in results]):.2f} topics per slide")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark for TopicAutoTagger's LLM calls against a local completion stub.
+
+Tags the same slide texts three ways and reports wall time and the number
+of chat-completion requests:
+
+    sequential   the previous behaviour: one blocking request per cluster
+                 (or per short slide)
+    batched      extract_topics_batch with an empty cache
+    cached       extract_topics_batch again, answered from the cache
+
+The stub (benchmarks/llm_stub.py) sleeps `--latency` seconds per request,
+so the numbers reflect round trips rather than a real model.
+
+Usage (from the repository root):
+    python -m benchmarks.topic_tagging_benchmark --slides 50 --latency 0.3
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.llm_stub import CompletionStub
+from benchmarks.text_embedding_benchmark import WORDS
+
+
+def make_slides(count: int, max_topics: int):
+    """Slide texts: mostly multi-sentence bodies, some short titles."""
+    import random
+    rng = random.Random(0)
+    slides = []
+    for index in range(count):
+        sentences = 1 if index % 4 == 0 else rng.randint(max_topics, 3 * max_topics)
+        slides.append(" ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))).capitalize() + "."
+            for _ in range(sentences)))
+    return slides
+
+
+def sequential(tagger, texts):
+    """One request per cluster or short text, as before batching."""
+    for text in texts:
+        sentences = tagger._split_into_sentences(text)
+        if len(sentences) < tagger.max_topics:
+            prompts = [f"Extract up to {tagger.max_topics} main topics from this text:\n{text}"]
+        else:
+            embeddings = tagger.embedder.encode(sentences)
+            clusters = tagger._cluster_sentences(embeddings)
+            prompts = [f"Generate a concise topic (1-3 words) for these sentences:\n" + "\n".join(members)
+                       for members in tagger._cluster_members(sentences, clusters)]
+        for prompt in prompts:
+            tagger.client.chat.completions.create(
+                model=tagger.model,
+                messages=[{"role": "system", "content": "You are a topic extraction assistant."},
+                          {"role": "user", "content": prompt}]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default="config/embedding_config.json")
+    parser.add_argument("--slides", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds the stub waits per request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--items-per-request", type=int, default=20)
+    args = parser.parse_args()
+
+    from openai import OpenAI
+    from src.embedding.topic_auto_tagger import TopicAutoTagger
+
+    stub = CompletionStub(latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(args.config) as f:
+                config = json.load(f)
+            config['topic_extraction'].update({
+                'max_concurrency': args.concurrency,
+                'requests_per_minute': 0,
+                'items_per_request': args.items_per_request,
+                'cache_path': os.path.join(tmp, "topic_labels.sqlite")
+            })
+            config_path = os.path.join(tmp, "embedding_config.json")
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+
+            tagger = TopicAutoTagger(config_path)
+            tagger._client = OpenAI(base_url=stub.url, api_key="stub")
+            texts = make_slides(args.slides, tagger.max_topics)
+            tagger.embedder.encode(texts[:4])  # load and warm up the embedder
+
+            print(f"slides: {len(texts)}  latency: {args.latency}s  concurrency: {args.concurrency}")
+            print(f"{'mode':<11} {'seconds':>8} {'requests':>9} {'topics':>7}")
+            for mode in ("sequential", "batched", "cached"):
+                before = stub.requests
+                start = time.perf_counter()
+                if mode == "sequential":
+                    sequential(tagger, texts)
+                    topics = "-"
+                else:
+                    results = tagger.extract_topics_batch(texts)
+                    topics = sum(len(slide) for slide in results)
+                elapsed = time.perf_counter() - start
+                print(f"{mode:<11} {elapsed:>8.2f} {stub.requests - before:>9} {topics:>7}")
+            print(f"max requests in flight: {stub.max_in_flight}")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
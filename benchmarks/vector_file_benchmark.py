@@ -0,0 +1,114 @@
+"""
+Benchmark for memory-mapped vector files.
+
+Writes the same synthetic clustered embeddings as float32, float16 and
+int8 vector files and reports file size, open time, top-k latency (single
+query and a batch of 32) and recall@10 against exact float32 search. Then
+opens each file from several worker processes and reports their anonymous
+versus file-backed resident memory: the mapped vectors show up as shared
+file pages, not per-process copies.
+
+Usage (from the repository root):
+    python -m benchmarks.vector_file_benchmark --slides 200000 --workers 2
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.storage.vector_file import VectorFile, write_vector_file
+
+
+def make_vectors(count: int, dimensions: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)]
+    vectors += rng.normal(scale=0.8, size=(count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def rss_mib():
+    """Anonymous and file-backed resident memory of this process (Linux only)."""
+    fields = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("RssAnon", "RssFile"):
+                    fields[name] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return fields.get("RssAnon", float("nan")), fields.get("RssFile", float("nan"))
+
+
+def worker(path: str, queries: np.ndarray, results):
+    vector_file = VectorFile(path)
+    vector_file.top_k_batch(queries, 10)
+    results.put(rss_mib())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=200000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.slides, args.dimensions, args.clusters)
+    ids = [f"slide_{i}" for i in range(args.slides)]
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, args.slides, args.queries)]
+    queries = queries + rng.normal(scale=0.03, size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = [set(np.argsort(-(vectors @ query))[:10]) for query in queries]
+
+    print(f"slides: {args.slides}  dims: {args.dimensions}  queries: {args.queries}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in ("float32", "float16", "int8"):
+            path = os.path.join(tmp, f"vectors_{dtype}.bin")
+            start = time.perf_counter()
+            write_vector_file(path, zip(ids, vectors), dtype=dtype)
+            write = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vector_file = VectorFile(path)
+            load = time.perf_counter() - start
+
+            latencies = []
+            hits = 0
+            for query, truth in zip(queries, exact):
+                start = time.perf_counter()
+                top = vector_file.top_k(query, 10)
+                latencies.append(time.perf_counter() - start)
+                hits += len(truth & {vector_file.row(slide_id) for slide_id, _ in top})
+
+            start = time.perf_counter()
+            vector_file.top_k_batch(queries[:32], 10)
+            batch = (time.perf_counter() - start) / 32
+
+            print(f"{dtype:<8}: {os.path.getsize(path) / 2 ** 20:7.1f} MiB  write {write:5.2f}s  "
+                  f"open {load * 1000:6.1f}ms  top-10 p50 {np.percentile(latencies, 50) * 1000:6.1f}ms  "
+                  f"batched {batch * 1000:5.1f}ms/query  recall@10 {hits / (10 * len(queries)):.3f}")
+
+            if args.workers:
+                # Spawned (not forked) so workers do not inherit the benchmark's own arrays
+                context = multiprocessing.get_context("spawn")
+                results = context.Queue()
+                processes = [context.Process(target=worker, args=(path, queries[:8], results))
+                             for _ in range(args.workers)]
+                for process in processes:
+                    process.start()
+                usage = [results.get() for _ in processes]
+                for process in processes:
+                    process.join()
+                print("          workers: " + ", ".join(f"anon {anon:.0f} MiB / shared file {file:.0f} MiB"
+                                                      for anon, file in usage))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Import throughput benchmark for WeaviateClient.
+
+Compares per-object `store_slide` calls with the batched `store_slides`
+path against a local Weaviate stand-in server.
+
+Usage (from the repository root):
+    python -m benchmarks.weaviate_import_benchmark --slides 2000 --latency 0.002
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.weaviate_stub import WeaviateStub
+from src.storage.weaviate_client import WeaviateClient
+
+
+def make_slides(count: int, dimensions: int = 384, seed: int = 0) -> List[Tuple[Dict[str, Any], List[float]]]:
+    rng = random.Random(seed)
+    slides = []
+    for idx in range(count):
+        slide_data = {
+            'slide_number': idx % 50 + 1,
+            'text_content': f"Synthetic slide {idx} about roadmap, delivery and budget",
+            'presentation_id': f"deck_{idx // 50}.pptx",
+            'image_url': f"data/processed/rendered_images/deck_{idx // 50}/slide_{idx % 50 + 1}.png",
+            'topics': ["roadmap", "delivery"]
+        }
+        slides.append((slide_data, [rng.random() for _ in range(dimensions)]))
+    return slides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="simulated per-request server latency in seconds")
+    args = parser.parse_args()
+
+    slides = make_slides(args.slides)
+    stub = WeaviateStub(latency=args.latency).start()
+    try:
+        client = WeaviateClient(stub.url)
+
+        start = time.perf_counter()
+        for slide_data, embedding in slides:
+            client.store_slide(slide_data, embedding)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = client.store_slides(iter(slides), batch_size=args.batch_size)
+        batched = time.perf_counter() - start
+    finally:
+        stub.stop()
+
+    print(f"slides: {len(slides)}  batch_size: {args.batch_size}  latency: {args.latency * 1000:.1f}ms")
+    print(f"store_slide  : {single:.2f}s  ({len(slides) / single:.0f} objects/s)")
+    print(f"store_slides : {batched:.2f}s  ({len(slides) / batched:.0f} objects/s)"
+          f"  stored={report['stored']} failed={len(report['failed'])}")
+    print(f"speedup      : {single / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
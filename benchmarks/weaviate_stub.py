@@ -0,0 +1,124 @@
+"""
+Minimal local stand-in for the Weaviate REST API used by the benchmarks.
+
+It implements just enough of `/v1` for `weaviate.Client` to connect,
+create the schema and import objects, and adds a fixed per-request delay
+to approximate a network round trip.
+"""
+import json
+import socket
+import threading
+import time
+import uuid as uuid_lib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Avoid Nagle/delayed-ACK stalls between header and body writes
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any = None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def do_GET(self):
+        self.server.count_request()
+        path = self.path.split("?")[0]
+        if path == "/v1/meta":
+            self._send(200, {"hostname": "http://[::]:8080", "modules": {}, "version": "1.19.0"})
+        elif path == "/v1/.well-known/ready":
+            self._send(200)
+        elif path == "/v1/schema":
+            self._send(200, {"classes": list(self.server.classes.values())})
+        elif path.startswith("/v1/nodes"):
+            self._send(200, {"nodes": [{
+                "name": "stub", "status": "HEALTHY", "version": "1.19.0",
+                "stats": {"objectCount": len(self.server.objects), "shardCount": 1},
+                "batchStats": {"queueLength": 0, "ratePerSecond": 0}
+            }]})
+        elif path.startswith("/v1/schema/"):
+            name = path.rsplit("/", 1)[-1]
+            if name in self.server.classes:
+                self._send(200, self.server.classes[name])
+            else:
+                self._send(404)
+        else:
+            self._send(404)
+
+    def do_POST(self):
+        self.server.count_request()
+        path = self.path.split("?")[0]
+        body = self._read_json()
+
+        if path == "/v1/schema":
+            self.server.classes[body["class"]] = body
+            self._send(200, body)
+        elif path == "/v1/objects":
+            self._send(200, self.server.add_object(body))
+        elif path == "/v1/batch/objects":
+            self._send(200, [self.server.add_object(obj) for obj in body.get("objects", [])])
+        else:
+            self._send(404)
+
+
+class WeaviateStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.002, fail_every: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.classes: Dict[str, Any] = {}
+        self.objects: Dict[str, Any] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_object(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        obj = dict(obj)
+        obj.setdefault("id", str(uuid_lib.uuid4()))
+        with self._lock:
+            attempt = len(self.objects) + 1
+            if self.fail_every and attempt % self.fail_every == 0 and obj["id"] not in self.objects:
+                # Fail once; the retry will succeed
+                self.objects[obj["id"]] = None
+                obj["result"] = {"errors": {"error": [{"message": "simulated failure"}]}}
+                return obj
+            self.objects[obj["id"]] = obj
+        obj["result"] = {}
+        return obj
+
+    def start(self) -> "WeaviateStub":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -1,7 +1,79 @@
-from fastapi import FastAPI, UploadFile, File
+import asyncio
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import List, Optional
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
+
+from src.search.hybrid_search import HybridSearch
+from src.search.query_processor import QueryProcessor
+from src.search.related_slides import RelatedSlidesGraph
+from src.utils.model_registry import get_text_embedder, get_vector_store
+
+logger = logging.getLogger(__name__)
+
+# Threads running blocking inference and vector store calls off the event loop
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))
+
+# Precomputed related-slides graph, built by `python -m src.search.related_slides`
+RELATED_SLIDES_PATH = os.getenv("RELATED_SLIDES_PATH", "data/related")
+
+# Where ingestion_main.py reads decks and renders thumbnails, for previews rendered on demand
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/input")
+RENDERED_IMAGES_DIR = os.getenv("RENDERED_IMAGES_DIR", "data/processed/rendered_images")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_search(app)
+    yield
+    app.state.executor.shutdown(wait=False)
+    app.state.search_legs.shutdown(wait=False)
+
+def load_search(app: FastAPI):
+    """
+    Load the models and the vector store once and warm them up, so the
+    first request does not pay for model loading or lazy initialization.
+    The vector store connection and the related-slides graph load while
+    the embedding model does.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as loader:
+        vector_store_future = loader.submit(get_vector_store)
+        related_graph_future = loader.submit(RelatedSlidesGraph, RELATED_SLIDES_PATH)
+        text_embedder = get_text_embedder()
+        vector_store = vector_store_future.result()
+        related_graph = related_graph_future.result()
+    query_processor = QueryProcessor(text_embedder=text_embedder, vector_store=vector_store)
+
+    app.state.query_processor = query_processor
+    app.state.executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+    # Each search on the executor runs its vector and BM25 legs on this pool
+    app.state.search_legs = ThreadPoolExecutor(max_workers=2 * SEARCH_WORKERS, thread_name_prefix="search-legs")
+    app.state.search = HybridSearch(query_processor=query_processor, vector_store=vector_store,
+                                    executor=app.state.search_legs)
+    app.state.related_graph = related_graph
+    app.state.related_graph_lock = asyncio.Lock()
+
+    # Dummy inference and query; bypasses the caches so the model really runs
+    embedding = text_embedder._encode_uncached(["warm up"])[0]
+    vector_store.search_by_vector(embedding.tolist(), limit=1)
+    logger.info("Search loaded and warmed up in %.2fs", time.perf_counter() - start)
 
-app = FastAPI(title="Slide Search API")
+@lru_cache(maxsize=1)
+def slide_renderer():
+    """The ingestion pipeline's renderer, for slides ingested in lazy mode without thumbnails."""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ingestion"))
+    from slide_renderer import SlideRenderer
+    return SlideRenderer(RENDERED_IMAGES_DIR)
+
+app = FastAPI(title="Slide Search API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -12,6 +84,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def add_process_time(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    response.headers["X-Process-Time"] = f"{(time.perf_counter() - start) * 1000:.1f}ms"
+    return response
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -21,8 +100,60 @@ async def upload_file(file: UploadFile = File(...)):
     return {"filename": file.filename}
 
 @app.get("/search")
-async def search_slides(query: str):
-    return {"query": query}
+async def search_slides(response: Response, query: str,
+                        limit: int = Query(10, ge=1, le=100),
+                        presentation_id: Optional[str] = None,
+                        topics: Optional[List[str]] = Query(None),
+                        slide_from: Optional[int] = None,
+                        slide_to: Optional[int] = None):
+    filters = {"presentationId": presentation_id, "topics": topics}
+    slide_range = {"gte": slide_from, "lte": slide_to}
+    filters["slideNumber"] = {op: bound for op, bound in slide_range.items() if bound is not None}
+
+    submitted = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        # Embed first so the timing splits model time from vector store time;
+        # the search below then hits the query embedding cache
+        app.state.query_processor.get_query_embedding(query)
+        embedded = time.perf_counter()
+        results = app.state.search.search(query, filters=filters, limit=limit)
+        return results, started, embedded, time.perf_counter()
+
+    loop = asyncio.get_running_loop()
+    results, started, embedded, finished = await loop.run_in_executor(app.state.executor, run)
+
+    response.headers["Server-Timing"] = ", ".join([
+        f"queue;dur={(started - submitted) * 1000:.1f}",
+        f"embed;dur={(embedded - started) * 1000:.1f}",
+        f"search;dur={(finished - embedded) * 1000:.1f}"
+    ])
+    return {"query": query, "count": len(results), "results": results}
+
+@app.get("/metrics")
+async def get_metrics():
+    text_embedder = app.state.query_processor.text_embedder
+    return {
+        "query_batching": text_embedder.batcher.stats() if text_embedder.batcher else None,
+        "embedding_cache": text_embedder.cache.stats() if text_embedder.cache else None
+    }
+
+@app.get("/presentations/{presentation_id}/slides/{slide_number}/preview")
+async def get_slide_preview(presentation_id: str, slide_number: int = Path(..., ge=1)):
+    """Thumbnail of a slide, rendered on first request (the `imageUrl` of lazily ingested slides)."""
+    document_path = os.path.join(UPLOAD_DIR, presentation_id)
+    if os.path.basename(presentation_id) != presentation_id or not os.path.isfile(document_path):
+        raise HTTPException(status_code=404, detail=f"Presentation {presentation_id} not found")
+
+    loop = asyncio.get_running_loop()
+    try:
+        image_path = await loop.run_in_executor(
+            app.state.executor, slide_renderer().preview_path, document_path, slide_number
+        )
+    except IndexError:
+        raise HTTPException(status_code=404, detail=f"Presentation {presentation_id} has no slide {slide_number}")
+    return FileResponse(image_path, media_type="image/png")
 
 @app.get("/slides/{slide_id}")
 async def get_slide(slide_id: str):
@@ -48,9 +179,29 @@ async def get_slide_notes(slide_id: str):
 async def get_slide_topics(slide_id: str):
     return {"topics": ["Topic 1", "Topic 2"]}
 
-@app.get("/slides/{slide_id}/related")
-async def get_related_slides(slide_id: str):
-    return {"related_slides": ["Slide 2", "Slide 3"]}
+async def current_related_graph() -> RelatedSlidesGraph:
+    """The related-slides graph, reloaded once `python -m src.search.related_slides` saves a new one."""
+    graph = app.state.related_graph
+    # One request reloads; the others keep using the old graph meanwhile
+    if graph.outdated() and not app.state.related_graph_lock.locked():
+        async with app.state.related_graph_lock:
+            if app.state.related_graph is graph:
+                loop = asyncio.get_running_loop()
+                try:
+                    app.state.related_graph = await loop.run_in_executor(
+                        app.state.executor, RelatedSlidesGraph, RELATED_SLIDES_PATH
+                    )
+                    logger.info("Reloaded the related-slides graph (%d slides)", len(app.state.related_graph))
+                except (OSError, ValueError) as e:
+                    logger.warning("Keeping the current related-slides graph: %s", e)
+        graph = app.state.related_graph
+    return graph
 
 @app.get("/slides/{slide_id}/related")
-async def get_related_slides(slide_id: str):
\ No newline at end of file
+async def get_related_slides(slide_id: str, limit: int = Query(10, ge=1, le=100),
+                             exclude_same_presentation: bool = False):
+    graph = await current_related_graph()
+    related = graph.related(slide_id, limit, exclude_same_presentation)
+    if related is None:
+        raise HTTPException(status_code=404, detail=f"Slide {slide_id} is not in the related-slides graph")
+    return {"slide_id": slide_id, "related_slides": related}
@@ -0,0 +1,244 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """
+    Token bucket allowing `requests_per_minute` calls with bursts of up to
+    `burst`. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, burst: int = 1):
+        self.rate = requests_per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class CompletionCache:
+    """
+    Persistent cache of parsed completion results, keyed by a hash of the
+    model, the request kind (including its instructions) and the item text. SQLite in WAL mode, so it
+    can be shared by worker processes.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, kind: str, text: str) -> str:
+        digest = hashlib.sha256(model.encode('utf-8'))
+        digest.update(b'\0' + kind.encode('utf-8') + b'\0')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, result in self._conn.execute(
+                        f"SELECT key, result FROM completions WHERE key IN ({placeholders})", chunk):
+                    found[key] = json.loads(result)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Any]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO completions (key, result, created) VALUES (?, ?, ?)",
+                [(key, json.dumps(result), now) for key, result in items.items()]
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+def parse_json_list(content: str) -> Optional[list]:
+    """Extract the JSON array from a completion, tolerating surrounding prose or code fences."""
+    start, end = content.find('['), content.rfind(']')
+    if start < 0 or end < start:
+        return None
+    try:
+        value = json.loads(content[start:end + 1])
+    except ValueError:
+        return None
+    return value if isinstance(value, list) else None
+
+def _retryable(error: Exception) -> bool:
+    """Client errors other than rate limiting (bad request, auth, not found) fail the same way again."""
+    status = getattr(error, 'status_code', None)
+    return status is None or status == 429 or status >= 500
+
+class CompletionBatcher:
+    """
+    Batched, concurrent and cached chat completions.
+
+    `run` answers one prompt per item, but packs up to `items_per_request`
+    uncached items into a single numbered prompt that asks for a JSON
+    array with one answer per item. Requests run on `max_concurrency`
+    threads, are paced by a `requests_per_minute` token bucket and are
+    retried with exponential backoff when they fail (network, rate
+    limits); a batch whose requests keep failing gets no answers. A
+    batch whose answer comes back malformed is split in half at once and
+    sent as two smaller prompts; only a single item is retried with
+    backoff, so one bad item in n costs about 2 log2(n) + max_retries
+    extra requests. Identical items are sent once, and answers are
+    cached by a hash of the model, the instructions and the item text.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any], model: str, max_concurrency: int = 4,
+                 requests_per_minute: float = 0, items_per_request: int = 20, max_retries: int = 3,
+                 backoff: float = 1.0, cache_path: str = None):
+        self._client_factory = client_factory
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.items_per_request = max(1, items_per_request)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limiter = RateLimiter(requests_per_minute, burst=self.max_concurrency)
+        self.cache = CompletionCache(cache_path) if cache_path else None
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="completions")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], client_factory: Callable[[], Any]) -> "CompletionBatcher":
+        """Build a batcher from the `topic_extraction` section of embedding_config.json."""
+        settings = config.get('topic_extraction', {})
+        return cls(
+            client_factory,
+            settings['model'],
+            max_concurrency=settings.get('max_concurrency', 4),
+            requests_per_minute=settings.get('requests_per_minute', 0),
+            items_per_request=settings.get('items_per_request', 20),
+            max_retries=settings.get('max_retries', 3),
+            cache_path=settings.get('cache_path')
+        )
+
+    def run(self, kind: str, items: List[str], instructions: str,
+            parse: Callable[[Any], Any], system: str = "You are a topic extraction assistant.") -> List[Any]:
+        """
+        Return one parsed answer per item (None where the model gave none).
+
+        `instructions` introduces the numbered items and describes the
+        answer for one item; `parse` turns one element of the returned JSON
+        array into the result, raising ValueError if it is malformed.
+        """
+        namespace = f"{kind}\0{instructions}"
+        keys = [CompletionCache.key(self.model, namespace, item) for item in items]
+        results = self.cache.get_many(list(set(keys))) if self.cache else {}
+
+        pending = {}
+        for key, item in zip(keys, items):
+            if key not in results:
+                pending.setdefault(key, item)
+
+        pending_keys = list(pending)
+        chunks = [pending_keys[start:start + self.items_per_request]
+                  for start in range(0, len(pending_keys), self.items_per_request)]
+        futures = [self._executor.submit(self._request, [pending[key] for key in chunk], instructions, parse, system)
+                   for chunk in chunks]
+
+        answered = {}
+        for chunk, future in zip(chunks, futures):
+            for key, answer in zip(chunk, future.result()):
+                if answer is not None:
+                    answered[key] = answer
+        if self.cache:
+            self.cache.put_many(answered)
+        results.update(answered)
+
+        return [results.get(key) for key in keys]
+
+    def _request(self, items: List[str], instructions: str, parse: Callable[[Any], Any],
+                 system: str) -> List[Any]:
+        numbered = "\n\n".join(f"[{index + 1}]\n{item}" for index, item in enumerate(items))
+        prompt = (f"{instructions}\n\nAnswer with only a JSON array of exactly {len(items)} elements, "
+                  f"one per numbered item, in order.\n\n{numbered}")
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self._client_factory().chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt}
+                    ]
+                )
+            except Exception as e:
+                # Transport, auth and rate-limit errors: retry, but never split the batch
+                if attempt < self.max_retries and _retryable(e):
+                    time.sleep(self.backoff * 2 ** attempt)
+                    continue
+                logger.warning(f"Completion request for {len(items)} items failed: {e}")
+                return [None] * len(items)
+
+            with self._requests_lock:
+                self.requests += 1
+            answers = parse_json_list(response.choices[0].message.content or '')
+            if answers is not None and len(answers) == len(items):
+                break
+            if len(items) > 1:
+                # Split without retrying: smaller prompts are less likely to come
+                # back malformed, and retrying at every level multiplies the cost
+                half = len(items) // 2
+                return (self._request(items[:half], instructions, parse, system) +
+                        self._request(items[half:], instructions, parse, system))
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            logger.warning(f"Completion did not return a JSON array of {len(items)} answers")
+            return [None]
+
+        results = []
+        for answer in answers:
+            try:
+                results.append(parse(answer))
+            except (ValueError, TypeError, IndexError):
+                results.append(None)
+        return results
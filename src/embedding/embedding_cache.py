@@ -0,0 +1,233 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache backed by SQLite.
+
+    Keys are SHA-256 hashes of a namespace (model name, inference backend
+    and preprocessing version, see `namespace`) plus the normalized text
+    or raw image bytes, so vectors computed differently never share a
+    key. Entries are evicted least-recently-used once the cache holds
+    more than `max_entries` vectors; the size is checked every
+    `evict_every` inserts, and access times are only rewritten once they
+    are more than `touch_interval` seconds old, so reads rarely write.
+    SQLite's WAL mode and busy timeout make the file safe to share
+    between worker processes.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, timeout: float = 30.0,
+                 evict_every: int = 1000, touch_interval: float = 3600.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.evict_every = max(1, evict_every)
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        # Rows inserted since the table was last counted (None: not counted yet)
+        self._inserted = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["EmbeddingCache"]:
+        """Build a cache from the `cache` section of embedding_config.json."""
+        cache_config = config.get('cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(
+            cache_config.get('path', 'data/cache/embeddings.sqlite'),
+            max_entries=cache_config.get('max_entries', 100000),
+            evict_every=cache_config.get('evict_every', 1000),
+            touch_interval=cache_config.get('touch_interval', 3600.0)
+        )
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize unicode and whitespace so trivially different texts share a key."""
+        return " ".join(unicodedata.normalize('NFC', text).split())
+
+    @staticmethod
+    def namespace(model_name: str, backend: str, preprocessing: str) -> str:
+        """Key prefix for vectors from one model, inference backend and preprocessing version."""
+        return f"{model_name}\0{backend}\0{preprocessing}"
+
+    @staticmethod
+    def text_key(namespace: str, text: str) -> str:
+        digest = hashlib.sha256(namespace.encode('utf-8'))
+        digest.update(b'\0text\0')
+        digest.update(EmbeddingCache.normalize_text(text).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def bytes_key(namespace: str, data: bytes) -> str:
+        digest = hashlib.sha256(namespace.encode('utf-8'))
+        digest.update(b'\0bytes\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def file_key(namespace: str, path: str, block_size: int = 1 << 20) -> str:
+        """Same key as `bytes_key` over the file's contents, read in blocks."""
+        digest = hashlib.sha256(namespace.encode('utf-8'))
+        digest.update(b'\0bytes\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return a connection owned by the current process."""
+        # SQLite connections must not be shared across fork()
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+            conn.commit()
+            self._conn = conn
+            self._conn_pid = os.getpid()
+            self._inserted = None
+        return self._conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up vectors for the given keys and return the ones that are cached.
+
+        Only hits whose access time is older than `touch_interval` are
+        updated, so repeated reads of hot entries stay read-only.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+
+        now = time.time()
+        stale = []
+        with self._lock:
+            conn = self._connect()
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, dim, vector, last_access FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, dim, blob, last_access in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+                    if now - last_access > self.touch_interval:
+                        stale.append(key)
+
+            if stale:
+                conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in stale]
+                )
+                conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """
+        Store vectors and evict the least recently used entries over the limit.
+
+        The table is counted on the first insert and then once every
+        `evict_every` inserted rows, so it may briefly exceed `max_entries`.
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            vector = np.ascontiguousarray(vector, dtype=np.float32)
+            rows.append((key, int(vector.shape[0]), vector.tobytes(), now))
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            if self._inserted is not None and self._inserted + len(rows) < self.evict_every:
+                self._inserted += len(rows)
+            else:
+                self._inserted = 0
+                count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM embeddings WHERE key IN ("
+                        " SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+            conn.commit()
+
+    def lookup(self, keys: List[str], compute) -> List[np.ndarray]:
+        """
+        Return one vector per key, computing only the misses.
+
+        `compute` is called once with the list of missing positions (first
+        occurrence of each missing key) and must return a matrix with one
+        row per position.
+        """
+        cached = self.get_many(keys)
+
+        missing_positions = []
+        seen = set()
+        for position, key in enumerate(keys):
+            if key not in cached and key not in seen:
+                seen.add(key)
+                missing_positions.append(position)
+
+        if missing_positions:
+            computed = compute(missing_positions)
+            new_items = {keys[position]: computed[row] for row, position in enumerate(missing_positions)}
+            self.put_many(new_items)
+            cached.update(new_items)
+
+        return [cached[key] for key in keys]
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for this process and the current entry count."""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
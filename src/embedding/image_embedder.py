@@ -1,42 +1,194 @@
-import torch
 from PIL import Image
-from transformers import CLIPProcessor, CLIPModel
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import itertools
 import os
+import threading
 import numpy as np
+from src.embedding.embedding_cache import EmbeddingCache
+from src.utils.model_registry import load_config
+
+# Bump when image decoding or resizing changes, so cached vectors are recomputed
+PREPROCESSING_VERSION = "draft-reduce-1"
 
 class ImageEmbedder:
     def __init__(self, config_path: str = "config/embedding_config.json"):
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
-        self.model_name = config['image_embedding']['model']
-        self.batch_size = config['image_embedding']['batch_size']
+        # torch and transformers are imported here, not at module import
+        import torch
+        from transformers import CLIPProcessor, CLIPModel
+        from src.embedding.inference_backend import NormalizedImageEncoder, load_backend
+
+        config = load_config(config_path)
+
+        image_config = config['image_embedding']
+        self.model_name = image_config['model']
+        self.batch_size = image_config['batch_size']
+        self.load_workers = image_config.get('load_workers', min(4, os.cpu_count() or 1))
+        self.memory_cache_size = image_config.get('memory_cache_size', 1024)
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        
+
         # Initialize CLIP model and processor
         self.model = CLIPModel.from_pretrained(self.model_name).to(self.device)
+        self.dimensions = self.model.config.projection_dim
         self.processor = CLIPProcessor.from_pretrained(self.model_name)
-        
+        self.input_size = self._input_size()
+
         # Set model to evaluation mode
         self.model.eval()
 
+        # PyTorch, dynamic int8 or ONNX Runtime, per the `inference` config
+        self.backend = load_backend(
+            config, 'image_embedding', NormalizedImageEncoder(self.model), self.model_name, 'image', self.device,
+            self._parity_inputs
+        )
+        # int8 and ONNX backends run on their own copy of the weights
+        if self.backend.name != "torch":
+            self.model = None
+
+        # Optional on-disk cache shared by all embedder instances and workers
+        self.cache = EmbeddingCache.from_config(config)
+        self.cache_namespace = EmbeddingCache.namespace(self.model_name, self.backend.name, PREPROCESSING_VERSION)
+
+        # Decoding and hashing run on this pool (PIL releases the GIL while decoding)
+        self._pool = ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix="image-loader")
+
+        # Vectors of recently embedded files, keyed by path, size and mtime
+        self._recent = OrderedDict()
+        self._recent_lock = threading.Lock()
+
+    def encode(self, image_paths: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for a list of images as a float32 matrix.
+
+        Recently embedded files are served from memory. When the embedding
+        cache is enabled the remaining images are keyed by their file bytes
+        and only uncached images are sent to the model.
+        """
+        embeddings = np.empty((len(image_paths), self.dimensions), dtype=np.float32)
+        stats = [self._file_stat(path) for path in image_paths]
+
+        missing = []
+        with self._recent_lock:
+            for position, stat in enumerate(stats):
+                if stat in self._recent:
+                    self._recent.move_to_end(stat)
+                    embeddings[position] = self._recent[stat]
+                else:
+                    missing.append(position)
+        if not missing:
+            return embeddings
+
+        paths = [image_paths[i] for i in missing]
+        if self.cache is None:
+            vectors = self._encode_uncached(paths)
+        else:
+            keys = list(self._pool.map(lambda path: EmbeddingCache.file_key(self.cache_namespace, path), paths))
+            vectors = self.cache.lookup(
+                keys,
+                lambda positions: self._encode_uncached([paths[i] for i in positions])
+            )
+            vectors = np.vstack(vectors)
+
+        embeddings[missing] = vectors
+        with self._recent_lock:
+            for position, vector in zip(missing, vectors):
+                self._recent[stats[position]] = np.array(vector, dtype=np.float32)
+                self._recent.move_to_end(stats[position])
+            while len(self._recent) > self.memory_cache_size:
+                self._recent.popitem(last=False)
+
+        return embeddings
+
+    def iter_encode(self, image_paths: Iterable[str]) -> Iterator[np.ndarray]:
+        """
+        Embed a stream of images, yielding one vector per path in order.
+
+        Paths are consumed `batch_size` at a time, so arbitrarily long
+        iterables never hold more than one batch of decoded images.
+        """
+        image_paths = iter(image_paths)
+        while True:
+            chunk = list(itertools.islice(image_paths, self.batch_size))
+            if not chunk:
+                break
+            yield from self.encode(chunk)
+
+    def _encode_uncached(self, image_paths: List[str]) -> np.ndarray:
+        """
+        Run CLIP over a list of images in chunks of `batch_size`.
+
+        Images are decoded and downscaled on the loader pool, and the next
+        chunk is decoded while the model runs on the current one, so at
+        most two chunks of images are in memory at a time.
+        """
+        embeddings = np.empty((len(image_paths), self.dimensions), dtype=np.float32)
+        if not image_paths:
+            return embeddings
+
+        chunks = [image_paths[start:start + self.batch_size]
+                  for start in range(0, len(image_paths), self.batch_size)]
+        pending = [self._pool.submit(self._load_image, path) for path in chunks[0]]
+        start = 0
+        for index in range(len(chunks)):
+            images = [future.result() for future in pending]
+            if index + 1 < len(chunks):
+                pending = [self._pool.submit(self._load_image, path) for path in chunks[index + 1]]
+
+            inputs = self.processor(images=images, return_tensors="pt")
+            embeddings[start:start + len(images)] = self.backend.run(inputs)
+            start += len(images)
+
+        return embeddings
+
+    def _load_image(self, path: str) -> Image.Image:
+        """
+        Decode an image already reduced to about CLIP's input size.
+
+        JPEGs are decoded at a reduced scale via draft mode; other formats
+        are box-reduced by an integer factor. Either way the shortest side
+        stays at or above the model's input size, so the processor's own
+        resize and crop see the same framing as before.
+        """
+        with Image.open(path) as image:
+            width, height = image.size
+            scale = self.input_size / min(width, height)
+            if scale < 1:
+                image.draft('RGB', (int(width * scale) + 1, int(height * scale) + 1))
+            image = image.convert('RGB')
+
+        factor = min(image.size) // self.input_size
+        if factor >= 2:
+            image = image.reduce(factor)
+        return image
+
+    def _parity_inputs(self) -> List[Dict[str, Any]]:
+        """Synthetic slide-like images (flat background, shapes, noise) for the backend parity check."""
+        rng = np.random.default_rng(0)
+        images = []
+        for _ in range(4):
+            pixels = np.full((self.input_size, self.input_size * 16 // 9, 3), rng.integers(0, 256, 3), dtype=np.uint8)
+            top, left = rng.integers(0, self.input_size // 2, 2)
+            pixels[top:top + self.input_size // 3, left:left + self.input_size // 2] = rng.integers(0, 256, 3)
+            pixels = np.clip(pixels + rng.normal(0, 8, pixels.shape), 0, 255).astype(np.uint8)
+            images.append(Image.fromarray(pixels))
+        return [dict(self.processor(images=images, return_tensors="pt"))]
+
+    def _file_stat(self, path: str):
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    def _input_size(self) -> int:
+        """Shortest side CLIP's processor resizes images to."""
+        image_processor = getattr(self.processor, 'image_processor', self.processor)
+        size = image_processor.size
+        return size.get('shortest_edge') or size.get('height') or 224
+
     def generate_embeddings(self, image_paths: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of images.
         """
-        # Load and preprocess images
-        images = [Image.open(path) for path in image_paths]
-        inputs = self.processor(images=images, return_tensors="pt", padding=True)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        
-        # Generate embeddings
-        with torch.no_grad():
-            image_features = self.model.get_image_features(**inputs)
-            image_features = image_features / image_features.norm(dim=1, keepdim=True)
-        
-        return image_features.cpu().numpy().tolist()
+        return self.encode(image_paths).tolist()
 
     def generate_embedding(self, image_path: str) -> List[float]:
         """
@@ -47,6 +199,8 @@ class ImageEmbedder:
     def compute_similarity(self, image_path1: str, image_path2: str) -> float:
         """
         Compute similarity between two images.
+
+        Images embedded before are not run through CLIP again.
         """
-        embeddings = self.generate_embeddings([image_path1, image_path2])
-        return np.dot(embeddings[0], embeddings[1]) 
\ No newline at end of file
+        embeddings = self.encode([image_path1, image_path2])
+        return float(np.dot(embeddings[0], embeddings[1]))
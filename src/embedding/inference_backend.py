@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+import copy
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+def mean_pooling(token_embeddings: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """Average token embeddings over the non-padding positions."""
+    input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
+    return torch.sum(token_embeddings * input_mask_expanded, 1) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+
+class MeanPooledEncoder(torch.nn.Module):
+    """Text encoder returning mean-pooled sentence embeddings, so every backend runs the same graph."""
+
+    input_names = ["input_ids", "attention_mask"]
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
+        return mean_pooling(outputs[0], attention_mask)
+
+class NormalizedImageEncoder(torch.nn.Module):
+    """CLIP image tower returning L2-normalized image embeddings."""
+
+    input_names = ["pixel_values"]
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        features = self.model.get_image_features(pixel_values=pixel_values)
+        if not isinstance(features, torch.Tensor):
+            # transformers 5 returns the projected embeddings as pooler_output
+            features = features.pooler_output
+        return features / features.norm(dim=1, keepdim=True)
+
+class InferenceBackend(ABC):
+    """
+    Runs an encoder module on named input tensors and returns a float32
+    matrix with one embedding per input row.
+    """
+
+    name = None
+
+    def __init__(self, module: torch.nn.Module, device: str = "cpu"):
+        self.module = module
+        self.device = device
+        self.input_names = module.input_names
+
+    @abstractmethod
+    def run(self, inputs: Dict[str, Any]) -> np.ndarray:
+        ...
+
+    def _select(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop inputs the encoder does not take (e.g. BERT's all-zero token_type_ids)."""
+        return {name: inputs[name] for name in self.input_names}
+
+class TorchBackend(InferenceBackend):
+    """The reference full-precision PyTorch path."""
+
+    name = "torch"
+
+    def __init__(self, module: torch.nn.Module, device: str = "cpu"):
+        super().__init__(module.to(device).eval(), device)
+
+    def run(self, inputs: Dict[str, Any]) -> np.ndarray:
+        inputs = {name: torch.as_tensor(value).to(self.device) for name, value in self._select(inputs).items()}
+        with torch.no_grad():
+            return self.module(**inputs).float().cpu().numpy()
+
+class DynamicInt8Backend(TorchBackend):
+    """
+    PyTorch with dynamic int8 quantization of every Linear layer.
+
+    Weights are quantized once at load time and activations per batch, so
+    no calibration data is needed. CPU only: a CPU copy of the module is
+    quantized, leaving the original on its device.
+    """
+
+    name = "torch-int8"
+
+    def __init__(self, module: torch.nn.Module, device: str = "cpu"):
+        quantized = torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(module).cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        super().__init__(quantized, "cpu")
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime running a graph exported from the encoder module.
+
+    The graph is exported to `path` on first use and reused afterwards;
+    delete the file to re-export after changing the model. `threads` sets
+    ONNX Runtime's intra-op thread count (0 lets it decide).
+    """
+
+    name = "onnx"
+
+    def __init__(self, module: torch.nn.Module, path: str, example_inputs: Dict[str, torch.Tensor],
+                 threads: int = 0):
+        import onnxruntime
+
+        super().__init__(module, "cpu")
+        if not os.path.exists(path):
+            self.export(module, path, example_inputs)
+        # The session holds its own weights
+        self.module = None
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.path = path
+
+    @staticmethod
+    def export(module: torch.nn.Module, path: str, example_inputs: Dict[str, torch.Tensor]):
+        """Export a CPU copy of the module with dynamic batch (and sequence) axes, writing atomically."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        names = list(example_inputs)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} if example_inputs[name].dim() == 2 else {0: "batch"}
+                        for name in names}
+        dynamic_axes["embeddings"] = {0: "batch"}
+
+        temp_path = f"{path}.tmp{os.getpid()}"
+        with torch.no_grad():
+            torch.onnx.export(
+                copy.deepcopy(module).cpu().eval(), tuple(example_inputs[name] for name in names), temp_path,
+                input_names=names, output_names=["embeddings"], dynamic_axes=dynamic_axes,
+                opset_version=17, dynamo=False
+            )
+        os.replace(temp_path, path)
+        logger.info("Exported ONNX graph to %s", path)
+
+    def run(self, inputs: Dict[str, Any]) -> np.ndarray:
+        feeds = {}
+        for name, value in self._select(inputs).items():
+            value = value.cpu().numpy() if isinstance(value, torch.Tensor) else np.asarray(value)
+            feeds[name] = value.astype(np.int64) if value.dtype.kind in "iu" else value.astype(np.float32)
+        return self.session.run(None, feeds)[0].astype(np.float32, copy=False)
+
+def onnx_path(model_dir: str, model_name: str, kind: str) -> str:
+    return os.path.join(model_dir, f"{re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)}-{kind}.onnx")
+
+def create_backend(name: str, module: torch.nn.Module, device: str = "cpu", threads: int = 0,
+                   onnx_file: str = None, example_inputs: Dict[str, torch.Tensor] = None) -> InferenceBackend:
+    """
+    Build the named backend ("torch", "torch-int8" or "onnx") around an encoder module.
+
+    `threads` > 0 also sets PyTorch's intra-op thread count for the
+    PyTorch backends (a process-wide setting).
+    """
+    if name in ("torch", "torch-int8") and threads:
+        torch.set_num_threads(threads)
+    if name == "torch":
+        return TorchBackend(module, device)
+    if name == "torch-int8":
+        return DynamicInt8Backend(module, device)
+    if name == "onnx":
+        return OnnxBackend(module, onnx_file, example_inputs, threads=threads)
+    raise ValueError(f"Unknown inference backend: {name} (expected one of {', '.join(BACKENDS)})")
+
+def check_parity(reference: InferenceBackend, candidate: InferenceBackend, batches: List[Dict[str, Any]],
+                 tolerance: float = 0.99) -> float:
+    """
+    Compare a backend's embeddings with the reference backend's.
+
+    Returns the lowest cosine similarity between corresponding rows and
+    raises ValueError when it falls below `tolerance`.
+    """
+    worst = 1.0
+    for inputs in batches:
+        expected = reference.run(inputs)
+        actual = candidate.run(inputs)
+        cosine = np.sum(expected * actual, axis=1) / (
+            np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1) + 1e-12)
+        worst = min(worst, float(cosine.min()))
+    if worst < tolerance:
+        raise ValueError(f"{candidate.name} backend parity check failed: "
+                         f"min cosine {worst:.4f} < {tolerance}")
+    return worst
+
+def load_backend(config: Dict[str, Any], section: str, module: torch.nn.Module, model_name: str, kind: str,
+                 device: str, parity_inputs: Callable[[], List[Dict[str, Any]]]) -> InferenceBackend:
+    """
+    Build the backend configured for one embedder.
+
+    The `inference` section of embedding_config.json sets the defaults,
+    the embedder's own section may set `backend`, and the
+    `EMBEDDING_BACKEND` environment variable overrides both. Unless
+    `check_parity` is off, a non-reference backend is checked against the
+    PyTorch path on `parity_inputs()` and replaced by it if it drifts past
+    `parity_tolerance`. `module` itself is left in place on `device`.
+    """
+    settings = {
+        'backend': 'torch',
+        'threads': 0,
+        'model_dir': 'data/models',
+        'check_parity': True,
+        'parity_tolerance': 0.99
+    }
+    settings.update(config.get('inference', {}))
+    name = os.getenv("EMBEDDING_BACKEND", config.get(section, {}).get('backend', settings['backend']))
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name} (expected one of {', '.join(BACKENDS)})")
+    if name == "torch":
+        return create_backend(name, module, device, settings['threads'])
+
+    batches = parity_inputs()
+    reference = TorchBackend(module, device) if settings['check_parity'] else None
+    backend = create_backend(
+        name, module, device, settings['threads'],
+        onnx_file=onnx_path(settings['model_dir'], model_name, kind),
+        example_inputs={key: torch.as_tensor(value) for key, value in batches[0].items()
+                        if key in module.input_names}
+    )
+    if reference is None:
+        return backend
+
+    try:
+        worst = check_parity(reference, backend, batches, settings['parity_tolerance'])
+    except ValueError as e:
+        logger.warning("%s; falling back to the torch backend", e)
+        return reference
+    logger.info("%s backend for %s: min cosine %.4f against torch", name, kind, worst)
+    return backend
@@ -0,0 +1,108 @@
+from collections import deque
+from concurrent.futures import Future
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+class MicroBatcher:
+    """
+    Collect concurrent single-text embedding requests into one model batch.
+
+    Callers block in `embed` while a background thread gathers requests
+    for up to `max_wait_ms` or until `max_batch_size` are queued, runs them
+    through `encode` in one call and hands each caller its own row.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, metrics_window: int = 10000):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Metrics: batch-size histogram and a window of recent queue waits
+        self._metrics_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = {}
+        self._waits = deque(maxlen=metrics_window)
+
+    @classmethod
+    def from_config(cls, config: Dict, encode: Callable[[List[str]], np.ndarray]) -> Optional["MicroBatcher"]:
+        """Build a batcher from the `query_batching` section of embedding_config.json."""
+        batching_config = config.get('query_batching', {})
+        if not batching_config.get('enabled', False):
+            return None
+        return cls(
+            encode,
+            max_batch_size=batching_config.get('max_batch_size', 32),
+            max_wait_ms=batching_config.get('max_wait_ms', 5.0)
+        )
+
+    def embed(self, text: str) -> np.ndarray:
+        """Queue one text and wait for its embedding."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, time.perf_counter(), future))
+        return future.result()
+
+    def _ensure_started(self):
+        # The worker starts on first use so idle embedders (e.g. during ingestion) cost nothing
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            started = time.perf_counter()
+            self._record(len(batch), [started - queued for _, queued, _ in batch])
+
+            try:
+                vectors = self.encode([text for text, _, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, _, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+    def _record(self, size: int, waits: List[float]):
+        with self._metrics_lock:
+            self.batches += 1
+            self.items += size
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            self._waits.extend(waits)
+
+    def stats(self) -> Dict[str, object]:
+        """Return the batch-size distribution and queue-wait percentiles (ms)."""
+        with self._metrics_lock:
+            waits = np.array(self._waits, dtype=np.float64) * 1000
+            stats = {
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+                'batch_sizes': dict(sorted(self.batch_sizes.items()))
+            }
+        for pct in (50, 90, 99):
+            stats[f'queue_wait_p{pct}_ms'] = float(np.percentile(waits, pct)) if len(waits) else 0.0
+        return stats
@@ -1,46 +1,112 @@
-from sentence_transformers import SentenceTransformer
-import torch
 from typing import List, Dict, Any
-import json
 import os
 import numpy as np
-from transformers import AutoTokenizer, AutoModel
+from src.embedding.embedding_cache import EmbeddingCache
+from src.embedding.micro_batcher import MicroBatcher
+from src.utils.model_registry import load_config
+
+PARITY_TEXTS = [
+    "Quarterly revenue grew in every region",
+    "Roadmap: platform reliability, international expansion and a simpler pricing model for customers",
+    "Thank you"
+]
+
+# Bump when tokenization or pooling changes, so cached vectors are recomputed
+PREPROCESSING_VERSION = "1"
 
 class TextEmbedder:
     def __init__(self, config_path: str = "config/embedding_config.json"):
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
+        # torch and transformers are imported here, not at module import
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+        from src.embedding.inference_backend import MeanPooledEncoder, load_backend
+
+        config = load_config(config_path)
+
         self.model_name = config['text_embedding']['model']
         self.batch_size = config['text_embedding']['batch_size']
+        self.max_length = config['text_embedding'].get('max_length', 512)
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        
+
         # Initialize model and tokenizer
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
         self.model = AutoModel.from_pretrained(self.model_name).to(self.device)
-        
+        self.dimensions = self.model.config.hidden_size
+
         # Set model to evaluation mode
         self.model.eval()
 
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        # PyTorch, dynamic int8 or ONNX Runtime, per the `inference` config
+        self.backend = load_backend(
+            config, 'text_embedding', MeanPooledEncoder(self.model), self.model_name, 'text', self.device,
+            lambda: [dict(self.tokenizer(PARITY_TEXTS, padding=True, truncation=True,
+                                         max_length=self.max_length, return_tensors="pt"))]
+        )
+        # int8 and ONNX backends run on their own copy of the weights
+        if self.backend.name != "torch":
+            self.model = None
+
+        # Optional on-disk cache shared by all embedder instances and workers
+        self.cache = EmbeddingCache.from_config(config)
+        self.cache_namespace = EmbeddingCache.namespace(
+            self.model_name, self.backend.name, f"{PREPROCESSING_VERSION}:max_length={self.max_length}"
+        )
+
+        # Optional micro-batching of concurrent single-query requests; ad-hoc
+        # queries bypass the corpus cache (QueryProcessor keeps its own LRU)
+        self.batcher = MicroBatcher.from_config(config, self._encode_uncached)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
         """
-        Generate embeddings for a list of texts.
+        Generate embeddings for a list of texts as a float32 matrix.
+
+        When the embedding cache is enabled only texts that are not cached
+        are sent to the model.
+        """
+        if self.cache is None or not texts:
+            return self._encode_uncached(texts)
+
+        keys = [EmbeddingCache.text_key(self.cache_namespace, text) for text in texts]
+        vectors = self.cache.lookup(
+            keys,
+            lambda positions: self._encode_uncached([texts[i] for i in positions])
+        )
+        return np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
         """
-        # Tokenize texts
+        Run the model over a list of texts.
+
+        Inputs are sorted by token length and run in chunks of `batch_size`,
+        so each chunk is only padded to its own longest member. Rows are
+        returned in the original input order.
+        """
+        embeddings = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        if not texts:
+            return embeddings
+
+        # Tokenize once without padding to get per-text lengths
         encoded = self.tokenizer(
             texts,
-            padding=True,
             truncation=True,
-            max_length=512,
-            return_tensors="pt"
-        ).to(self.device)
-        
-        # Generate embeddings
-        with torch.no_grad():
-            outputs = self.model(**encoded)
-            embeddings = self._mean_pooling(outputs, encoded['attention_mask'])
-        
-        return embeddings.cpu().numpy().tolist()
+            max_length=self.max_length
+        )
+        lengths = [len(ids) for ids in encoded['input_ids']]
+        order = np.argsort(lengths, kind='stable')
+
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in chunk]
+            batch = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+            embeddings[chunk] = self.backend.run(batch)
+
+        return embeddings
+
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts.
+        """
+        return self.encode(texts).tolist()
 
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -48,10 +114,20 @@ class TextEmbedder:
         """
         return self.generate_embeddings([text])[0]
 
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Generate the embedding for a search query.
+
+        Queries are not written to the embedding cache. With query batching
+        enabled, concurrent calls share one model batch.
+        """
+        if self.batcher is None:
+            return self._encode_uncached([text])[0].tolist()
+        return self.batcher.embed(text).tolist()
+
     def _mean_pooling(self, model_output, attention_mask):
         """
         Perform mean pooling on token embeddings.
         """
-        token_embeddings = model_output[0]
-        input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-        return torch.sum(token_embeddings * input_mask_expanded, 0) / torch.clamp(input_mask_expanded.sum(0), min=1e-9) 
\ No newline at end of file
+        from src.embedding.inference_backend import mean_pooling
+        return mean_pooling(model_output[0], attention_mask)
@@ -1,131 +1,205 @@
 from typing import List, Dict, Any
-import json
 import os
-from openai import OpenAI
+import re
+import threading
 import numpy as np
-from sklearn.cluster import KMeans
-from sentence_transformers import SentenceTransformer
+from src.embedding.completion_batcher import CompletionBatcher
+from src.embedding.topic_model import topic_model_from_config
+from src.utils.model_registry import get_text_embedder, load_config
+
+LABEL_INSTRUCTIONS = (
+    "Generate a concise topic that represents each numbered group of sentences below. "
+    "Each topic should be 1-3 words, given as a JSON string."
+)
+
+CENTROID_INSTRUCTIONS = (
+    "Each numbered item below lists slides from one cluster of a presentation library. "
+    "Generate a concise topic of 1-3 words that covers the cluster, given as a JSON string."
+)
+
+EXTRACT_INSTRUCTIONS = (
+    "Extract up to {max_topics} main topics from each numbered text below. "
+    "For each topic, provide a confidence score between 0 and 1. "
+    "Each answer is a JSON array of [topic, confidence] pairs."
+)
+
+_punkt_lock = threading.Lock()
+_punkt_checked = False
 
 class TopicAutoTagger:
     def __init__(self, config_path: str = "config/embedding_config.json"):
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
+        config = load_config(config_path)
+
+        self.config_path = config_path
         self.model = config['topic_extraction']['model']
         self.max_topics = config['topic_extraction']['max_topics']
         self.confidence_threshold = config['topic_extraction']['confidence_threshold']
-        self.client = OpenAI()
-        
-        # Initialize sentence transformer for clustering
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self._client = None
+
+        # Batched, rate-limited and cached chat completions
+        self.completions = CompletionBatcher.from_config(config, lambda: self.client)
+
+        # Corpus-level topics; slides are tagged per slide until it has named topics
+        self.topic_model = topic_model_from_config(config)
+
+    @property
+    def client(self):
+        """OpenAI client, created (and openai imported) on first use."""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI()
+        return self._client
+
+    @property
+    def embedder(self):
+        """The process-wide TextEmbedder (same MiniLM model) used for clustering."""
+        return get_text_embedder(self.config_path)
 
     def extract_topics(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract topics from text using LLM and clustering.
         """
-        # Split text into sentences
-        sentences = self._split_into_sentences(text)
-        
-        if len(sentences) < self.max_topics:
-            return self._extract_topics_llm(text)
-        
-        # Generate embeddings for sentences
-        embeddings = self.embedder.encode(sentences)
-        
-        # Cluster sentences
-        clusters = self._cluster_sentences(embeddings)
-        
-        # Extract topics from clusters
-        topics = self._extract_topics_from_clusters(sentences, clusters)
-        
-        return topics
+        return self.extract_topics_batch([text])[0]
+
+    def extract_topics_batch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Extract topics for many slides.
+
+        Once the corpus topic model has named topics, slides are tagged with
+        their nearest topics without any LLM call; until then each slide's
+        own topics are extracted.
+        """
+        if self.topic_model is not None and self.topic_model.ready:
+            return self.tag_embeddings(self.embedder.encode(texts))
+        return self.extract_slide_topics(texts)
+
+    def tag_embeddings(self, embeddings) -> List[List[Dict[str, Any]]]:
+        """Corpus topics of already embedded slides (empty lists while there is no topic model)."""
+        if self.topic_model is None:
+            return [[] for _ in range(len(embeddings))]
+        return self.topic_model.tag(embeddings)
+
+    def update_topic_model(self, vector_store, refit: bool = False) -> Dict[str, Any]:
+        """
+        Fold new slides from `vector_store` into the corpus topic model (or
+        refit it), name new or drifted topics in batched prompts and save it.
+        """
+        if self.topic_model is None:
+            raise ValueError("The corpus topic model is disabled in the topic_model config")
+        result = self.topic_model.sync(vector_store, labeler=self._label_centroids, refit=refit)
+        self.topic_model.save()
+        return result
+
+    def _label_centroids(self, groups: List[str]) -> List[str]:
+        return self.completions.run('centroid', groups, CENTROID_INSTRUCTIONS, _parse_label)
+
+    def extract_slide_topics(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Extract each slide's own topics with as few LLM calls as possible.
+
+        Longer texts are split into sentences and clustered; the clusters of
+        every slide are named together in batched prompts. Short texts ask
+        the LLM for topics directly, also many texts per prompt. Prompts run
+        concurrently within the configured limits and answers are cached.
+        """
+        sentences = [self._split_into_sentences(text) for text in texts]
+        long_ids = [i for i, slide in enumerate(sentences) if len(slide) >= self.max_topics]
+        short_ids = [i for i, slide in enumerate(sentences) if 0 < len(slide) < self.max_topics]
+
+        # Embed the sentences of all long texts in one call, then cluster each text
+        groups, owners = [], []
+        if long_ids:
+            embeddings = self.embedder.encode([sentence for i in long_ids for sentence in sentences[i]])
+            # Unit-normalized like SentenceTransformer's MiniLM
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            offset = 0
+            for i in long_ids:
+                count = len(sentences[i])
+                clusters = self._cluster_sentences(embeddings[offset:offset + count])
+                offset += count
+                for members in self._cluster_members(sentences[i], clusters):
+                    groups.append(members)
+                    owners.append(i)
+
+        results = [[] for _ in texts]
+        labels = self.completions.run('label', ["\n".join(members) for members in groups],
+                                      LABEL_INSTRUCTIONS, _parse_label)
+        for members, owner, label in zip(groups, owners, labels):
+            if label:
+                results[owner].append({
+                    'topic': label,
+                    'confidence': self._calculate_cluster_confidence(members)
+                })
+
+        extracted = self.completions.run(
+            'extract', [texts[i] for i in short_ids],
+            EXTRACT_INSTRUCTIONS.format(max_topics=self.max_topics), _parse_topic_list
+        )
+        for i, topics in zip(short_ids, extracted):
+            # Filter by confidence threshold
+            results[i] = [t for t in topics or [] if t['confidence'] >= self.confidence_threshold]
+
+        return results
 
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences."""
         import nltk
-        nltk.download('punkt', quiet=True)
-        return nltk.sent_tokenize(text)
+        _ensure_punkt()
+        try:
+            sentences = nltk.sent_tokenize(text)
+        except LookupError:
+            # Punkt could not be downloaded (e.g. offline): split on line breaks and sentence ends
+            sentences = re.split(r'(?<=[.!?])\s+|\n+', text)
+        return [sentence.strip() for sentence in sentences if sentence.strip()]
 
     def _cluster_sentences(self, embeddings: np.ndarray) -> np.ndarray:
         """Cluster sentences using K-means."""
+        from sklearn.cluster import KMeans
         kmeans = KMeans(n_clusters=self.max_topics, random_state=42)
         return kmeans.fit_predict(embeddings)
 
-    def _extract_topics_from_clusters(self, sentences: List[str], clusters: np.ndarray) -> List[Dict[str, Any]]:
-        """Extract topics from sentence clusters."""
-        topics = []
+    def _cluster_members(self, sentences: List[str], clusters: np.ndarray) -> List[List[str]]:
+        """Group sentences by cluster, skipping empty clusters."""
+        members = []
         for cluster_id in range(self.max_topics):
             cluster_sentences = [s for s, c in zip(sentences, clusters) if c == cluster_id]
             if cluster_sentences:
-                # Use LLM to generate topic from cluster
-                topic = self._generate_topic_from_cluster(cluster_sentences)
-                if topic:
-                    topics.append({
-                        'topic': topic,
-                        'confidence': self._calculate_cluster_confidence(cluster_sentences)
-                    })
-        return topics
-
-    def _generate_topic_from_cluster(self, sentences: List[str]) -> str:
-        """Generate topic from cluster using LLM."""
-        prompt = f"""
-        Generate a concise topic that represents the following sentences:
-        {chr(10).join(sentences)}
-        Topic should be 1-3 words.
-        """
-        
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a topic extraction assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        return response.choices[0].message.content.strip()
+                members.append(cluster_sentences)
+        return members
 
     def _calculate_cluster_confidence(self, sentences: List[str]) -> float:
         """Calculate confidence score for a cluster."""
         # Simple implementation based on cluster size and coherence
         return min(1.0, len(sentences) / 5)
 
-    def _extract_topics_llm(self, text: str) -> List[Dict[str, Any]]:
-        """Extract topics using LLM for short texts."""
-        prompt = f"""
-        Extract up to {self.max_topics} main topics from the following text.
-        For each topic, provide a confidence score between 0 and 1.
-        Text: {text}
-        """
+def _ensure_punkt():
+    """Make the punkt sentence tokenizer available, downloading it at most once per process."""
+    global _punkt_checked
+    if _punkt_checked:
+        return
+    with _punkt_lock:
+        if not _punkt_checked:
+            import nltk
+            for resource in ('punkt', 'punkt_tab'):
+                try:
+                    nltk.data.find(f'tokenizers/{resource}')
+                except LookupError:
+                    nltk.download(resource, quiet=True)
+            _punkt_checked = True
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a topic extraction assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+def _parse_label(answer: Any) -> str:
+    label = str(answer).strip()
+    if not label:
+        raise ValueError("empty topic")
+    return label
 
-        # Parse response and filter by confidence threshold
-        topics = self._parse_topics(response.choices[0].message.content)
-        return [t for t in topics if t['confidence'] >= self.confidence_threshold]
-
-    def _parse_topics(self, response: str) -> List[Dict[str, Any]]:
-        """Parse topics from LLM response."""
-        # This is a simple implementation. You might want to enhance it
-        # based on your specific needs and response format.
-        lines = response.strip().split('\n')
-        topics = []
-        
-        for line in lines:
-            if ':' in line:
-                topic, confidence = line.split(':')
-                try:
-                    confidence = float(confidence.strip())
-                    topics.append({
-                        'topic': topic.strip(),
-                        'confidence': confidence
-                    })
-                except ValueError:
-                    continue
-        
-        return topics 
\ No newline at end of file
+def _parse_topic_list(answer: Any) -> List[Dict[str, Any]]:
+    """Parse one text's topics, given as [topic, confidence] pairs or {"topic", "confidence"} objects."""
+    topics = []
+    for entry in answer:
+        if isinstance(entry, dict):
+            topic, confidence = entry.get('topic'), entry.get('confidence')
+        else:
+            topic, confidence = entry
+        topics.append({'topic': str(topic).strip(), 'confidence': float(confidence)})
+    return topics
@@ -0,0 +1,372 @@
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Callable, Iterable, Optional
+import numpy as np
+from src.storage.local_index import normalize_rows, spherical_kmeans
+from src.storage.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+def slide_id_hashes(slide_ids: List[str]) -> np.ndarray:
+    """64-bit hashes of slide ids, a compact record of which slides a model has seen."""
+    return np.array([int.from_bytes(hashlib.blake2b(slide_id.encode('utf-8'), digest_size=8).digest(), 'big')
+                     for slide_id in slide_ids], dtype=np.uint64)
+
+def _contains(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Membership of `values` in the sorted array `sorted_values`."""
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[positions] == values
+
+class CorpusTopicModel:
+    """
+    Topic model over the embeddings of every slide in the corpus.
+
+    Slides are clustered with spherical mini-batch k-means: `fit` seeds the
+    centroids from a sample and then streams the whole corpus through in
+    batches, and `partial_fit` folds new slides into the nearest centroids
+    (each centroid moves by the running mean of its members). Every
+    centroid keeps the texts of its closest slides and is named once from
+    them; it is only named again after it has drifted. Slides are tagged
+    by a single matrix product against the centroids, with no LLM call.
+
+    The model asks for a full refit once the corpus has grown by
+    `refit_growth` since the last fit, or when new slides sit noticeably
+    further from their centroids than the corpus did at fit time. Refitted
+    centroids that match an old centroid keep its label.
+    """
+
+    def __init__(self, path: str = None, n_clusters: int = 64, max_topics: int = 3,
+                 min_similarity: float = 0.3, relabel_threshold: float = 0.9, refit_growth: float = 1.0,
+                 drift_tolerance: float = 0.05, exemplars: int = 5, batch_size: int = 1024,
+                 sample_size: int = 65536, seed: int = 0):
+        self.path = path
+        self.n_clusters = n_clusters
+        self.max_topics = max_topics
+        self.min_similarity = min_similarity
+        self.relabel_threshold = relabel_threshold
+        self.refit_growth = refit_growth
+        self.drift_tolerance = drift_tolerance
+        self.exemplar_count = exemplars
+        self.batch_size = batch_size
+        self.sample_size = sample_size
+        self.seed = seed
+
+        self.centroids = None
+        self.counts = np.zeros(0, dtype=np.int64)
+        # Label of each centroid and the centroid it was given for (None until named)
+        self.labels = []
+        self.labeled_centroids = None
+        # (similarity, text) of each centroid's closest slides, best first
+        self.exemplars = []
+        # Sorted hashes of the slide ids folded in so far (see slide_id_hashes)
+        self.seen_ids = np.zeros(0, dtype=np.uint64)
+        self.fitted_size = 0
+        self.fit_similarity = 0.0
+        self.recent_similarity = 0.0
+        self._lock = threading.RLock()
+
+        if path and os.path.exists(os.path.join(path, "model.json")):
+            self.load()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the model has centroids and at least one of them is named."""
+        return self.centroids is not None and any(self.labels)
+
+    @property
+    def size(self) -> int:
+        """Number of slides folded into the centroids."""
+        return int(self.counts.sum())
+
+    @property
+    def needs_refit(self) -> bool:
+        if self.centroids is None:
+            return False
+        if self.size > self.fitted_size * (1 + self.refit_growth):
+            return True
+        return self.fit_similarity - self.recent_similarity > self.drift_tolerance
+
+    def fit(self, embeddings, texts: List[str]):
+        """
+        Recluster from scratch: seed centroids with k-means on a sample, then
+        make one mini-batch pass over all vectors in random order.
+        """
+        vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if not len(vectors):
+            return
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), self.sample_size), replace=False)]
+        clusters = min(self.n_clusters, len(vectors))
+
+        with self._lock:
+            old_labels, old_labeled = self.labels, self.labeled_centroids
+            self.centroids = spherical_kmeans(sample, clusters, seed=self.seed)
+            self.counts = np.zeros(clusters, dtype=np.int64)
+            self.labels = [None] * clusters
+            self.labeled_centroids = np.zeros_like(self.centroids)
+            self.exemplars = [[] for _ in range(clusters)]
+
+            order = rng.permutation(len(vectors))
+            similarity = np.empty(len(vectors), dtype=np.float32)
+            for start in range(0, len(order), self.batch_size):
+                rows = order[start:start + self.batch_size]
+                similarity[rows] = self._update(vectors[rows], [texts[row] for row in rows])
+
+            self.fitted_size = len(vectors)
+            self.fit_similarity = self.recent_similarity = float(similarity.mean())
+            if old_labeled is not None:
+                self._inherit_labels(old_labels, old_labeled)
+        logger.info("Fitted %d topic centroids over %d slides", clusters, len(vectors))
+
+    def partial_fit(self, embeddings, texts: List[str]):
+        """Fold new slides into their nearest centroids (fits from scratch if there are none yet)."""
+        vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if not len(vectors):
+            return
+        with self._lock:
+            if self.centroids is None:
+                self.fit(vectors, texts)
+                return
+            for start in range(0, len(vectors), self.batch_size):
+                similarity = self._update(vectors[start:start + self.batch_size], texts[start:start + self.batch_size])
+                # Exponential moving average of how well new slides fit the model
+                self.recent_similarity = 0.8 * self.recent_similarity + 0.2 * float(similarity.mean())
+
+    def label(self, labeler: Callable[[List[str]], List[Optional[str]]]) -> int:
+        """
+        Name centroids that have no label yet or have drifted from the one
+        they were named for. `labeler` gets one text per centroid (its
+        closest slides) and returns a label or None for each, so all
+        centroids are named in one batched call. Returns how many changed.
+        """
+        with self._lock:
+            if self.centroids is None:
+                return 0
+            drift = np.sum(self.centroids * self.labeled_centroids, axis=1)
+            stale = [c for c in range(len(self.labels))
+                     if self.exemplars[c] and (self.labels[c] is None or drift[c] < self.relabel_threshold)]
+            groups = ["\n".join(text[:300] for _, text in self.exemplars[c]) for c in stale]
+
+        named = 0
+        for cluster, label in zip(stale, labeler(groups) if groups else []):
+            if label:
+                with self._lock:
+                    self.labels[cluster] = label
+                    self.labeled_centroids[cluster] = self.centroids[cluster]
+                named += 1
+        return named
+
+    def tag(self, embeddings, max_topics: int = None) -> List[List[Dict[str, Any]]]:
+        """
+        Topics of each embedding: the labels of its nearest named centroids
+        with cosine similarity of at least `min_similarity`, as
+        {topic, confidence} dicts, best first.
+        """
+        max_topics = max_topics or self.max_topics
+        vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1))
+        with self._lock:
+            if not self.ready or not len(vectors):
+                return [[] for _ in range(len(vectors))]
+            named = np.array([label is not None for label in self.labels])
+            similarity = vectors @ self.centroids.T
+            labels = self.labels
+
+        similarity[:, ~named] = -np.inf
+        count = min(max_topics, similarity.shape[1])
+        top = np.argpartition(-similarity, count - 1, axis=1)[:, :count]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for clusters, scores in zip(top, top_scores):
+            topics, seen = [], set()
+            for cluster, score in zip(clusters, scores):
+                # Clusters sharing a label count once, at their best similarity
+                if score < self.min_similarity or labels[cluster] in seen:
+                    continue
+                seen.add(labels[cluster])
+                topics.append({'topic': labels[cluster], 'confidence': float(score)})
+            results.append(topics)
+        return results
+
+    def sync(self, vector_store: VectorStore, labeler: Callable[[List[str]], List[Optional[str]]] = None,
+             refit: bool = False) -> Dict[str, Any]:
+        """
+        Bring the model up to date with a vector store: stream the corpus
+        once, folding in slides not seen yet batch by batch, or refit on the
+        whole corpus when asked to or when the model reports it needs it,
+        then name new or drifted centroids. Between syncs only a 64-bit
+        hash per slide id is kept; the corpus is only held in memory for a
+        refit.
+        """
+        with self._lock:
+            previous = self.seen_ids
+            refitted = refit or self.centroids is None or self.needs_refit
+            if refitted:
+                seen = self._refit(vector_store)
+            else:
+                hashes = []
+                slides = iter(vector_store.iter_slides(self.batch_size))
+                while True:
+                    batch = list(itertools.islice(slides, self.batch_size))
+                    if not batch:
+                        break
+                    batch_hashes = slide_id_hashes([slide_id for slide_id, _, _ in batch])
+                    hashes.append(batch_hashes)
+                    new = np.flatnonzero(~_contains(previous, batch_hashes))
+                    if len(new):
+                        self.partial_fit([batch[row][2] for row in new],
+                                         [batch[row][1].get("content") or "" for row in new])
+                seen = np.unique(np.concatenate(hashes)) if hashes else np.zeros(0, dtype=np.uint64)
+                refitted = self.needs_refit
+                if refitted:
+                    seen = self._refit(vector_store)
+            # Deleted slides drop out, so they count as new if they come back
+            self.seen_ids = seen
+            added = int((~_contains(previous, seen)).sum())
+
+        labeled = self.label(labeler) if labeler else 0
+        return {"added": added, "refit": refitted, "labeled": labeled}
+
+    def _refit(self, vector_store: VectorStore) -> np.ndarray:
+        """Fit on every slide in the store; returns the sorted hashes of their ids."""
+        ids, texts, vectors = [], [], []
+        for slide_id, properties, vector in vector_store.iter_slides(self.batch_size):
+            ids.append(slide_id)
+            texts.append(properties.get("content") or "")
+            vectors.append(vector)
+        self.fit(vectors, texts)
+        return np.unique(slide_id_hashes(ids))
+
+    def save(self, path: str = None):
+        path = path or self.path
+        if not path:
+            raise ValueError("No topic model path configured")
+
+        with self._lock:
+            if self.centroids is None:
+                return
+            os.makedirs(path, exist_ok=True)
+            arrays = {"centroids": self.centroids, "counts": self.counts, "labeled_centroids": self.labeled_centroids,
+                      "seen_ids": self.seen_ids}
+            for name, array in arrays.items():
+                np.save(os.path.join(path, f"{name}.tmp.npy"), array)
+                os.replace(os.path.join(path, f"{name}.tmp.npy"), os.path.join(path, f"{name}.npy"))
+            state = {
+                "labels": self.labels,
+                "exemplars": self.exemplars,
+                "fitted_size": self.fitted_size,
+                "fit_similarity": self.fit_similarity,
+                "recent_similarity": self.recent_similarity
+            }
+            with open(os.path.join(path, "model.tmp.json"), 'w') as f:
+                json.dump(state, f)
+            os.replace(os.path.join(path, "model.tmp.json"), os.path.join(path, "model.json"))
+            self.path = path
+
+    def load(self, path: str = None):
+        path = path or self.path
+        with open(os.path.join(path, "model.json"), 'r') as f:
+            state = json.load(f)
+
+        with self._lock:
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.counts = np.load(os.path.join(path, "counts.npy"))
+            self.labeled_centroids = np.load(os.path.join(path, "labeled_centroids.npy"))
+            self.labels = state["labels"]
+            self.exemplars = [[tuple(exemplar) for exemplar in cluster] for cluster in state["exemplars"]]
+            seen_path = os.path.join(path, "seen_ids.npy")
+            self.seen_ids = np.load(seen_path) if os.path.exists(seen_path) else np.zeros(0, dtype=np.uint64)
+            self.fitted_size = state["fitted_size"]
+            self.fit_similarity = state["fit_similarity"]
+            self.recent_similarity = state["recent_similarity"]
+            self.path = path
+
+    def _update(self, vectors: np.ndarray, texts: List[str]) -> np.ndarray:
+        """
+        One mini-batch step: move each centroid to the running mean of its
+        members and refresh its exemplars. Returns each vector's similarity
+        to its centroid before the step.
+        """
+        similarity = vectors @ self.centroids.T
+        assignments = np.argmax(similarity, axis=1)
+        best = similarity[np.arange(len(vectors)), assignments]
+
+        sizes = np.bincount(assignments, minlength=len(self.centroids))
+        sums = np.zeros_like(self.centroids)
+        np.add.at(sums, assignments, vectors)
+        touched = np.flatnonzero(sizes)
+        self.centroids[touched] = normalize_rows(
+            self.centroids[touched] * self.counts[touched, None] + sums[touched])
+        self.counts += sizes
+
+        for cluster in touched:
+            members = np.flatnonzero(assignments == cluster)
+            scores = vectors[members] @ self.centroids[cluster]
+            candidates = self.exemplars[cluster] + [(float(score), texts[row])
+                                                    for row, score in zip(members, scores) if texts[row]]
+            exemplars, seen = [], set()
+            for score, text in sorted(candidates, key=lambda exemplar: -exemplar[0]):
+                if text not in seen:
+                    seen.add(text)
+                    exemplars.append((score, text))
+                if len(exemplars) >= self.exemplar_count:
+                    break
+            self.exemplars[cluster] = exemplars
+        return best
+
+    def _inherit_labels(self, old_labels: List[Optional[str]], old_labeled: np.ndarray):
+        """Give refitted centroids the label of a named old centroid they still match."""
+        named = np.array([label is not None for label in old_labels])
+        if not named.any():
+            return
+        similarity = self.centroids @ old_labeled[named].T
+        names = [label for label in old_labels if label is not None]
+        nearest = np.argmax(similarity, axis=1)
+        for cluster, old in enumerate(nearest):
+            if similarity[cluster, old] >= self.relabel_threshold:
+                self.labels[cluster] = names[old]
+                self.labeled_centroids[cluster] = old_labeled[named][old]
+
+def topic_model_from_config(config: Dict[str, Any]) -> Optional[CorpusTopicModel]:
+    """Build the corpus topic model described by embedding_config.json, or None if it is disabled."""
+    settings = config.get('topic_model', {})
+    if not settings.get('enabled', True):
+        return None
+    return CorpusTopicModel(
+        settings.get('path', "data/topics"),
+        n_clusters=settings.get('n_clusters', 64),
+        max_topics=config.get('topic_extraction', {}).get('max_topics', 3),
+        min_similarity=settings.get('min_similarity', 0.3),
+        relabel_threshold=settings.get('relabel_threshold', 0.9),
+        refit_growth=settings.get('refit_growth', 1.0),
+        drift_tolerance=settings.get('drift_tolerance', 0.05),
+        exemplars=settings.get('exemplars', 5)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or update the corpus topic model and name its topics")
+    parser.add_argument("--config", default="config/embedding_config.json")
+    parser.add_argument("--refit", action="store_true", help="recluster the whole corpus")
+    args = parser.parse_args()
+
+    from src.utils.model_registry import get_topic_tagger, get_vector_store
+    logging.basicConfig(level=logging.INFO)
+    tagger = get_topic_tagger(args.config)
+    result = tagger.update_topic_model(get_vector_store(), refit=args.refit)
+    model = tagger.topic_model
+    print(f"Topic model: {len(model.labels)} topics ({sum(1 for label in model.labels if label)} named) "
+          f"over {model.size} slides, {result['added']} added, "
+          f"{'refitted' if result['refit'] else 'updated'}, {result['labeled']} named")
+
+if __name__ == "__main__":
+    main()
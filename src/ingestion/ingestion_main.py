@@ -1,18 +1,34 @@
+import argparse
+import itertools
+import multiprocessing
+import multiprocessing.connection
 import os
-from typing import List, Dict, Any
+import sys
+import time
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from pptx_parser import PPTXParser
 from pdf_parser import PDFParser
 from ocr_fallback import OCRProcessor
-from slide_renderer import SlideRenderer
+from slide_renderer import SlideRenderer, preview_url
+from ingestion_manifest import IngestionManifest, STAGES
+from office_converter import ConversionError, ConverterPool, UnoConverter, uno_available
+from slide_dedup import SlideDeduplicator
 
 class DocumentIngestionPipeline:
-    def __init__(self, upload_dir: str, output_dir: str):
+    def __init__(self, upload_dir: str, output_dir: str, converter=None, deduplicator: SlideDeduplicator = None,
+                 topic_tagger=None, render_workers: int = None, ocr_workers: int = None):
         self.upload_dir = upload_dir
         self.output_dir = output_dir
         self.pptx_parser = PPTXParser()
         self.pdf_parser = PDFParser()
         self.ocr_processor = OCRProcessor()
-        self.slide_renderer = SlideRenderer(os.path.join(output_dir, "rendered_images"))
+        # Image-only slides are OCR'd together, in windows of a few slides per OCR process
+        self.ocr_workers = ocr_workers or self.ocr_processor.config['workers'] or os.cpu_count() or 1
+        self.ocr_window = 2 * self.ocr_workers
+        self.slide_renderer = SlideRenderer(os.path.join(output_dir, "rendered_images"), converter,
+                                            workers=render_workers)
+        self.deduplicator = deduplicator
+        self.topic_tagger = topic_tagger
         
         # Create necessary directories
         os.makedirs(upload_dir, exist_ok=True)
@@ -23,71 +39,633 @@ class DocumentIngestionPipeline:
         """
         Process a document (PPTX or PDF) and return extracted data.
         """
+        slides = self.iter_document(file_path)
+        return {
+            'document_id': os.path.basename(file_path),
+            'slides': list(slides)
+        }
+
+    def iter_document(self, file_path: str,
+                      known_slides: Dict[int, Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process a document lazily, yielding one processed slide at a time.
+
+        Parsing and OCR advance a small window of slides at a time (the
+        window's image-only slides are OCR'd in parallel), so memory use
+        depends on the slides being held by the consumer rather than on the
+        size of the deck; page images go to disk. Slides found in `known_slides` (keyed by slide
+        number) are yielded as-is without running OCR again. With a
+        deduplicator, slides matching an already processed slide reuse its
+        OCR output and topics and carry a `duplicate_of` link to it. When the
+        document is processed from scratch (no `known_slides`), its earlier
+        fingerprints are dropped first, so a changed deck is never matched
+        against its own previous version.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
         file_ext = os.path.splitext(file_path)[1].lower()
-        
+
         # Parse document based on type
         if file_ext in self.pptx_parser.supported_extensions:
-            slides_data = self.pptx_parser.parse(file_path)
-            rendered_paths = self.slide_renderer.render_slides(file_path)
+            slides_data = self.pptx_parser.iter_slides(file_path)
         elif file_ext in self.pdf_parser.supported_extensions:
-            slides_data = self.pdf_parser.parse(file_path)
-            # For PDFs, we'll use the first page as the rendered image
-            rendered_paths = [file_path]  # You might want to implement PDF rendering
+            slides_data = self.pdf_parser.iter_slides(file_path)
         else:
             raise ValueError(f"Unsupported file type: {file_ext}")
 
-        # Process each slide
-        processed_data = []
-        for idx, (slide_data, rendered_path) in enumerate(zip(slides_data, rendered_paths)):
-            # If no text content, try OCR
-            if not slide_data.get('text_content'):
-                ocr_result = self.ocr_processor.process_image(rendered_path)
-                slide_data['text_content'] = ocr_result['text']
-                slide_data['ocr_confidence'] = ocr_result['confidence']
-
-            processed_data.append({
-                'slide_number': idx + 1,
-                'content': slide_data.get('text_content', ''),
-                'images': slide_data.get('images', []),
-                'notes': slide_data.get('notes', ''),
-                'rendered_image': rendered_path,
-                'metadata': {
-                    'layout': slide_data.get('layout', ''),
-                    'ocr_confidence': slide_data.get('ocr_confidence', 1.0)
-                }
-            })
+        return self._iter_processed_slides(file_path, slides_data, known_slides or {})
+
+    def _iter_processed_slides(self, file_path: str, slides_data: Iterator[Dict[str, Any]],
+                               known_slides: Dict[int, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        if self.deduplicator is not None and not known_slides:
+            self.deduplicator.remove_document(os.path.basename(file_path))
+
+        # PDFs are rasterized directly; PPTX decks are converted to PDF first
+        pdf_path = self.slide_renderer.prepare_source(file_path)
+        try:
+            # Thumbnails are rendered up front across the worker pool, or on demand in lazy mode
+            previews = {} if self.slide_renderer.lazy else self.slide_renderer.render_document(pdf_path, file_path)
+
+            window = []
+            for idx, slide_data in enumerate(slides_data):
+                window.append((idx, slide_data))
+                if len(window) >= self.ocr_window:
+                    yield from self._process_window(window, pdf_path, file_path, previews, known_slides)
+                    window = []
+            yield from self._process_window(window, pdf_path, file_path, previews, known_slides)
+        finally:
+            # Release open documents and temporary files if the consumer stops early
+            slides_data.close()
+            self.slide_renderer.release_source(file_path, pdf_path)
+
+    def _process_window(self, window: List[Tuple[int, Dict[str, Any]]], pdf_path: str, file_path: str,
+                        previews: Dict[int, str], known_slides: Dict[int, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Process a window of parsed slides in order, OCR'ing its image-only
+        slides in one `process_images` batch first.
+
+        With a deduplicator, slides are fingerprinted before OCR and image-only
+        slides that duplicate an already ingested slide are left out of the
+        batch.
+        """
+        document_id = os.path.basename(file_path)
+        pending = []
+        for idx, slide_data in window:
+            if idx + 1 in known_slides:
+                continue
+            preview_path = previews.get(idx + 1) or \
+                self.slide_renderer.page_image_path(file_path, idx + 1, 'thumbnail')
+            fingerprint = None
+            if self.deduplicator is not None:
+                preview_path, fingerprint = self._fingerprint(idx, slide_data, pdf_path, file_path, preview_path)
+            pending.append((idx, slide_data, preview_path, fingerprint))
+
+        needs_ocr = [(idx, slide_data) for idx, slide_data, _, fingerprint in pending
+                     if not slide_data.get('text_content', '').strip()
+                     and (fingerprint is None or self.deduplicator.find(fingerprint, document_id, idx + 1) is None)]
+        self._ocr_slides(needs_ocr, pdf_path, file_path)
+
+        pending = {idx: (slide_data, preview_path, fingerprint)
+                   for idx, slide_data, preview_path, fingerprint in pending}
+        for idx, _ in window:
+            if idx + 1 in known_slides:
+                yield known_slides[idx + 1]
+                continue
+            slide_data, preview_path, fingerprint = pending[idx]
+            if fingerprint is None:
+                yield self._process_slide(idx, slide_data, pdf_path, file_path, preview_path)
+            else:
+                yield self._dedup_slide(idx, slide_data, pdf_path, file_path, preview_path, fingerprint)
+
+    def _ocr_slides(self, slides: List[Tuple[int, Dict[str, Any]]], pdf_path: str, file_path: str):
+        """Render image-only slides at OCR resolution and OCR them across the worker pool."""
+        if not slides:
+            return
+        ocr_images = [self.slide_renderer.render_page(pdf_path, file_path, idx + 1, 'ocr') for idx, _ in slides]
+        results = self.ocr_processor.process_images(ocr_images, workers=self.ocr_workers)
+        for (_, slide_data), ocr_result in zip(slides, results):
+            if 'error' in ocr_result:
+                raise RuntimeError(f"OCR failed for {ocr_result['image_path']}: {ocr_result['error']}")
+            slide_data['text_content'] = ocr_result['text']
+            slide_data['ocr_confidence'] = ocr_result['confidence']
+
+    def _process_slide(self, idx: int, slide_data: Dict[str, Any], pdf_path: str, file_path: str,
+                       preview_path: str) -> Dict[str, Any]:
+        """Run OCR if needed and shape a parsed slide into the pipeline format."""
+        # If no text content and no OCR yet, render the page at OCR resolution and try OCR
+        if not slide_data.get('text_content', '').strip() and 'ocr_confidence' not in slide_data:
+            self._ocr_slides([(idx, slide_data)], pdf_path, file_path)
 
+        return self._shape_slide(idx, slide_data, preview_path)
+
+    def _fingerprint(self, idx: int, slide_data: Dict[str, Any], pdf_path: str, file_path: str,
+                     preview_path: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Fingerprint a slide from its thumbnail and its parsed text before OCR,
+        so a duplicate image-only slide is matched without running OCR.
+        Returns the thumbnail path (rendered if missing) and the fingerprint.
+        """
+        if not os.path.exists(preview_path):
+            preview_path = self.slide_renderer.render_page(pdf_path, file_path, idx + 1, 'thumbnail')
+        return preview_path, self.deduplicator.fingerprint(preview_path, slide_data.get('text_content', ''))
+
+    def _dedup_slide(self, idx: int, slide_data: Dict[str, Any], pdf_path: str, file_path: str,
+                     preview_path: str, fingerprint: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a slide unless it duplicates one already in the fingerprint index.
+        """
+        document_id = os.path.basename(file_path)
+        canonical = self.deduplicator.find(fingerprint, document_id, idx + 1)
+
+        if canonical is None:
+            slide = self._process_slide(idx, slide_data, pdf_path, file_path, preview_path)
+            self.deduplicator.add(document_id, idx + 1, fingerprint, slide)
+            return slide
+
+        if not slide_data.get('text_content', '').strip():
+            slide_data['text_content'] = canonical['content']
+            slide_data['ocr_confidence'] = canonical['ocr_confidence']
+        slide = self._shape_slide(idx, slide_data, preview_path)
+        slide['topics'] = canonical['topics']
+        slide['duplicate_of'] = {
+            'document_id': canonical['document_id'],
+            'slide_number': canonical['slide_number'],
+            'exact': canonical['exact']
+        }
+        self.deduplicator.link(document_id, idx + 1, canonical)
+        return slide
+
+    def _shape_slide(self, idx: int, slide_data: Dict[str, Any], preview_path: str) -> Dict[str, Any]:
         return {
-            'document_id': os.path.basename(file_path),
-            'slides': processed_data
+            'slide_number': idx + 1,
+            'content': slide_data.get('text_content', ''),
+            'images': slide_data.get('images', []),
+            'notes': slide_data.get('notes', ''),
+            'rendered_image': preview_path,
+            'metadata': {
+                'layout': slide_data.get('layout', ''),
+                'ocr_confidence': slide_data.get('ocr_confidence', 1.0)
+            }
         }
 
-def main():
-    # Example usage
-    upload_dir = "data/input"
-    output_dir = "data/processed"
-    
-    pipeline = DocumentIngestionPipeline(upload_dir, output_dir)
-    
-    # Process all files in upload directory
-    for filename in os.listdir(upload_dir):
-        file_path = os.path.join(upload_dir, filename)
+    def store_document(self, document: Dict[str, Any], weaviate_client, text_embedder,
+                       batch_size: int = 100) -> Dict[str, Any]:
+        """
+        Embed the processed slides of a document and stream them into Weaviate,
+        replacing any slides stored for an earlier version of it.
+        """
+        weaviate_client.delete_presentation(document['document_id'])
+        records = self._iter_slide_records(document['document_id'], document['slides'], text_embedder)
+        return weaviate_client.store_slides(records, batch_size=batch_size)
+
+    def stream_document(self, file_path: str, weaviate_client, text_embedder,
+                        window_size: int = None, batch_size: int = 100) -> Dict[str, Any]:
+        """
+        Process, embed and store a document without materializing its slides.
+
+        Slides flow through parsing, rendering, OCR and embedding in windows
+        of `window_size` (the embedder's batch size by default) and are handed
+        to Weaviate's batch import as they are produced. Slides stored for
+        an earlier version of the document are deleted first.
+        """
+        weaviate_client.delete_presentation(os.path.basename(file_path))
+        slides = self.iter_document(file_path)
+        records = self._iter_slide_records(os.path.basename(file_path), slides, text_embedder, window_size)
+        return weaviate_client.store_slides(records, batch_size=batch_size)
+
+    def ingest_document(self, file_path: str, manifest: IngestionManifest, weaviate_client=None,
+                        text_embedder=None, batch_size: int = 100, full: bool = False) -> Dict[str, Any]:
+        """
+        Incrementally ingest a document, consulting and updating `manifest`.
+
+        Documents that already reached the target stage ("processed", or
+        "stored" when a Weaviate client and embedder are given) are skipped.
+        Otherwise work resumes from the recorded stage: decks that were fully
+        processed are reloaded from the manifest without parsing, rendering
+        or OCR, slides processed before an interruption are not OCR'd again,
+        and slides already stored are not re-sent. Before the first slide of
+        new content is stored, the document's previously stored slides are
+        deleted. With `full`, the recorded progress is discarded first and
+        the document is ingested from scratch, but still recorded.
+        """
+        document_id = os.path.basename(file_path)
+        if full:
+            manifest.forget(file_path)
+        entry = manifest.lookup(file_path)
+        target_stage = 'stored' if weaviate_client is not None else 'processed'
+
+        summary = {'document_id': document_id, 'slides': 0, 'duplicates': 0, 'text_chars': 0, 'images': 0,
+                   'skipped': False}
+        if STAGES.index(entry['stage']) >= STAGES.index(target_stage):
+            summary.update({'slides': entry['slide_count'] or 0, 'skipped': True})
+            return summary
+
+        def iter_recorded():
+            known = manifest.load_slides(file_path)
+            if entry['stage'] == 'new':
+                slides = self.iter_document(file_path, known_slides=known)
+            else:
+                slides = iter(known.values())
+
+            for slide in slides:
+                if slide['slide_number'] not in known:
+                    manifest.record_slide(file_path, slide)
+                summary['slides'] += 1
+                summary['duplicates'] += 'duplicate_of' in slide
+                summary['text_chars'] += len(slide['content'])
+                summary['images'] += len(slide['images'])
+                yield slide
+
+            if entry['stage'] == 'new':
+                manifest.set_document_stage(file_path, 'processed', summary['slides'])
+
+        if weaviate_client is None:
+            for _ in iter_recorded():
+                pass
+            return summary
+
+        already_stored = manifest.load_slides(file_path, min_stage='stored')
+        if not already_stored:
+            # Nothing of this content is stored yet: drop slides of an earlier version
+            weaviate_client.delete_presentation(document_id)
+        sent = []
+
+        def iter_marked(records):
+            for slide_data, embedding in records:
+                manifest.set_slide_stage(file_path, [slide_data['slide_number']], 'embedded')
+                sent.append(slide_data['slide_number'])
+                yield slide_data, embedding
+
+        slides = (slide for slide in iter_recorded() if slide['slide_number'] not in already_stored)
+        records = self._iter_slide_records(document_id, slides, text_embedder)
+        result = weaviate_client.store_slides(iter_marked(records), batch_size=batch_size)
+
+        failed = {error['slide_number'] for error in result['failed']}
+        manifest.set_slide_stage(file_path, [n for n in sent if n not in failed], 'stored')
+        if not failed:
+            manifest.set_document_stage(file_path, 'stored')
+
+        summary.update({'stored': result['stored'], 'failed': result['failed']})
+        return summary
+
+    def _iter_slide_records(self, document_id: str, slides: Iterable[Dict[str, Any]], text_embedder,
+                            window_size: int = None):
+        """
+        Yield (slide_data, embedding) pairs, embedding one window at a time.
+
+        Duplicate slides are neither embedded nor stored; searches return
+        their canonical slide, and the link is kept in the fingerprint index.
+        With a topic tagger, slides without topics get their nearest corpus
+        topics from the embeddings just computed, and the topics are recorded
+        in the fingerprint index for duplicates of these slides.
+        """
+        window_size = window_size or text_embedder.batch_size
+        slides = (slide for slide in slides if 'duplicate_of' not in slide)
+        while True:
+            window = list(itertools.islice(slides, window_size))
+            if not window:
+                break
+
+            embeddings = text_embedder.encode([slide['content'] for slide in window])
+            if self.topic_tagger is not None:
+                for slide, topics in zip(window, self.topic_tagger.tag_embeddings(embeddings)):
+                    if not slide.get('topics'):
+                        slide['topics'] = [topic['topic'] for topic in topics]
+                        if self.deduplicator is not None:
+                            # Duplicates found later reuse these topics
+                            self.deduplicator.set_topics(document_id, slide['slide_number'], slide['topics'])
+            for slide, embedding in zip(window, embeddings):
+                slide_data = {
+                    'slide_number': slide['slide_number'],
+                    'text_content': slide['content'],
+                    'presentation_id': document_id,
+                    'image_url': self._image_url(document_id, slide),
+                    'topics': slide.get('topics', [])
+                }
+                yield slide_data, embedding.tolist()
+
+    def _image_url(self, document_id: str, slide: Dict[str, Any]) -> str:
+        """The rendered thumbnail, or in lazy mode the API route that renders it on demand."""
+        if os.path.exists(slide.get('rendered_image') or ''):
+            return slide['rendered_image']
+        return preview_url(document_id, slide['slide_number'])
+
+def summarize_slides(document_id: str, slides: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce processed slides to the statistics reported by main().
+    """
+    summary = {'document_id': document_id, 'slides': 0, 'duplicates': 0, 'text_chars': 0, 'images': 0}
+    for slide in slides:
+        summary['slides'] += 1
+        summary['duplicates'] += 'duplicate_of' in slide
+        summary['text_chars'] += len(slide['content'])
+        summary['images'] += len(slide['images'])
+    return summary
+
+def _import_shared_modules():
+    """Make the `src` package importable; run as a script, only src/ingestion is on the path."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+
+def _uses_local_index() -> bool:
+    _import_shared_modules()
+    from src.storage.vector_store import vector_store_backend
+    return vector_store_backend() == "local"
+
+def _storage(tag_topics: bool):
+    """
+    The process-wide vector store and text embedder, plus the topic tagger
+    when `tag_topics` is set, for workers that store what they ingest.
+    """
+    _import_shared_modules()
+    from src.utils.model_registry import get_text_embedder, get_topic_tagger, get_vector_store
+    return get_vector_store(), get_text_embedder(), get_topic_tagger() if tag_topics else None
+
+def _ingest_worker(conn, upload_dir: str, output_dir: str, manifest_path: str = None, dedup_path: str = None,
+                   store: bool = False, tag_topics: bool = False, render_workers: int = None,
+                   full: bool = False) -> None:
+    """
+    Long-lived ingest process. The pipeline, and with `store` the models
+    and the vector store, are loaded once; then each (file_path,
+    converter_port) received on `conn` is processed and its summary sent
+    back, until None is received.
+    """
+    deduplicator = manifest = None
+    try:
+        deduplicator = SlideDeduplicator(dedup_path) if dedup_path else None
+        manifest = IngestionManifest(manifest_path) if manifest_path else None
+        vector_store, text_embedder, topic_tagger = _storage(tag_topics) if store else (None, None, None)
+        pipeline = DocumentIngestionPipeline(upload_dir, output_dir, None, deduplicator, topic_tagger,
+                                             render_workers, ocr_workers=render_workers)
+        default_converter = pipeline.slide_renderer.converter
+        setup_error = None
+    except Exception as e:
+        # Reported for every file this worker is given
+        setup_error = e
+
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            file_path, converter_port = task
+            try:
+                if setup_error is not None:
+                    raise setup_error
+                pipeline.slide_renderer.converter = UnoConverter(converter_port) if converter_port \
+                    else default_converter
+                if manifest is not None:
+                    summary = pipeline.ingest_document(file_path, manifest, vector_store, text_embedder, full=full)
+                    status = 'skipped' if summary.pop('skipped') else 'ok'
+                else:
+                    document = pipeline.process_document(file_path)
+                    summary = summarize_slides(document['document_id'], document['slides'])
+                    if vector_store is not None:
+                        result = pipeline.store_document(document, vector_store, text_embedder)
+                        summary.update({'stored': result['stored'], 'failed': result['failed']})
+                    status = 'ok'
+                if status == 'ok' and vector_store is not None:
+                    # Writes back the embedded index; a no-op for Weaviate
+                    vector_store.save()
+                conn.send({'status': status, **summary})
+            except Exception as e:
+                conn.send({'status': 'error', 'error': str(e), 'conversion_failed': isinstance(e, ConversionError)})
+    except EOFError:
+        # The parent went away
+        pass
+    finally:
+        if deduplicator:
+            deduplicator.close()
+        if manifest:
+            manifest.close()
+        conn.close()
+
+class _IngestWorker:
+    """Parent-side handle of an `_ingest_worker` process and the file it is working on."""
+
+    def __init__(self, settings: tuple):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_ingest_worker, args=(child_conn, *settings))
+        self.process.start()
+        child_conn.close()
+        self.file_path = None
+        self.started = None
+        self.slot = None
+
+    def submit(self, file_path: str, converter_port: int = None, slot: int = None) -> None:
+        self.file_path, self.started, self.slot = file_path, time.monotonic(), slot
+        self.conn.send((file_path, converter_port))
+
+    def stop(self) -> None:
+        """Ask an idle worker to exit, killing it if it does not."""
         try:
-            result = pipeline.process_document(file_path)
-            print(f"Successfully processed {filename}")
-            print(f"Found {len(result['slides'])} slides")
-            
-            # Print some statistics
-            total_text = sum(len(slide['content']) for slide in result['slides'])
-            total_images = sum(len(slide['images']) for slide in result['slides'])
-            print(f"Total text characters: {total_text}")
-            print(f"Total images: {total_images}")
-            
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=10)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+def ingest_directory(upload_dir: str, output_dir: str, workers: int = None,
+                     timeout: float = 900, manifest_path: str = None,
+                     dedup_path: str = None, store: bool = False,
+                     tag_topics: bool = False, full: bool = False) -> List[Dict[str, Any]]:
+    """
+    Process every supported file in `upload_dir` in parallel.
+
+    Files are handed to up to `workers` long-lived child processes, which
+    load the pipeline and models once and process one file at a time, so
+    a crash or hang only affects that file. A worker whose file takes
+    longer than `timeout` seconds is killed, the file is reported as timed
+    out, and a fresh worker takes its place. With a
+    `manifest_path`, files recorded as unchanged are skipped without
+    starting a worker and interrupted files resume where they stopped;
+    with `full` every file is reprocessed and the manifest rewritten.
+    When LibreOffice's Python bindings are available, each worker converts
+    through a dedicated long-lived LibreOffice server from a
+    `ConverterPool` instead of starting soffice for every deck; the pool
+    is only started when some pending file is not a PDF. Each
+    worker renders pages with at most cpu_count // workers processes, so
+    the file and page pools together do not oversubscribe the cores.
+    With a `dedup_path`, workers share a slide fingerprint index there and
+    skip OCR for duplicates of slides already ingested; decks whose
+    duplicates lost their canonical slide to a reprocessed deck are
+    reprocessed from scratch.
+    With `store`, workers also embed their slides and store them in the
+    configured vector store, tagged with the corpus topic model's topics
+    if `tag_topics` is set. The embedded local index is not shared between
+    processes, so with it files are stored one at a time by a single
+    worker, which saves the index after each file.
+    Returns one result dict per file with its status and elapsed time.
+    """
+    workers = workers or os.cpu_count() or 1
+    if store and _uses_local_index():
+        workers = 1
+    # Files already run in parallel; split the cores between their page-rendering pools
+    render_workers = max(1, (os.cpu_count() or 1) // workers)
+    supported = PPTXParser().supported_extensions + PDFParser().supported_extensions
+    pending = [
+        os.path.join(upload_dir, filename)
+        for filename in sorted(os.listdir(upload_dir))
+        if os.path.splitext(filename)[1].lower() in supported
+    ]
+
+    results = []
+    if manifest_path and not full:
+        manifest = IngestionManifest(manifest_path)
+        if dedup_path:
+            # Decks whose duplicate slides lost their canonical slide start over
+            deduplicator = SlideDeduplicator(dedup_path)
+            manifest.forget_documents(deduplicator.stale_documents())
+            deduplicator.close()
+        remaining = []
+        for file_path in pending:
+            started = time.monotonic()
+            entry = manifest.is_unchanged(file_path, 'stored' if store else 'processed')
+            if entry:
+                results.append({
+                    'status': 'skipped',
+                    'document_id': os.path.basename(file_path),
+                    'slides': entry['slide_count'] or 0,
+                    'file': os.path.basename(file_path),
+                    'elapsed': time.monotonic() - started
+                })
+            else:
+                remaining.append(file_path)
+        manifest.close()
+        pending = remaining
+
+    # Only decks that are not PDFs go through LibreOffice
+    pdf_extensions = PDFParser().supported_extensions
+    to_convert = sum(1 for file_path in pending if os.path.splitext(file_path)[1].lower() not in pdf_extensions)
+    pool = ConverterPool(size=min(workers, to_convert)) if to_convert and uno_available() else None
+    settings = (upload_dir, output_dir, manifest_path, dedup_path, store, tag_topics, render_workers, full)
+    idle, busy = [], {}
+    try:
+        while pending or busy:
+            while pending and len(busy) < workers:
+                file_path = pending.pop(0)
+                converts = os.path.splitext(file_path)[1].lower() not in pdf_extensions
+                try:
+                    slot = pool.acquire() if pool and converts else None
+                except (RuntimeError, OSError) as e:
+                    # The server was unhealthy and did not come back; only this file fails
+                    results.append({'status': 'error', 'error': f"converter unavailable: {e}",
+                                    'file': os.path.basename(file_path), 'elapsed': 0.0})
+                    continue
+                port = pool.servers[slot].port if slot is not None else None
+                worker = idle.pop() if idle else _IngestWorker(settings)
+                worker.submit(file_path, port, slot)
+                busy[worker.conn] = worker
+            if not busy:
+                continue
+
+            now = time.monotonic()
+            next_deadline = min(worker.started + timeout for worker in busy.values())
+            ready = multiprocessing.connection.wait(list(busy), timeout=max(0.0, next_deadline - now))
+
+            for conn in ready:
+                worker = busy.pop(conn)
+                try:
+                    result = conn.recv()
+                    idle.append(worker)
+                except EOFError:
+                    result = {'status': 'error', 'error': 'worker exited without a result'}
+                    worker.kill()
+                conversion_failed = result.pop('conversion_failed', False)
+                if worker.slot is not None:
+                    # Restart the server only if the conversion itself failed
+                    pool.release(worker.slot, failed=conversion_failed)
+                result.update({'file': os.path.basename(worker.file_path),
+                               'elapsed': time.monotonic() - worker.started})
+                results.append(result)
+
+            now = time.monotonic()
+            for conn in [conn for conn, worker in busy.items() if now - worker.started >= timeout]:
+                worker = busy.pop(conn)
+                worker.kill()
+                if worker.slot is not None:
+                    pool.release(worker.slot, failed=True)
+                results.append({
+                    'status': 'timeout',
+                    'error': f"exceeded {timeout:.0f}s",
+                    'file': os.path.basename(worker.file_path),
+                    'elapsed': now - worker.started
+                })
+    finally:
+        for worker in busy.values():
+            worker.kill()
+        for worker in idle:
+            worker.stop()
+        if pool:
+            pool.close()
+
+    return results
+
+def print_summary(results: List[Dict[str, Any]], wall_time: float) -> None:
+    """
+    Print per-file timing and overall throughput for an ingest run.
+    """
+    print(f"{'file':<60} {'status':<8} {'slides':>6} {'seconds':>8} {'slides/s':>8}")
+    for result in sorted(results, key=lambda r: r['file']):
+        slides = result.get('slides', 0)
+        rate = slides / result['elapsed'] if result['elapsed'] else 0.0
+        print(f"{result['file'][:60]:<60} {result['status']:<8} {slides:>6} {result['elapsed']:>8.2f} {rate:>8.2f}")
+        if result['status'] not in ('ok', 'skipped'):
+            print(f"    {result['error']}")
+
+    processed = [result for result in results if result['status'] == 'ok']
+    skipped = sum(1 for result in results if result['status'] == 'skipped')
+    total_slides = sum(result.get('slides', 0) for result in processed)
+    duplicates = sum(result.get('duplicates', 0) for result in processed)
+    print(f"\nProcessed {len(processed)}/{len(results)} files ({skipped} unchanged), {total_slides} slides "
+          f"({duplicates} duplicates) in {wall_time:.2f}s "
+          f"({total_slides / wall_time if wall_time else 0.0:.2f} slides/s)")
+    if any('stored' in result for result in processed):
+        failed = sum(len(result.get('failed', [])) for result in processed)
+        print(f"Stored {sum(result.get('stored', 0) for result in processed)} slides ({failed} failed)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest all documents in a directory.")
+    parser.add_argument("--upload-dir", default="data/input")
+    parser.add_argument("--output-dir", default="data/processed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of files processed concurrently")
+    parser.add_argument("--timeout", type=float, default=900,
+                        help="per-file timeout in seconds")
+    parser.add_argument("--manifest", default="data/processed/manifest.sqlite",
+                        help="ingestion manifest used to skip unchanged files")
+    parser.add_argument("--full", action="store_true",
+                        help="reprocess every file, ignoring (but still updating) the manifest")
+    parser.add_argument("--dedup-index", default="data/processed/fingerprints.sqlite",
+                        help="slide fingerprint index used to detect duplicate slides")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="process every slide even if it duplicates one already ingested")
+    parser.add_argument("--store", action="store_true",
+                        help="embed the slides and store them in the vector store (VECTOR_STORE, "
+                             "config/vector_store_config.json)")
+    parser.add_argument("--tag-topics", action="store_true",
+                        help="with --store, tag slides with the corpus topic model built by "
+                             "python -m src.embedding.topic_model")
+    args = parser.parse_args()
+    if args.tag_topics and not args.store:
+        parser.error("--tag-topics requires --store")
+
+    os.makedirs(args.upload_dir, exist_ok=True)
+
+    start = time.monotonic()
+    results = ingest_directory(args.upload_dir, args.output_dir, workers=args.workers,
+                               timeout=args.timeout, manifest_path=args.manifest,
+                               dedup_path=None if args.no_dedup else args.dedup_index,
+                               store=args.store, tag_topics=args.tag_topics, full=args.full)
+    print_summary(results, time.monotonic() - start)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
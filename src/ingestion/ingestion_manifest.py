@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# Document and slide stages, in pipeline order. A slide is "processed" once
+# it has been parsed, rendered and (if needed) OCR'd.
+STAGES = ['new', 'processed', 'embedded', 'stored']
+
+class IngestionManifest:
+    """
+    Persistent record of what has already been ingested, backed by SQLite.
+
+    Documents are keyed by path and remembered by size, mtime and content
+    hash, so unchanged files are recognized from a single stat call and a
+    touched but unchanged file is recognized from its hash. Copies of the
+    same content under different paths are separate documents, since each
+    is stored under its own presentation id. Each processed slide is
+    recorded with its stage, letting an interrupted run resume where it
+    stopped instead of restarting the deck.
+    """
+
+    # Bumped when the tables change; older manifests are discarded
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path: str = "data/processed/manifest.sqlite", timeout: float = 30.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS documents")
+            self.conn.execute("DROP TABLE IF EXISTS slides")
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " path TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " slide_count INTEGER,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS slides ("
+            " path TEXT NOT NULL,"
+            " slide_number INTEGER NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (path, slide_number))"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_unchanged(self, file_path: str, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Cheap check, without hashing, whether a file at this path with the
+        same size and mtime already reached `stage`. Returns its entry if so.
+        """
+        stat = os.stat(file_path)
+        row = self.conn.execute(
+            "SELECT content_hash, size, mtime, stage, slide_count FROM documents WHERE path = ?",
+            (os.path.abspath(file_path),)
+        ).fetchone()
+        if row and row[1] == stat.st_size and row[2] == stat.st_mtime \
+                and STAGES.index(row[3]) >= STAGES.index(stage):
+            return {'content_hash': row[0], 'stage': row[3], 'slide_count': row[4]}
+        return None
+
+    def lookup(self, file_path: str) -> Dict[str, Any]:
+        """
+        Return the manifest entry for a file, registering it if it is new.
+
+        The content is only hashed when the path's size or mtime changed;
+        if the content changed too, the path starts over at "new" and its
+        recorded slides are dropped. The result has `content_hash`, `stage`
+        and `slide_count`.
+        """
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+
+        row = self.conn.execute(
+            "SELECT content_hash, size, mtime, stage, slide_count FROM documents WHERE path = ?",
+            (path,)
+        ).fetchone()
+        if row and row[1] == stat.st_size and row[2] == stat.st_mtime:
+            return {'content_hash': row[0], 'stage': row[3], 'slide_count': row[4]}
+
+        content_hash = self.hash_file(file_path)
+        if row and row[0] == content_hash:
+            # A touched file with the same content
+            self.conn.execute(
+                "UPDATE documents SET size = ?, mtime = ?, updated_at = ? WHERE path = ?",
+                (stat.st_size, stat.st_mtime, time.time(), path)
+            )
+            self.conn.commit()
+            return {'content_hash': content_hash, 'stage': row[3], 'slide_count': row[4]}
+
+        self.conn.execute("DELETE FROM slides WHERE path = ?", (path,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (path, content_hash, size, mtime, stage, slide_count, updated_at)"
+            " VALUES (?, ?, ?, ?, 'new', NULL, ?)",
+            (path, content_hash, stat.st_size, stat.st_mtime, time.time())
+        )
+        self.conn.commit()
+        return {'content_hash': content_hash, 'stage': 'new', 'slide_count': None}
+
+    def forget(self, file_path: str) -> None:
+        """Drop a file's entry and slides, so the next `lookup` starts it over."""
+        path = os.path.abspath(file_path)
+        self.conn.execute("DELETE FROM slides WHERE path = ?", (path,))
+        self.conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+        self.conn.commit()
+
+    def forget_documents(self, document_ids: Iterable[str]) -> int:
+        """`forget` every file whose basename (its presentation id) is in `document_ids`."""
+        document_ids = set(document_ids)
+        paths = [path for (path,) in self.conn.execute("SELECT path FROM documents")
+                 if os.path.basename(path) in document_ids]
+        for path in paths:
+            self.forget(path)
+        return len(paths)
+
+    def set_document_stage(self, file_path: str, stage: str, slide_count: Optional[int] = None) -> None:
+        path = os.path.abspath(file_path)
+        if slide_count is None:
+            self.conn.execute(
+                "UPDATE documents SET stage = ?, updated_at = ? WHERE path = ?",
+                (stage, time.time(), path)
+            )
+        else:
+            self.conn.execute(
+                "UPDATE documents SET stage = ?, slide_count = ?, updated_at = ? WHERE path = ?",
+                (stage, slide_count, time.time(), path)
+            )
+        self.conn.commit()
+
+    def record_slide(self, file_path: str, slide: Dict[str, Any], stage: str = 'processed') -> None:
+        """Record a processed slide; raw image bytes are not persisted."""
+        data = dict(slide)
+        data['images'] = [
+            {k: v for k, v in image.items() if k != 'image_bytes'}
+            for image in slide.get('images', [])
+        ]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO slides (path, slide_number, stage, data) VALUES (?, ?, ?, ?)",
+            (os.path.abspath(file_path), slide['slide_number'], stage, json.dumps(data))
+        )
+        self.conn.commit()
+
+    def set_slide_stage(self, file_path: str, slide_numbers: Iterable[int], stage: str) -> None:
+        self.conn.executemany(
+            "UPDATE slides SET stage = ? WHERE path = ? AND slide_number = ?",
+            [(stage, os.path.abspath(file_path), number) for number in slide_numbers]
+        )
+        self.conn.commit()
+
+    def load_slides(self, file_path: str, min_stage: str = 'processed') -> Dict[int, Dict[str, Any]]:
+        """Return recorded slides at or beyond `min_stage`, keyed by slide number."""
+        stages = STAGES[STAGES.index(min_stage):]
+        placeholders = ",".join("?" * len(stages))
+        rows = self.conn.execute(
+            f"SELECT slide_number, data FROM slides WHERE path = ? AND stage IN ({placeholders})"
+            " ORDER BY slide_number",
+            (os.path.abspath(file_path), *stages)
+        ).fetchall()
+        return {number: json.loads(data) for number, data in rows}
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,9 +1,14 @@
 import pytesseract
 from PIL import Image
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import os
+import time
 import cv2
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Kernel for Immerkaer's fast noise variance estimate
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
 
 class OCRProcessor:
     def __init__(self, config_path: str = "config/ocr_config.json"):
@@ -17,10 +22,19 @@ class OCRProcessor:
             'preprocessing': {
                 'resize': True,
                 'denoise': True,
-                'threshold': True
+                'threshold': True,
+                # Median glyph height (px) Tesseract reads best; resize towards it
+                'target_text_height': 32,
+                'max_upscale': 2.0,
+                # Estimated noise sigma above which denoising is worth its cost. The
+                # estimate is taken on the grayscale slide, where channel averaging and
+                # clipping at a white background leave about 0.4x the per-channel sigma
+                'noise_threshold': 2.5
             },
             'languages': ['eng'],
-            'confidence_threshold': 0.6
+            'confidence_threshold': 0.6,
+            'timeout': 60,
+            'workers': 0
         }
         
         if os.path.exists(config_path):
@@ -36,58 +50,200 @@ class OCRProcessor:
             raise FileNotFoundError(f"Image not found: {image_path}")
 
         try:
-            # Read image
-            image = cv2.imread(image_path)
-            
+            # Read image directly as grayscale; color carries nothing for OCR
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                raise ValueError(f"Could not read image: {image_path}")
+
             # Preprocess image
-            processed_image = self._preprocess_image(image)
+            timings = {}
+            processed_image = self._preprocess_image(image, timings)
             
             # Convert to PIL Image for pytesseract
             pil_image = Image.fromarray(processed_image)
             
-            # Perform OCR
-            text = pytesseract.image_to_string(
-                pil_image,
-                config=self.tesseract_config,
-                lang='+'.join(self.config['languages'])
-            )
-            
-            # Get confidence scores
+            # Single recognition pass; the text layout is rebuilt from the word boxes
             data = pytesseract.image_to_data(
                 pil_image,
                 config=self.tesseract_config,
                 lang='+'.join(self.config['languages']),
-                output_type=pytesseract.Output.DICT
+                output_type=pytesseract.Output.DICT,
+                timeout=self.config['timeout']
             )
-            
+
+            text = self._build_text(data)
             confidence = self._calculate_confidence(data)
-            
+
             return {
                 'text': text,
                 'confidence': confidence,
                 'image_path': image_path,
-                'words': self._extract_words_with_confidence(data)
+                'words': self._extract_words_with_confidence(data),
+                'timings': timings
             }
         except Exception as e:
             raise Exception(f"OCR processing failed: {str(e)}")
 
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Preprocess image for better OCR results."""
-        if self.config['preprocessing']['resize']:
-            image = cv2.resize(image, None, fx=2, fy=2)
-        
-        if self.config['preprocessing']['denoise']:
-            image = cv2.fastNlMeansDenoisingColored(image)
-        
-        if self.config['preprocessing']['threshold']:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            image = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-        
+    def process_images(self, image_paths: List[str], workers: int = None) -> List[Dict[str, Any]]:
+        """
+        OCR many images in a process pool.
+
+        Results are returned in input order. Each image is bounded by the
+        configured `timeout`, and an image that fails or times out yields a
+        result with an `error` key and empty text instead of failing the batch.
+        """
+        workers = workers or self.config['workers'] or os.cpu_count() or 1
+        workers = min(workers, len(image_paths))
+        if workers <= 1:
+            return [self._process_image_safe(path) for path in image_paths]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._process_image_safe, image_paths))
+
+    def _process_image_safe(self, image_path: str) -> Dict[str, Any]:
+        try:
+            return self.process_image(image_path)
+        except Exception as e:
+            return {
+                'text': '',
+                'confidence': 0.0,
+                'image_path': image_path,
+                'words': [],
+                'error': str(e)
+            }
+
+    def _build_text(self, data: Dict[str, Any]) -> str:
+        """Rebuild page text from image_to_data output: words to lines, blocks separated by blank lines."""
+        lines = []
+        current_key = None
+        current_block = None
+        for i, word in enumerate(data['text']):
+            if not str(word).strip():
+                continue
+            block = (data['block_num'][i], data['par_num'][i])
+            key = block + (data['line_num'][i],)
+            if key != current_key:
+                if current_block is not None and block != current_block:
+                    lines.append([])
+                lines.append([])
+                current_key = key
+                current_block = block
+            lines[-1].append(str(word))
+        return "\n".join(" ".join(words) for words in lines)
+
+    def _preprocess_image(self, image: np.ndarray, timings: Dict[str, float] = None) -> np.ndarray:
+        """
+        Preprocess image for better OCR results.
+
+        Works on grayscale and only pays for expensive steps when the image
+        needs them: denoising runs only when the estimated noise is above
+        `noise_threshold`, and the image is scaled so the median glyph
+        height approaches `target_text_height` instead of a fixed 2x.
+        Per-step durations are written into `timings` when given.
+        """
+        settings = self.config['preprocessing']
+        timings = timings if timings is not None else {}
+
+        start = time.perf_counter()
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        timings['grayscale'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        noise = self._estimate_noise(image)
+        text_height = self._estimate_text_height(image)
+        timings['estimate'] = time.perf_counter() - start
+        timings['noise_sigma'] = noise
+        timings['text_height'] = text_height
+
+        scale = 1.0
+        if settings['resize'] and text_height:
+            scale = settings.get('target_text_height', 32) / text_height
+            scale = min(scale, settings.get('max_upscale', 2.0))
+            # Leave images that are already close to the target alone
+            if 0.6 <= scale <= 1.2:
+                scale = 1.0
+
+        # Shrink before denoising and enlarge after, so denoising sees the fewest pixels
+        if scale < 1.0:
+            image = self._resize(image, scale, timings)
+
+        method = self._denoise_method(noise)
+        if method:
+            start = time.perf_counter()
+            if method == 'median':
+                image = cv2.medianBlur(image, 3)
+            else:
+                # Filter strength follows the measured noise
+                image = cv2.fastNlMeansDenoising(image, None, h=float(min(noise, 15.0)),
+                                                 templateWindowSize=7, searchWindowSize=15)
+            timings['denoise'] = time.perf_counter() - start
+
+        if scale > 1.0:
+            image = self._resize(image, scale, timings)
+
+        if settings['threshold']:
+            start = time.perf_counter()
+            image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+            timings['threshold'] = time.perf_counter() - start
+
+        return image
+
+    def _denoise_method(self, noise: float) -> Optional[str]:
+        """
+        Pick the denoiser for an estimated noise sigma: None below
+        `noise_threshold`, a median filter for mild noise (orders of
+        magnitude cheaper) and NL-means from twice the threshold.
+        """
+        settings = self.config['preprocessing']
+        noise_threshold = settings.get('noise_threshold', 2.5)
+        if not settings['denoise'] or noise <= noise_threshold:
+            return None
+        return 'median' if noise < 2 * noise_threshold else 'nlmeans'
+
+    def _resize(self, image: np.ndarray, scale: float, timings: Dict[str, float]) -> np.ndarray:
+        start = time.perf_counter()
+        interpolation = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=interpolation)
+        timings['resize'] = time.perf_counter() - start
+        timings['scale'] = scale
         return image
 
+    def _estimate_noise(self, gray: np.ndarray) -> float:
+        """Estimate the Gaussian noise sigma of a grayscale image (Immerkaer, 1996)."""
+        height, width = gray.shape
+        if height < 3 or width < 3:
+            return 0.0
+        response = cv2.filter2D(gray.astype(np.float32), -1, _NOISE_KERNEL)
+        total = np.abs(response[1:-1, 1:-1]).sum()
+        return float(total * np.sqrt(0.5 * np.pi) / (6.0 * (width - 2) * (height - 2)))
+
+    def _estimate_text_height(self, gray: np.ndarray) -> float:
+        """
+        Estimate the median glyph height in pixels from connected components
+        of the binarized image, or 0.0 when no text-like components are found.
+        """
+        # Measure on a downsized copy for speed and scale the result back
+        factor = min(1.0, 1000.0 / max(gray.shape))
+        small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1 else gray
+        binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+
+        # Dark text on a light slide is the common case; flip if the foreground dominates
+        if cv2.countNonZero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        heights = stats[1:count, cv2.CC_STAT_HEIGHT]
+        widths = stats[1:count, cv2.CC_STAT_WIDTH]
+        areas = stats[1:count, cv2.CC_STAT_AREA]
+        glyphs = (heights >= 4) & (heights < small.shape[0] / 4) & (widths < small.shape[1] / 4) & (areas >= 8)
+        if not np.any(glyphs):
+            return 0.0
+        return float(np.median(heights[glyphs]) / factor)
+
     def _calculate_confidence(self, data: Dict[str, Any]) -> float:
         """Calculate confidence score for OCR results."""
-        confidences = [float(conf) for conf in data['conf'] if conf != '-1']
+        confidences = [float(conf) for conf in data['conf'] if float(conf) >= 0]
         return np.mean(confidences) / 100 if confidences else 0.0
 
     def _extract_words_with_confidence(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
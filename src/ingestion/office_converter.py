@@ -0,0 +1,287 @@
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+SOFFICE = os.getenv("SOFFICE_PATH", "soffice")
+
+class ConversionError(Exception):
+    """A document could not be converted to PDF."""
+
+class ConversionTimeout(ConversionError, TimeoutError):
+    """A conversion took longer than its timeout."""
+
+def _profile_url(profile_dir: str) -> str:
+    """UserInstallation URL for an isolated LibreOffice profile."""
+    return "file://" + os.path.abspath(profile_dir).replace(os.sep, "/")
+
+def _unique_pdf_path(src_path: str) -> str:
+    """Reserve a private temp directory so concurrent conversions never collide."""
+    out_dir = tempfile.mkdtemp(prefix="slide_renderer_")
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(src_path))[0] + ".pdf")
+
+def remove_converted(pdf_path: str) -> None:
+    """Remove a converted PDF together with its private temp directory."""
+    shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+
+def free_port() -> int:
+    """A TCP port on localhost that nothing is listening on right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def uno_available() -> bool:
+    try:
+        import uno  # noqa: F401  (ships with LibreOffice's Python bindings)
+        return True
+    except ImportError:
+        return False
+
+class OfficeConverter:
+    """
+    One-shot converter: starts a fresh `soffice --headless` for every job.
+
+    Each converter has its own profile directory, so several can run in
+    parallel, and every job writes to a unique temp directory.
+    """
+
+    def __init__(self, profile_dir: str = None, timeout: float = 300):
+        # One profile per process by default, so parallel workers never share one
+        self.profile_dir = profile_dir or os.path.join(tempfile.gettempdir(), f"soffice_profile_{os.getpid()}")
+        self.timeout = timeout
+
+    def convert(self, src_path: str, timeout: float = None) -> str:
+        pdf_path = _unique_pdf_path(src_path)
+        try:
+            subprocess.run([
+                SOFFICE,
+                '--headless',
+                '--norestore',
+                f'-env:UserInstallation={_profile_url(self.profile_dir)}',
+                '--convert-to', 'pdf',
+                '--outdir', os.path.dirname(pdf_path),
+                src_path
+            ], check=True, timeout=timeout or self.timeout, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except subprocess.CalledProcessError as e:
+            remove_converted(pdf_path)
+            raise ConversionError(f"Failed to convert PPTX to PDF: {str(e)}")
+        except subprocess.TimeoutExpired:
+            remove_converted(pdf_path)
+            raise ConversionTimeout(f"Converting {src_path} took longer than {timeout or self.timeout}s")
+        except FileNotFoundError:
+            remove_converted(pdf_path)
+            raise ConversionError("LibreOffice not found. Please install LibreOffice.")
+
+        if not os.path.exists(pdf_path):
+            remove_converted(pdf_path)
+            raise ConversionError(f"Failed to convert PPTX to PDF: no output for {src_path}")
+        return pdf_path
+
+class UnoConverter:
+    """
+    Client for an already running LibreOffice listener on `port`.
+
+    Conversions go over the UNO socket bridge, so no process is started per
+    job. A failed job raises ConversionError and one that exceeds `timeout`
+    raises ConversionTimeout; the owner of the server is expected to
+    restart it.
+    """
+
+    def __init__(self, port: int, timeout: float = 300):
+        self.port = port
+        self.timeout = timeout
+
+    def convert(self, src_path: str, timeout: float = None) -> str:
+        pdf_path = _unique_pdf_path(src_path)
+        outcome = {}
+
+        def run():
+            try:
+                self._convert(src_path, pdf_path)
+            except Exception as e:
+                outcome['error'] = e
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout or self.timeout)
+
+        if worker.is_alive():
+            remove_converted(pdf_path)
+            raise ConversionTimeout(f"Converting {src_path} took longer than {timeout or self.timeout}s")
+        if 'error' in outcome or not os.path.exists(pdf_path):
+            remove_converted(pdf_path)
+            raise ConversionError(f"Failed to convert PPTX to PDF: {outcome.get('error', 'no output')}")
+        return pdf_path
+
+    def _convert(self, src_path: str, pdf_path: str) -> None:
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            p = PropertyValue()
+            p.Name = name
+            p.Value = value
+            return p
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        context = resolver.resolve(f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext")
+        desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+        document = desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(src_path)), "_blank", 0, (prop("Hidden", True),)
+        )
+        try:
+            document.storeToURL(uno.systemPathToFileUrl(pdf_path), (prop("FilterName", "impress_pdf_Export"),))
+        finally:
+            document.close(True)
+
+class LibreOfficeServer:
+    """
+    A long-lived headless LibreOffice process listening on a UNO socket,
+    with its own profile directory.
+    """
+
+    def __init__(self, port: int, profile_dir: str, startup_timeout: float = 60):
+        self.port = port
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        try:
+            self.process = subprocess.Popen([
+                SOFFICE,
+                '--headless',
+                '--invisible',
+                '--nologo',
+                '--norestore',
+                '--nodefault',
+                '--nolockcheck',
+                f'-env:UserInstallation={_profile_url(self.profile_dir)}',
+                f'--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext'
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            raise RuntimeError("LibreOffice not found. Please install LibreOffice.")
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.is_healthy():
+                return
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.25)
+
+        self.stop()
+        raise RuntimeError(f"LibreOffice did not start listening on port {self.port}")
+
+    def is_healthy(self) -> bool:
+        """The process is alive and accepting connections on its port."""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+
+class ConverterPool:
+    """
+    Pool of long-lived LibreOffice converters.
+
+    Each slot is a `LibreOfficeServer` with an isolated profile. Jobs are
+    health-checked before they start, and a slot whose job fails or exceeds
+    `job_timeout` is restarted. Servers listen on consecutive ports from
+    `base_port`, or by default on ports that are free when the pool
+    starts, so concurrent pools do not collide. When LibreOffice's Python
+    bindings (`uno`) are not importable, slots fall back to one-shot
+    `OfficeConverter`s, which still run in parallel but pay the startup
+    cost per job.
+    """
+
+    def __init__(self, size: int = 2, base_port: int = None, job_timeout: float = 300,
+                 profile_root: str = None):
+        self.size = size
+        self.job_timeout = job_timeout
+        self.profile_root = profile_root or tempfile.mkdtemp(prefix="soffice_pool_")
+        self.persistent = uno_available()
+        self._slots: "queue.Queue[int]" = queue.Queue()
+        self.servers: List[LibreOfficeServer] = []
+        self.converters = []
+
+        for index in range(size):
+            profile_dir = os.path.join(self.profile_root, f"profile_{index}")
+            if self.persistent:
+                port = base_port + index if base_port else free_port()
+                server = LibreOfficeServer(port, profile_dir)
+                server.start()
+                self.servers.append(server)
+                self.converters.append(UnoConverter(server.port, job_timeout))
+            else:
+                self.converters.append(OfficeConverter(profile_dir, job_timeout))
+            self._slots.put(index)
+
+    def acquire(self) -> int:
+        """Take a free slot, restarting its server first if it is unhealthy."""
+        index = self._slots.get()
+        if self.persistent and not self.servers[index].is_healthy():
+            try:
+                self.servers[index].restart()
+            except Exception:
+                self._slots.put(index)
+                raise
+        return index
+
+    def release(self, index: int, failed: bool = False) -> None:
+        """Return a slot; servers whose job failed or hung are restarted."""
+        if failed and self.persistent:
+            try:
+                self.servers[index].restart()
+            except Exception:
+                # Retried by the health check on the next acquire
+                pass
+        self._slots.put(index)
+
+    def convert(self, src_path: str, timeout: float = None) -> str:
+        index = self.acquire()
+        failed = False
+        try:
+            return self.converters[index].convert(src_path, timeout or self.job_timeout)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(index, failed)
+
+    def close(self) -> None:
+        for server in self.servers:
+            server.stop()
+        shutil.rmtree(self.profile_root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
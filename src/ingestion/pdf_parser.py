@@ -1,5 +1,5 @@
 from PyPDF2 import PdfReader
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import os
 import fitz  # PyMuPDF
 from PIL import Image
@@ -13,24 +13,30 @@ class PDFParser:
         """
         Parse a PDF file and extract content from each page.
         """
+        return list(self.iter_slides(file_path))
+
+    def iter_slides(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Parse a PDF file lazily, yielding one page dict at a time.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        return self._iter_pages(file_path)
+
+    def _iter_pages(self, file_path: str) -> Iterator[Dict[str, Any]]:
         # Use PyMuPDF for better image extraction
         pdf_document = fitz.open(file_path)
-        pages_data = []
-
-        for idx, page in enumerate(pdf_document, 1):
-            page_data = {
-                'page_number': idx,
-                'text_content': page.get_text(),
-                'images': self._extract_images(page),
-                'metadata': self._get_page_metadata(page)
-            }
-            pages_data.append(page_data)
-
-        pdf_document.close()
-        return pages_data
+        try:
+            for idx, page in enumerate(pdf_document, 1):
+                yield {
+                    'page_number': idx,
+                    'text_content': page.get_text(),
+                    'images': self._extract_images(page),
+                    'metadata': self._get_page_metadata(page)
+                }
+        finally:
+            pdf_document.close()
 
     def _extract_images(self, page) -> List[Dict[str, Any]]:
         """Extract images from PDF page using PyMuPDF."""
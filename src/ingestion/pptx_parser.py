@@ -1,5 +1,5 @@
 from pptx import Presentation
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import os
 from PIL import Image
 import io
@@ -12,23 +12,27 @@ class PPTXParser:
         """
         Parse a PPTX file and extract text and images from each slide.
         """
+        return list(self.iter_slides(file_path))
+
+    def iter_slides(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Parse a PPTX file lazily, yielding one slide dict at a time.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
         presentation = Presentation(file_path)
-        slides_data = []
+        return self._iter_slides(presentation)
 
+    def _iter_slides(self, presentation) -> Iterator[Dict[str, Any]]:
         for idx, slide in enumerate(presentation.slides, 1):
-            slide_data = {
+            yield {
                 'slide_number': idx,
                 'text_content': self._extract_text(slide),
                 'images': self._extract_images(slide),
                 'notes': self._extract_notes(slide),
                 'layout': self._get_slide_layout(slide)
             }
-            slides_data.append(slide_data)
-
-        return slides_data
 
     def _extract_text(self, slide) -> str:
         """Extract text from slide shapes."""
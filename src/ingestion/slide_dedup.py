@@ -0,0 +1,312 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from typing import Any, Dict, List, Optional
+import cv2
+import numpy as np
+
+# Hashes are split into 8 blocks of 8 bits and every pair of blocks is a
+# lookup key: hashes within Hamming distance 6 differ in at most 6 blocks,
+# so they share at least two clean blocks and therefore one key.
+BLOCKS = 8
+BLOCK_PAIRS = list(itertools.combinations(range(BLOCKS), 2))
+MAX_THRESHOLD = BLOCKS - 2
+_WORD = re.compile(r"\w+")
+
+def normalize_text(text: str) -> str:
+    return " ".join(_WORD.findall(unicodedata.normalize('NFKC', text or '').lower()))
+
+def perceptual_hash(image_path: str) -> int:
+    """
+    64-bit DCT perceptual hash of an image.
+
+    The image is shrunk to 32x32 grayscale and each bit records whether one
+    of the 8x8 lowest-frequency DCT coefficients is above their median, so
+    re-renders, rescaling and light edits barely change the hash.
+    """
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Could not read image: {image_path}")
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int("".join('1' if bit else '0' for bit in bits), 2)
+
+def text_simhash(text: str) -> int:
+    """
+    64-bit SimHash over the words of a text.
+
+    Slide text is short, so single words are used as features: editing one
+    word of a 40-50 word slide changes about 3 bits, while shingles would
+    turn the same edit into a distance well above the match threshold.
+    """
+    words = normalize_text(text).split()
+    if not words:
+        return 0
+    hashes = np.array([int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+                       for word in words], dtype=np.uint64)
+    bits = (hashes[:, None] >> np.arange(63, -1, -1, dtype=np.uint64)) & np.uint64(1)
+    weights = (2 * bits.astype(np.int64) - 1).sum(axis=0)
+    return int("".join('1' if weight > 0 else '0' for weight in weights), 2)
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def _signed(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+def _band_keys(value: int) -> List[int]:
+    blocks = [(value >> (8 * block)) & 0xFF for block in range(BLOCKS)]
+    return [(blocks[i] << 8) | blocks[j] for i, j in BLOCK_PAIRS]
+
+class SlideDeduplicator:
+    """
+    Index of slide fingerprints for exact and near-duplicate detection.
+
+    A slide's fingerprint is the perceptual hash of its rendered image plus
+    a SimHash and digest of its parsed text (taken before OCR, so image-only
+    slides match on the image alone). Candidates are looked up by text hash
+    (or, for slides without text, by image hash) and must be within the
+    Hamming thresholds on both; rendered text slides all look alike to a
+    perceptual hash, so the text decides for them.
+    The index is SQLite, so it is shared across ingest workers and runs,
+    and it keeps each canonical slide's OCR output and topics for reuse
+    along with the links from duplicates to their canonical slide.
+    """
+
+    def __init__(self, path: str = "data/processed/fingerprints.sqlite", image_threshold: int = 6,
+                 text_threshold: int = 6, timeout: float = 30.0):
+        if max(image_threshold, text_threshold) > MAX_THRESHOLD:
+            raise ValueError(f"Hamming thresholds above {MAX_THRESHOLD} are not supported")
+        self.path = path
+        self.image_threshold = image_threshold
+        self.text_threshold = text_threshold
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " id INTEGER PRIMARY KEY,"
+            " document_id TEXT NOT NULL,"
+            " slide_number INTEGER NOT NULL,"
+            " phash INTEGER NOT NULL,"
+            " simhash INTEGER NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " UNIQUE (document_id, slide_number))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_exact ON fingerprints(phash, text_hash)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprint_bands ("
+            " kind TEXT NOT NULL,"
+            " band INTEGER NOT NULL,"
+            " value INTEGER NOT NULL,"
+            " fingerprint_id INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprint_bands ON fingerprint_bands(kind, band, value)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS duplicates ("
+            " document_id TEXT NOT NULL,"
+            " slide_number INTEGER NOT NULL,"
+            " canonical_id INTEGER NOT NULL,"
+            " exact INTEGER NOT NULL,"
+            " PRIMARY KEY (document_id, slide_number))"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS stale_documents (document_id TEXT PRIMARY KEY)")
+        self.conn.commit()
+
+    def fingerprint(self, image_path: str, text: str) -> Dict[str, Any]:
+        normalized = normalize_text(text)
+        return {
+            'phash': perceptual_hash(image_path),
+            'simhash': text_simhash(normalized),
+            'text_hash': hashlib.sha1(normalized.encode('utf-8')).hexdigest(),
+            'has_text': bool(normalized)
+        }
+
+    def find(self, fingerprint: Dict[str, Any], document_id: str = None,
+             slide_number: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the canonical slide this fingerprint duplicates, or None.
+
+        The slide's own earlier fingerprint (same `document_id` and
+        `slide_number`, e.g. when a changed deck is reprocessed) never
+        matches. The result has `document_id`, `slide_number`, `exact` and
+        the canonical slide's `content`, `ocr_confidence` and `topics`.
+        """
+        own = (document_id, slide_number)
+        row = self.conn.execute(
+            "SELECT id, document_id, slide_number, data FROM fingerprints"
+            " WHERE phash = ? AND text_hash = ? AND NOT (document_id IS ? AND slide_number IS ?) LIMIT 1",
+            (_signed(fingerprint['phash']), fingerprint['text_hash'], document_id, slide_number)
+        ).fetchone()
+        if row:
+            return self._canonical(row, exact=True)
+
+        kind, value = self._lookup_key(fingerprint)
+        clauses, params = [], [kind]
+        for band, band_value in enumerate(_band_keys(value)):
+            clauses.append("(band = ? AND value = ?)")
+            params.extend([band, band_value])
+
+        candidates = self.conn.execute(
+            "SELECT f.id, f.document_id, f.slide_number, f.data, f.phash, f.simhash, f.text_hash"
+            " FROM fingerprints f WHERE f.id IN ("
+            f" SELECT fingerprint_id FROM fingerprint_bands WHERE kind = ? AND ({' OR '.join(clauses)}))",
+            params
+        ).fetchall()
+
+        best, best_distance = None, None
+        for candidate in candidates:
+            if (candidate[1], candidate[2]) == own:
+                continue
+            image_distance = hamming(fingerprint['phash'], _unsigned(candidate[4]))
+            if image_distance > self.image_threshold:
+                continue
+            candidate_has_text = json.loads(candidate[3]).get('has_text', False)
+            if fingerprint['has_text'] != candidate_has_text:
+                continue
+            text_distance = hamming(fingerprint['simhash'], _unsigned(candidate[5])) if fingerprint['has_text'] else 0
+            if text_distance > self.text_threshold:
+                continue
+            if best_distance is None or image_distance + text_distance < best_distance:
+                best, best_distance = candidate, image_distance + text_distance
+
+        return self._canonical(best[:4], exact=False) if best else None
+
+    def add(self, document_id: str, slide_number: int, fingerprint: Dict[str, Any], slide: Dict[str, Any]):
+        """
+        Register a processed slide as canonical for its fingerprint.
+        """
+        data = {
+            'content': slide.get('content', ''),
+            'ocr_confidence': slide.get('metadata', {}).get('ocr_confidence', 1.0),
+            'topics': slide.get('topics', []),
+            'has_text': fingerprint['has_text']
+        }
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM fingerprint_bands WHERE fingerprint_id IN ("
+                " SELECT id FROM fingerprints WHERE document_id = ? AND slide_number = ?)",
+                (document_id, slide_number)
+            )
+            self.conn.execute(
+                "DELETE FROM duplicates WHERE document_id = ? AND slide_number = ?", (document_id, slide_number)
+            )
+            # Upsert in place so links from earlier duplicates keep pointing at this slide
+            self.conn.execute(
+                "INSERT INTO fingerprints (document_id, slide_number, phash, simhash, text_hash, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (document_id, slide_number) DO UPDATE SET"
+                " phash = excluded.phash, simhash = excluded.simhash,"
+                " text_hash = excluded.text_hash, data = excluded.data",
+                (document_id, slide_number, _signed(fingerprint['phash']), _signed(fingerprint['simhash']),
+                 fingerprint['text_hash'], json.dumps(data))
+            )
+            fingerprint_id = self.conn.execute(
+                "SELECT id FROM fingerprints WHERE document_id = ? AND slide_number = ?", (document_id, slide_number)
+            ).fetchone()[0]
+            kind, value = self._lookup_key(fingerprint)
+            self.conn.executemany(
+                "INSERT INTO fingerprint_bands (kind, band, value, fingerprint_id) VALUES (?, ?, ?, ?)",
+                [(kind, band, band_value, fingerprint_id) for band, band_value in enumerate(_band_keys(value))]
+            )
+
+    def remove_document(self, document_id: str) -> int:
+        """
+        Forget every fingerprint and duplicate link of a document, before it
+        is reprocessed, so a changed deck never matches its own old slides.
+
+        Duplicate slides are never stored themselves, so documents with
+        slides linked to a removed fingerprint lose them; they are marked
+        stale (see `stale_documents`) until they are reprocessed. Returns how
+        many fingerprints were removed.
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO stale_documents (document_id)"
+                " SELECT DISTINCT d.document_id FROM duplicates d JOIN fingerprints f ON f.id = d.canonical_id"
+                " WHERE f.document_id = ? AND d.document_id != ?",
+                (document_id, document_id)
+            )
+            self.conn.execute("DELETE FROM stale_documents WHERE document_id = ?", (document_id,))
+            ids = "SELECT id FROM fingerprints WHERE document_id = ?"
+            self.conn.execute(f"DELETE FROM fingerprint_bands WHERE fingerprint_id IN ({ids})", (document_id,))
+            self.conn.execute(f"DELETE FROM duplicates WHERE canonical_id IN ({ids})", (document_id,))
+            self.conn.execute("DELETE FROM duplicates WHERE document_id = ?", (document_id,))
+            return self.conn.execute("DELETE FROM fingerprints WHERE document_id = ?", (document_id,)).rowcount
+
+    def stale_documents(self) -> List[str]:
+        """
+        Documents whose duplicate slides lost their canonical slide and must
+        be reprocessed from scratch to be found again.
+        """
+        return [row[0] for row in self.conn.execute("SELECT document_id FROM stale_documents ORDER BY document_id")]
+
+    def set_topics(self, document_id: str, slide_number: int, topics: List[str]):
+        """
+        Record the topics of a canonical slide once it has been tagged.
+
+        Slides are registered by `add` while they are processed, before
+        topics are assigned at store time, so later duplicates can only
+        reuse the topics recorded here.
+        """
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT id, data FROM fingerprints WHERE document_id = ? AND slide_number = ?",
+                (document_id, slide_number)
+            ).fetchone()
+            if row is None:
+                return
+            data = json.loads(row[1])
+            data['topics'] = list(topics)
+            self.conn.execute("UPDATE fingerprints SET data = ? WHERE id = ?", (json.dumps(data), row[0]))
+
+    def link(self, document_id: str, slide_number: int, canonical: Dict[str, Any]):
+        """Record that a slide duplicates `canonical` (a result of find())."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO duplicates (document_id, slide_number, canonical_id, exact) VALUES (?, ?, ?, ?)",
+                (document_id, slide_number, canonical['id'], int(canonical['exact']))
+            )
+
+    def duplicates(self, document_id: str, slide_number: int) -> List[Dict[str, Any]]:
+        """Slides linked to the given canonical slide."""
+        rows = self.conn.execute(
+            "SELECT d.document_id, d.slide_number, d.exact FROM duplicates d"
+            " JOIN fingerprints f ON f.id = d.canonical_id"
+            " WHERE f.document_id = ? AND f.slide_number = ? ORDER BY d.document_id, d.slide_number",
+            (document_id, slide_number)
+        ).fetchall()
+        return [{'document_id': row[0], 'slide_number': row[1], 'exact': bool(row[2])} for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def _lookup_key(self, fingerprint: Dict[str, Any]):
+        if fingerprint['has_text']:
+            return 'text', fingerprint['simhash']
+        return 'image', fingerprint['phash']
+
+    def _canonical(self, row, exact: bool) -> Dict[str, Any]:
+        data = json.loads(row[3])
+        return {
+            'id': row[0],
+            'document_id': row[1],
+            'slide_number': row[2],
+            'exact': exact,
+            'content': data['content'],
+            'ocr_confidence': data['ocr_confidence'],
+            'topics': data['topics']
+        }
@@ -1,84 +1,216 @@
 from pptx import Presentation
+import hashlib
+import json
 import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import io
-from typing import List, Dict, Any
-import tempfile
-import subprocess
+from urllib.parse import quote
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from office_converter import OfficeConverter, remove_converted
+
+def _render_page_jobs(pdf_path: str, jobs: List[Tuple[int, str]], dpi: int) -> Dict[int, str]:
+    """Render (page_number, output_path) jobs from one PDF; runs in a worker process."""
+    import fitz  # PyMuPDF
+
+    rendered = {}
+    pdf_document = fitz.open(pdf_path)
+    try:
+        for page_number, output_path in jobs:
+            pix = pdf_document[page_number - 1].get_pixmap(dpi=dpi)
+            pix.save(output_path)
+            rendered[page_number] = output_path
+    finally:
+        pdf_document.close()
+    return rendered
+
+def preview_url(presentation_id: str, slide_number: int) -> str:
+    """API route that renders a slide's thumbnail on demand (see src/api/main.py)."""
+    return f"/presentations/{quote(presentation_id, safe='')}/slides/{slide_number}/preview"
 
 class SlideRenderer:
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, converter=None, config_path: str = "config/rendering_config.json",
+                 workers: int = None):
+        """
+        `converter` is anything with a `convert(path) -> pdf_path` method,
+        such as a shared `ConverterPool`; a one-shot `OfficeConverter` with
+        its own profile is used by default. `workers` overrides the
+        configured number of rendering processes (1 renders in-process).
+        """
         self.output_dir = output_dir
+        self.converter = converter or OfficeConverter()
+        self._load_config(config_path)
+        if workers:
+            self.workers = workers
         os.makedirs(output_dir, exist_ok=True)
 
+    def _load_config(self, config_path: str):
+        """Load rendering configuration."""
+        # Default configuration
+        self.config = {
+            'dpi': {
+                'ocr': 300,
+                'thumbnail': 144
+            },
+            'workers': 0,
+            'lazy': False
+        }
+
+        if os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                self.config.update(json.load(f))
+
+        self.workers = self.config['workers'] or os.cpu_count() or 1
+        self.lazy = self.config['lazy']
+
+    def document_dir(self, document_path: str) -> str:
+        """Output directory for one document, so page images never collide across decks."""
+        stem = re.sub(r'[^A-Za-z0-9._-]+', '_', os.path.splitext(os.path.basename(document_path))[0])
+        digest = hashlib.sha1(os.path.abspath(document_path).encode('utf-8')).hexdigest()[:8]
+        return os.path.join(self.output_dir, f"{stem}_{digest}")
+
+    def page_image_path(self, document_path: str, page_number: int, purpose: str = 'thumbnail') -> str:
+        return os.path.join(self.document_dir(document_path), f"slide_{page_number}_{purpose}.png")
+
     def render_slides(self, pptx_path: str) -> List[str]:
         """
         Render slides to images and return paths to rendered images.
         """
+        return list(self.iter_render_slides(pptx_path))
+
+    def iter_render_slides(self, pptx_path: str) -> Iterator[str]:
+        """
+        Render slides lazily, yielding each image path as its page is rendered.
+        """
         if not os.path.exists(pptx_path):
             raise FileNotFoundError(f"File not found: {pptx_path}")
 
+        return self._iter_render_converted(pptx_path)
+
+    def _iter_render_converted(self, pptx_path: str) -> Iterator[str]:
         # Convert PPTX to PDF first using LibreOffice
-        pdf_path = self._convert_to_pdf(pptx_path)
-        
-        # Render PDF pages to images
-        rendered_paths = self._render_pdf_pages(pdf_path)
-        
-        # Clean up temporary PDF
-        os.remove(pdf_path)
-        
-        return rendered_paths
+        pdf_path = self.prepare_source(pptx_path)
+        try:
+            import fitz  # PyMuPDF
+            with fitz.open(pdf_path) as pdf_document:
+                page_count = len(pdf_document)
+
+            # Render PDF pages to images
+            for page_number in range(1, page_count + 1):
+                yield self.render_page(pdf_path, pptx_path, page_number)
+        finally:
+            self.release_source(pptx_path, pdf_path)
+
+    def prepare_source(self, document_path: str) -> str:
+        """
+        Return a PDF to rasterize for a document, converting PPTX via LibreOffice.
+
+        In lazy mode the converted PDF is kept next to the page images so
+        previews can still be rendered on demand after ingestion.
+        """
+        if os.path.splitext(document_path)[1].lower() == '.pdf':
+            return document_path
+
+        kept_path = os.path.join(self.document_dir(document_path), "source.pdf")
+        if self.lazy and os.path.exists(kept_path) \
+                and os.path.getmtime(kept_path) >= os.path.getmtime(document_path):
+            return kept_path
+
+        pdf_path = self._convert_to_pdf(document_path)
+        if self.lazy:
+            os.makedirs(os.path.dirname(kept_path), exist_ok=True)
+            shutil.move(pdf_path, kept_path)
+            remove_converted(pdf_path)
+            return kept_path
+        return pdf_path
+
+    def release_source(self, document_path: str, pdf_path: str) -> None:
+        """Clean up the PDF returned by `prepare_source` unless it is kept."""
+        if pdf_path != document_path and not self.lazy:
+            remove_converted(pdf_path)
+
+    def render_page(self, pdf_path: str, document_path: str, page_number: int,
+                    purpose: str = 'thumbnail') -> str:
+        """
+        Render a single page at the DPI configured for `purpose`, reusing an
+        existing image when one is already on disk.
+        """
+        output_path = self.page_image_path(document_path, page_number, purpose)
+        if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(pdf_path):
+            return output_path
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _render_page_jobs(pdf_path, [(page_number, output_path)], self.config['dpi'][purpose])
+        return output_path
+
+    def render_document(self, pdf_path: str, document_path: str, pages: Optional[List[int]] = None,
+                        purpose: str = 'thumbnail') -> Dict[int, str]:
+        """
+        Render pages of a PDF across a pool of worker processes.
+
+        Returns a mapping of page number to image path. `pages` defaults to
+        every page; pages whose image is already up to date are not redrawn.
+        """
+        import fitz  # PyMuPDF
+
+        if pages is None:
+            with fitz.open(pdf_path) as pdf_document:
+                pages = list(range(1, len(pdf_document) + 1))
+
+        rendered = {}
+        jobs = []
+        for page_number in pages:
+            output_path = self.page_image_path(document_path, page_number, purpose)
+            if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(pdf_path):
+                rendered[page_number] = output_path
+            else:
+                jobs.append((page_number, output_path))
+
+        if not jobs:
+            return rendered
+
+        os.makedirs(self.document_dir(document_path), exist_ok=True)
+        dpi = self.config['dpi'][purpose]
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            rendered.update(_render_page_jobs(pdf_path, jobs, dpi))
+            return rendered
+
+        # Each worker opens the PDF once and renders an interleaved share of the pages
+        chunks = [jobs[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(_render_page_jobs, [pdf_path] * workers, chunks, [dpi] * workers):
+                rendered.update(result)
+        return rendered
+
+    def preview_path(self, document_path: str, page_number: int) -> str:
+        """
+        Return the thumbnail for a page, rendering it on demand (lazy mode).
+
+        Serves `preview_url` in the API for slides ingested without
+        thumbnails.
+        """
+        pdf_path = self.prepare_source(document_path)
+        try:
+            return self.render_page(pdf_path, document_path, page_number, 'thumbnail')
+        finally:
+            self.release_source(document_path, pdf_path)
 
     def _convert_to_pdf(self, pptx_path: str) -> str:
         """Convert PPTX to PDF using LibreOffice."""
-        # Create temporary PDF file
-        pdf_path = os.path.join(tempfile.gettempdir(), f"temp_{os.path.basename(pptx_path)}.pdf")
-        
-        # Use LibreOffice to convert PPTX to PDF
-        try:
-            subprocess.run([
-                'soffice',
-                '--headless',
-                '--convert-to', 'pdf',
-                '--outdir', os.path.dirname(pdf_path),
-                pptx_path
-            ], check=True)
-            
-            # LibreOffice creates the PDF in the same directory as the input file
-            temp_pdf = os.path.splitext(pptx_path)[0] + '.pdf'
-            os.rename(temp_pdf, pdf_path)
-            
-            return pdf_path
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Failed to convert PPTX to PDF: {str(e)}")
-        except FileNotFoundError:
-            raise Exception("LibreOffice not found. Please install LibreOffice.")
+        # The converter writes into a unique temp directory per job
+        return self.converter.convert(pptx_path)
 
     def _render_pdf_pages(self, pdf_path: str) -> List[str]:
         """Render PDF pages to images."""
-        import fitz  # PyMuPDF
-        
-        pdf_document = fitz.open(pdf_path)
-        rendered_paths = []
-        
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-            
-            output_path = os.path.join(
-                self.output_dir,
-                f"slide_{page_num + 1}.png"
-            )
-            
-            pix.save(output_path)
-            rendered_paths.append(output_path)
-        
-        pdf_document.close()
-        return rendered_paths
+        rendered = self.render_document(pdf_path, pdf_path)
+        return [rendered[page_number] for page_number in sorted(rendered)]
 
     def _get_slide_dimensions(self, presentation: Presentation) -> Dict[str, int]:
         """Get slide dimensions from presentation."""
         return {
             'width': presentation.slide_width,
             'height': presentation.slide_height
-        } 
\ No newline at end of file
+        }
@@ -1,42 +1,108 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+import threading
 from typing import List, Dict, Any
 from src.search.query_processor import QueryProcessor
-from src.storage.weaviate_client import WeaviateClient
+from src.storage.vector_store import VectorStore
+
+# Pool shared by HybridSearch instances that are not given one, created on
+# first use so importing this module starts no threads
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+def default_executor() -> Executor:
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+        return _default_executor
 
 class HybridSearch:
-    def __init__(self):
-        self.query_processor = QueryProcessor()
-        self.weaviate_client = WeaviateClient()
+    def __init__(self, vector_weight: float = 0.5, rrf_k: int = 60, overfetch: int = 3,
+                 limit: int = 10, native_hybrid: bool = False,
+                 query_processor: QueryProcessor = None, vector_store: VectorStore = None,
+                 executor: Executor = None):
+        """
+        `vector_weight` is the share of the fused score given to the vector
+        leg (the BM25 leg gets the rest), `rrf_k` is the reciprocal-rank
+        fusion constant, and each leg fetches `limit * overfetch` candidates.
+        `native_hybrid` uses the store's single hybrid query (Weaviate >= 1.17)
+        instead; it takes `vector_weight` as alpha but fuses with the
+        server's own ranking, not `rrf_k`. The vector store defaults to the
+        query processor's. Both legs run on `executor`, a shared default
+        pool unless one is given; it must not be the pool `search` itself
+        runs on, or a full pool would wait on its own legs.
+        """
+        self.query_processor = query_processor or QueryProcessor()
+        self.vector_store = vector_store or self.query_processor.vector_store
+        self.vector_weight = vector_weight
+        self.rrf_k = rrf_k
+        self.overfetch = overfetch
+        self.limit = limit
+        self.native_hybrid = native_hybrid
+        self.executor = executor
 
-    def search(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def search(self, query: str, filters: Dict[str, Any] = None, limit: int = None) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining vector and keyword search.
         """
-        # Vector search
-        vector_results = self.query_processor.process_query(query, filters)
+        limit = limit or self.limit
+        depth = limit * self.overfetch
+        query_embedding = self.query_processor.get_query_embedding(query)
+
+        # Filters run inside each store query; only unsupported fields are applied locally
+        where, local_filters = self.vector_store.build_where_filter(filters)
 
-        # Keyword search (using Weaviate's bm25)
-        keyword_results = self.weaviate_client.search_slides(
-            query,
-            search_type="bm25"
-        )
+        if self.native_hybrid:
+            combined_results = self.vector_store.search_hybrid(
+                query, query_embedding, alpha=self.vector_weight, limit=depth, where=where
+            )
+        else:
+            # Run both legs concurrently so latency is max(vector, bm25) rather than the sum
+            executor = self.executor or default_executor()
+            vector_future = executor.submit(
+                self.vector_store.search_by_vector, query_embedding, depth, where
+            )
+            keyword_future = executor.submit(self.vector_store.search_bm25, query, depth, where)
+            combined_results = self._combine_results(vector_future.result(), keyword_future.result())
 
-        # Combine and rank results
-        combined_results = self._combine_results(vector_results, keyword_results)
-        return combined_results
+        if local_filters:
+            combined_results = self.query_processor._apply_filters(combined_results, local_filters)
 
-    def _combine_results(self, vector_results: List[Dict[str, Any]], 
+        return combined_results[:limit]
+
+    def _combine_results(self, vector_results: List[Dict[str, Any]],
                         keyword_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Combine and rank results from different search methods.
+        Combine and rank results with weighted reciprocal-rank fusion.
+
+        Each result scores weight / (rrf_k + rank) for every list it appears
+        in; results are ordered by the summed score, which is stored under
+        `score`.
         """
-        # Simple implementation - can be enhanced with better ranking
-        seen_ids = set()
+        scores = {}
+        results = {}
+        legs = [
+            (vector_results, self.vector_weight),
+            (keyword_results, 1.0 - self.vector_weight)
+        ]
+
+        for leg_results, weight in legs:
+            for rank, result in enumerate(leg_results, 1):
+                result_id = self._result_id(result)
+                scores[result_id] = scores.get(result_id, 0.0) + weight / (self.rrf_k + rank)
+                results.setdefault(result_id, result)
+
         combined = []
+        for result_id in sorted(scores, key=scores.get, reverse=True):
+            result = dict(results[result_id])
+            result["score"] = scores[result_id]
+            combined.append(result)
 
-        for result in vector_results + keyword_results:
-            result_id = result.get("id")
-            if result_id not in seen_ids:
-                seen_ids.add(result_id)
-                combined.append(result)
+        return combined
 
-        return combined 
\ No newline at end of file
+    def _result_id(self, result: Dict[str, Any]) -> str:
+        """Stores return ids under _additional; fall back to the slide identity."""
+        result_id = (result.get("_additional") or {}).get("id") or result.get("id")
+        if result_id:
+            return result_id
+        return f"{result.get('presentationId')}:{result.get('slideNumber')}"
@@ -1,36 +1,87 @@
+from collections import OrderedDict
+import threading
 from typing import List, Dict, Any
+from src.embedding.embedding_cache import EmbeddingCache
 from src.embedding.text_embedder import TextEmbedder
-from src.storage.weaviate_client import WeaviateClient
+from src.storage.vector_store import VectorStore, is_empty_filter, matches_filter
+from src.utils.model_registry import get_text_embedder, get_vector_store
 
 class QueryProcessor:
-    def __init__(self):
-        self.text_embedder = TextEmbedder()
-        self.weaviate_client = WeaviateClient()
+    def __init__(self, query_cache_size: int = 1024, local_filter_overfetch: int = 5,
+                 text_embedder: TextEmbedder = None, vector_store: VectorStore = None):
+        # Defaults are the process-wide instances, so models and clients load once
+        self.text_embedder = text_embedder or get_text_embedder()
+        self.vector_store = vector_store or get_vector_store()
 
-    def process_query(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        # In-process LRU cache of normalized query -> embedding
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+        # Candidates fetched per result when some filters must run locally
+        self.local_filter_overfetch = local_filter_overfetch
+
+    def process_query(self, query: str, filters: Dict[str, Any] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Process a search query with optional filters.
+
+        Filters the backend supports run inside the vector store query; any
+        others are applied locally over an over-fetched candidate list.
         """
         # Generate query embedding
-        query_embedding = self.text_embedder.generate_embedding(query)
+        query_embedding = self.get_query_embedding(query)
+
+        where, local_filters = self.vector_store.build_where_filter(filters)
+        depth = limit * self.local_filter_overfetch if local_filters else limit
 
-        # Search in Weaviate
-        results = self.weaviate_client.search_slides(query)
+        # Search the vector store with the precomputed vector
+        results = self.vector_store.search_by_vector(query_embedding, limit=depth, where=where)
 
-        # Apply filters if provided
-        if filters:
-            results = self._apply_filters(results, filters)
+        # Apply filters the backend could not handle
+        if local_filters:
+            results = self._apply_filters(results, local_filters)
 
-        return results
+        return results[:limit]
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        """
+        Return the embedding for a query, using the LRU cache when possible.
+        """
+        key = self._normalize_query(query)
+
+        with self._query_cache_lock:
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                return self._query_cache[key]
+
+        embedding = self.text_embedder.embed_query(key)
+
+        with self._query_cache_lock:
+            self._query_cache[key] = embedding
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+
+        return embedding
+
+    def _normalize_query(self, query: str) -> str:
+        """Normalize case and whitespace so equivalent queries share a cache entry."""
+        return EmbeddingCache.normalize_text(query).lower()
 
     def _apply_filters(self, results: List[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Apply filters to search results.
+
+        Uses the same semantics as the backend where-clause: a dict is a
+        gt/gte/lt/lte range, a list matches any overlapping value, and
+        empty values are ignored.
         """
         filtered_results = results
         for key, value in filters.items():
+            if is_empty_filter(value):
+                continue
             filtered_results = [
                 r for r in filtered_results
-                if r.get(key) == value
+                if matches_filter(r.get(key), value)
             ]
-        return filtered_results 
\ No newline at end of file
+        return filtered_results
@@ -0,0 +1,404 @@
+import argparse
+from itertools import islice
+import json
+import logging
+import math
+import os
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import numpy as np
+from src.storage.local_index import assign_to_centroids, normalize_rows, spherical_kmeans
+from src.storage.vector_file import VectorFile, write_vector_file
+from src.storage.vector_store import VectorStore, create_vector_store
+
+logger = logging.getLogger(__name__)
+
+class RelatedSlidesGraph:
+    """
+    Precomputed k-nearest-neighbour graph over slide embeddings.
+
+    Every slide keeps two adjacency rows sorted by cosine similarity: its
+    `k` nearest slides overall and its `k` nearest slides from other
+    presentations, so a lookup reads one fixed-size row (O(k)). Saved
+    graphs are memory-mapped and only copied into memory when updated.
+
+    Up to `exact_threshold` slides the graph is exact; larger graphs are
+    built by clustering the vectors and comparing each cluster with its
+    `nprobe` nearest clusters. Incremental adds are always exact.
+    """
+
+    def __init__(self, path: str = None, k: int = 20, exact_threshold: int = 20000, nprobe: int = 8,
+                 vector_dtype: str = "float16"):
+        self.path = path
+        self.k = k
+        self.exact_threshold = exact_threshold
+        self.nprobe = nprobe
+        self.vector_dtype = vector_dtype
+
+        self.ids = []
+        self._rows = {}
+        self.presentation_names = []
+        self._presentation_codes = {}
+        self.presentations = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+
+        # Neighbour rows (-1 when empty) and similarities, best first
+        self.neighbors = np.full((0, k), -1, dtype=np.int32)
+        self.scores = np.full((0, k), -np.inf, dtype=np.float16)
+        self.cross_neighbors = np.full((0, k), -1, dtype=np.int32)
+        self.cross_scores = np.full((0, k), -np.inf, dtype=np.float16)
+
+        # Vectors: the saved (memory-mapped) file followed by rows added since
+        self._vector_file = None
+        self._extra_vectors = None
+        self._writable = True
+        self._lock = threading.RLock()
+        # graph.json's mtime when the graph was loaded, to notice newer saves
+        self._loaded_mtime = None
+
+        if path and os.path.exists(os.path.join(path, "graph.json")):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, slide_id: str) -> bool:
+        return slide_id in self._rows
+
+    def related(self, slide_id: str, limit: int = None,
+                exclude_same_presentation: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        The nearest slides to `slide_id` as {id, presentationId, score}
+        dicts, or None if the slide is not in the graph.
+        """
+        row = self._rows.get(slide_id)
+        if row is None:
+            return None
+        neighbors = self.cross_neighbors if exclude_same_presentation else self.neighbors
+        scores = self.cross_scores if exclude_same_presentation else self.scores
+        limit = limit or self.k
+
+        related = []
+        for neighbor, score in zip(neighbors[row], scores[row]):
+            if neighbor < 0:
+                break
+            if not self.alive[neighbor]:
+                continue
+            related.append({
+                "id": self.ids[neighbor],
+                "presentationId": self.presentation_names[self.presentations[neighbor]],
+                "score": float(score)
+            })
+            if len(related) >= limit:
+                break
+        return related
+
+    def build(self, slides: Iterable[Tuple[str, str, List[float]]]):
+        """
+        Rebuild the whole graph from (slide_id, presentation_id, vector) triples.
+        """
+        ids, presentations, vectors = [], [], []
+        latest = {}
+        for slide_id, presentation_id, vector in slides:
+            latest[slide_id] = len(ids)
+            ids.append(slide_id)
+            presentations.append(presentation_id)
+            vectors.append(np.asarray(vector, dtype=np.float32))
+        keep = sorted(latest.values())
+
+        with self._lock:
+            path = self.path
+            self.__init__(None, self.k, self.exact_threshold, self.nprobe, self.vector_dtype)
+            self.path = path
+            if not keep:
+                return
+            self._append([ids[i] for i in keep], [presentations[i] for i in keep],
+                         normalize_rows(np.vstack([vectors[i] for i in keep])))
+
+            count = len(self.ids)
+            if count <= self.exact_threshold:
+                self._update_rows(np.arange(count))
+            else:
+                self._build_clustered()
+            logger.info("Built related-slides graph over %d slides", count)
+
+    def add(self, slides: Iterable[Tuple[str, str, List[float]]]):
+        """
+        Insert or replace slides, linking them exactly to all live slides and
+        updating the neighbour lists of existing slides they displace.
+        """
+        ids, presentations, vectors = [], [], []
+        for slide_id, presentation_id, vector in slides:
+            ids.append(slide_id)
+            presentations.append(presentation_id)
+            vectors.append(np.asarray(vector, dtype=np.float32))
+        if not ids:
+            return
+
+        with self._lock:
+            self._ensure_writable()
+            self.remove(ids)
+            start = len(self.ids)
+            self._append(ids, presentations, normalize_rows(np.vstack(vectors)))
+            self._update_rows(np.arange(start, len(self.ids)), update_existing=True)
+
+    def remove(self, slide_ids: Iterable[str]) -> int:
+        """
+        Drop slides; lookups skip them until the next rebuild.
+        """
+        with self._lock:
+            removed = 0
+            for slide_id in slide_ids:
+                row = self._rows.pop(slide_id, None)
+                if row is not None:
+                    self._ensure_writable()
+                    self.alive[row] = False
+                    removed += 1
+            return removed
+
+    def sync(self, vector_store: VectorStore, rebuild: bool = False, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Bring the graph up to date with a vector store: add new or changed
+        slides, drop deleted ones. With `rebuild` the graph is recomputed.
+
+        The store is streamed `batch_size` slides at a time and compared
+        with the stored vectors, so only new and changed slides are kept.
+        """
+        slides = ((slide_id, properties.get("presentationId", ""), vector)
+                  for slide_id, properties, vector in vector_store.iter_slides(batch_size))
+
+        if rebuild or not self._rows:
+            self.build(slides)
+            return {"added": len(self), "removed": 0}
+
+        present = np.zeros(len(self.ids), dtype=bool)
+        changed = []
+        for batch in iter(lambda: list(islice(slides, batch_size)), []):
+            known = [(position, self._rows[slide[0]]) for position, slide in enumerate(batch)
+                     if slide[0] in self._rows]
+            stale = np.ones(len(batch), dtype=bool)
+            if known:
+                positions, rows = (np.asarray(values) for values in zip(*known))
+                present[rows] = True
+                vectors = normalize_rows(np.asarray([batch[position][2] for position in positions],
+                                                    dtype=np.float32))
+                stale[positions] = np.sum(self._vectors(rows) * vectors, axis=1) < 0.999
+            changed.extend(slide for slide, is_stale in zip(batch, stale) if is_stale)
+
+        removed = self.remove([slide_id for slide_id, row in list(self._rows.items()) if not present[row]])
+        self.add(changed)
+        return {"added": len(changed), "removed": removed}
+
+    def outdated(self) -> bool:
+        """Whether a graph newer than the loaded one has been saved to `path`."""
+        return bool(self.path) and self._saved_mtime(self.path) != self._loaded_mtime
+
+    @staticmethod
+    def _saved_mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(path, "graph.json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str = None):
+        path = path or self.path
+        if not path:
+            raise ValueError("No graph path configured")
+
+        with self._lock:
+            os.makedirs(path, exist_ok=True)
+            count = len(self.ids)
+            write_vector_file(os.path.join(path, "vectors.bin"),
+                              ((self.ids[row], self._vector(row)) for row in range(count)),
+                              dtype=self.vector_dtype)
+            arrays = {
+                "presentations": self.presentations[:count],
+                "alive": self.alive[:count],
+                "neighbors": self.neighbors[:count],
+                "scores": self.scores[:count],
+                "cross_neighbors": self.cross_neighbors[:count],
+                "cross_scores": self.cross_scores[:count]
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(path, f"{name}.tmp.npy"), array)
+                os.replace(os.path.join(path, f"{name}.tmp.npy"), os.path.join(path, f"{name}.npy"))
+            with open(os.path.join(path, "graph.tmp.json"), 'w') as f:
+                json.dump({"k": self.k, "presentation_names": self.presentation_names}, f)
+            os.replace(os.path.join(path, "graph.tmp.json"), os.path.join(path, "graph.json"))
+
+            self.path = path
+            self.load()
+
+    def load(self, path: str = None):
+        path = path or self.path
+        mtime = self._saved_mtime(path)
+        with open(os.path.join(path, "graph.json"), 'r') as f:
+            state = json.load(f)
+
+        with self._lock:
+            self._loaded_mtime = mtime
+            self.k = state["k"]
+            self.presentation_names = state["presentation_names"]
+            self._presentation_codes = {name: code for code, name in enumerate(self.presentation_names)}
+            self._vector_file = VectorFile(os.path.join(path, "vectors.bin"))
+            self._extra_vectors = None
+            self.ids = list(self._vector_file.ids)
+
+            def mapped(name):
+                return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+
+            self.presentations = mapped("presentations")
+            self.alive = mapped("alive")
+            self.neighbors = mapped("neighbors")
+            self.scores = mapped("scores")
+            self.cross_neighbors = mapped("cross_neighbors")
+            self.cross_scores = mapped("cross_scores")
+            self._rows = {slide_id: row for row, slide_id in enumerate(self.ids) if self.alive[row]}
+            self._writable = False
+
+    def _ensure_writable(self):
+        """Copy memory-mapped arrays into memory before the first update."""
+        if self._writable:
+            return
+        self.presentations = np.array(self.presentations)
+        self.alive = np.array(self.alive)
+        self.neighbors = np.array(self.neighbors)
+        self.scores = np.array(self.scores)
+        self.cross_neighbors = np.array(self.cross_neighbors)
+        self.cross_scores = np.array(self.cross_scores)
+        self._writable = True
+
+    def _append(self, ids: List[str], presentations: List[str], vectors: np.ndarray):
+        codes = []
+        for name in presentations:
+            if name not in self._presentation_codes:
+                self._presentation_codes[name] = len(self.presentation_names)
+                self.presentation_names.append(name)
+            codes.append(self._presentation_codes[name])
+
+        start = len(self.ids)
+        for offset, slide_id in enumerate(ids):
+            self.ids.append(slide_id)
+            self._rows[slide_id] = start + offset
+
+        count = len(ids)
+        self._extra_vectors = vectors if self._extra_vectors is None else np.vstack([self._extra_vectors, vectors])
+        self.presentations = np.concatenate([self.presentations, np.asarray(codes, dtype=np.int32)])
+        self.alive = np.concatenate([self.alive, np.ones(count, dtype=bool)])
+        self.neighbors = np.vstack([self.neighbors, np.full((count, self.k), -1, dtype=np.int32)])
+        self.scores = np.vstack([self.scores, np.full((count, self.k), -np.inf, dtype=np.float16)])
+        self.cross_neighbors = np.vstack([self.cross_neighbors, np.full((count, self.k), -1, dtype=np.int32)])
+        self.cross_scores = np.vstack([self.cross_scores, np.full((count, self.k), -np.inf, dtype=np.float16)])
+
+    def _stored_count(self) -> int:
+        return len(self._vector_file) if self._vector_file is not None else 0
+
+    def _vector(self, row: int) -> np.ndarray:
+        stored = self._stored_count()
+        if row < stored:
+            return self._vector_file.dequantize(self._vector_file.vectors[row:row + 1])[0]
+        return self._extra_vectors[row - stored]
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        stored = self._stored_count()
+        block = np.empty((len(rows), self._extra_vectors.shape[1] if self._extra_vectors is not None
+                          else self._vector_file.dimensions), dtype=np.float32)
+        in_file = rows < stored
+        if in_file.any():
+            block[in_file] = self._vector_file.dequantize(self._vector_file.vectors[rows[in_file]])
+        if (~in_file).any():
+            block[~in_file] = self._extra_vectors[rows[~in_file] - stored]
+        return block
+
+    def _update_rows(self, query_rows: np.ndarray, candidate_rows: np.ndarray = None,
+                     update_existing: bool = False, query_block: int = 1024, chunk_size: int = 8192):
+        """
+        Compute the neighbour lists of `query_rows` against `candidate_rows`
+        (default: every slide). With `update_existing`, candidates whose
+        lists the query slides improve are updated too.
+        """
+        if candidate_rows is None:
+            candidate_rows = np.arange(len(self.ids))
+        candidate_rows = candidate_rows[self.alive[candidate_rows]]
+
+        for q_start in range(0, len(query_rows), query_block):
+            rows = query_rows[q_start:q_start + query_block]
+            queries = self._vectors(rows)
+            codes = self.presentations[rows]
+
+            for c_start in range(0, len(candidate_rows), chunk_size):
+                candidates = candidate_rows[c_start:c_start + chunk_size]
+                similarity = queries @ self._vectors(candidates).T
+                similarity[rows[:, None] == candidates[None, :]] = -np.inf
+                same = codes[:, None] == self.presentations[candidates][None, :]
+
+                self._merge(rows, candidates, similarity, self.neighbors, self.scores)
+                self._merge(rows, candidates, np.where(same, -np.inf, similarity),
+                            self.cross_neighbors, self.cross_scores)
+
+                if update_existing:
+                    existing = ~np.isin(candidates, query_rows)
+                    if existing.any():
+                        reverse = similarity[:, existing].T
+                        self._merge(candidates[existing], rows, reverse, self.neighbors, self.scores)
+                        self._merge(candidates[existing], rows, np.where(same[:, existing].T, -np.inf, reverse),
+                                    self.cross_neighbors, self.cross_scores)
+
+    def _merge(self, rows: np.ndarray, candidates: np.ndarray, similarity: np.ndarray,
+               neighbors: np.ndarray, scores: np.ndarray):
+        """Merge candidate similarities (len(rows) x len(candidates)) into the rows' top-k lists."""
+        current = scores[rows].astype(np.float32)
+        # Only rows where some candidate beats the current k-th neighbour change
+        improves = similarity.max(axis=1, initial=-np.inf) > current[:, -1]
+        if not improves.any():
+            return
+        rows, current, similarity = rows[improves], current[improves], similarity[improves]
+
+        merged_scores = np.concatenate([current, similarity], axis=1)
+        merged_rows = np.concatenate([neighbors[rows], np.broadcast_to(candidates, similarity.shape)], axis=1)
+        top = np.argpartition(-merged_scores, self.k - 1, axis=1)[:, :self.k]
+        top_scores = np.take_along_axis(merged_scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+
+        new_scores = np.take_along_axis(merged_scores, top, axis=1)
+        new_rows = np.take_along_axis(merged_rows, top, axis=1)
+        new_rows[~np.isfinite(new_scores)] = -1
+        neighbors[rows] = new_rows
+        scores[rows] = new_scores
+
+    def _build_clustered(self):
+        """Approximate build: each cluster is compared with its `nprobe` nearest clusters."""
+        count = len(self.ids)
+        vectors = self._extra_vectors
+        clusters = max(1, int(math.sqrt(count)))
+        sample = vectors[np.random.default_rng(0).choice(count, min(count, 65536), replace=False)]
+        centroids = spherical_kmeans(sample, clusters)
+        assignments = assign_to_centroids(vectors, centroids)
+
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(clusters + 1))
+        nearest = np.argsort(-(centroids @ centroids.T), axis=1)[:, :self.nprobe]
+
+        for cluster in range(clusters):
+            members = order[bounds[cluster]:bounds[cluster + 1]]
+            if not len(members):
+                continue
+            candidates = np.concatenate([order[bounds[c]:bounds[c + 1]] for c in nearest[cluster]])
+            self._update_rows(members, np.sort(candidates))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the related-slides graph")
+    parser.add_argument("--path", default=os.getenv("RELATED_SLIDES_PATH", "data/related"))
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--rebuild", action="store_true", help="recompute the whole graph")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    graph = RelatedSlidesGraph(args.path, k=args.k)
+    result = graph.sync(create_vector_store(), rebuild=args.rebuild or graph.k != args.k)
+    graph.save()
+    print(f"Related-slides graph: {len(graph)} slides, {result['added']} added, {result['removed']} removed")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import boto3
 from typing import Optional
 import os
 from PIL import Image
@@ -8,6 +7,7 @@ class ImageUploader:
     def __init__(self, storage_type: str = "local"):
         self.storage_type = storage_type
         if storage_type == "s3":
+            import boto3
             self.s3_client = boto3.client('s3')
             self.bucket_name = os.getenv("S3_BUCKET_NAME")
 
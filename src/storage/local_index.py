@@ -0,0 +1,568 @@
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+import numpy as np
+from src.storage.vector_store import SLIDE_PROPERTIES, VectorStore, is_empty_filter, matches_filter
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Properties with an inverted index for filtering; slideNumber uses a numeric column
+KEYWORD_PROPERTIES = ["presentationId", "imageUrl", "topics"]
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    """Index of the most similar centroid for each (normalized) vector."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        assignments[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+    return assignments
+
+def spherical_kmeans(sample: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids for normalized `sample` vectors."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign_to_centroids(sample, centroids)
+        order = np.argsort(assignments, kind='stable')
+        sizes = np.bincount(assignments, minlength=clusters)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        sums = centroids.copy()  # empty clusters keep their centroid
+        sums[sizes > 0] = np.add.reduceat(sample[order], starts[sizes > 0], axis=0)
+        centroids = normalize_rows(sums)
+    return centroids
+
+class _Postings:
+    """
+    Inverted lists of (row, value) pairs keyed by term.
+
+    New postings are appended to Python lists and merged into NumPy arrays
+    the first time a key is read, so bulk inserts stay cheap.
+    """
+
+    def __init__(self):
+        self._frozen = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, row: int, value: float = 1.0):
+        with self._lock:
+            rows, values = self._pending.setdefault(key, ([], []))
+            rows.append(row)
+            values.append(value)
+
+    def get(self, key) -> Tuple[np.ndarray, np.ndarray]:
+        if key in self._pending:
+            with self._lock:
+                pending = self._pending.pop(key, None)
+                if pending is not None:
+                    rows, values = self._frozen.get(key, (np.empty(0, np.int64), np.empty(0, np.float32)))
+                    self._frozen[key] = (
+                        np.concatenate([rows, np.asarray(pending[0], dtype=np.int64)]),
+                        np.concatenate([values, np.asarray(pending[1], dtype=np.float32)])
+                    )
+        return self._frozen.get(key, (np.empty(0, np.int64), np.empty(0, np.float32)))
+
+    def keys(self) -> List:
+        return list(set(self._frozen) | set(self._pending))
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_arrays(self) -> Tuple[List, np.ndarray, np.ndarray, np.ndarray]:
+        """Flatten to CSR form: keys, offsets, rows, values."""
+        keys = self.keys()
+        lists = [self.get(key) for key in keys]
+        offsets = np.cumsum([0] + [len(rows) for rows, _ in lists]).astype(np.int64)
+        rows = np.concatenate([rows for rows, _ in lists]) if lists else np.empty(0, np.int64)
+        values = np.concatenate([values for _, values in lists]) if lists else np.empty(0, np.float32)
+        return keys, offsets, rows, values
+
+    @classmethod
+    def from_groups(cls, groups: np.ndarray, count: int) -> "_Postings":
+        """Postings keyed 0..count-1 listing the positions of each group id."""
+        postings = cls()
+        order = np.argsort(groups, kind='stable')
+        bounds = np.searchsorted(groups[order], np.arange(count + 1))
+        for key in range(count):
+            rows = order[bounds[key]:bounds[key + 1]].astype(np.int64)
+            postings._frozen[key] = (rows, np.ones(len(rows), dtype=np.float32))
+        return postings
+
+    @classmethod
+    def from_arrays(cls, keys: List, offsets: np.ndarray, rows: np.ndarray, values: np.ndarray) -> "_Postings":
+        postings = cls()
+        for i, key in enumerate(keys):
+            postings._frozen[key] = (rows[offsets[i]:offsets[i + 1]], values[offsets[i]:offsets[i + 1]])
+        return postings
+
+class LocalVectorIndex(VectorStore):
+    """
+    Embedded slide index: an IVF approximate-nearest-neighbour index over
+    NumPy, a BM25 keyword index and inverted indexes for filtering.
+
+    Vectors are L2-normalized and compared by cosine similarity. Below
+    `exact_threshold` live slides, and for filters that select at most that
+    many, search is exact; above it the vectors are clustered into `nlist`
+    lists (default 2*sqrt(n)) and `nprobe` of them are scanned per query.
+    Searches read without locking; writes are serialized.
+    """
+
+    def __init__(self, path: str = None, dimensions: int = None, nlist: int = None, nprobe: int = 16,
+                 exact_threshold: int = 20000, train_sample: int = 65536, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.dimensions = dimensions
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self.train_sample = train_sample
+        self.k1 = k1
+        self.b = b
+
+        self.count = 0
+        self.ids = []
+        self.metadata = []
+        self._rows = {}
+        self._vectors = np.empty((0, dimensions or 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._slide_numbers = np.zeros(0, dtype=np.float64)
+        self._doc_lengths = np.zeros(0, dtype=np.float32)
+        self._total_length = 0.0
+
+        self._terms = _Postings()
+        self._keywords = {prop: _Postings() for prop in KEYWORD_PROPERTIES}
+
+        # IVF state, replaced as a whole when the index is (re)trained
+        self._ivf = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_count = 0
+
+        self._lock = threading.RLock()
+
+        if path and os.path.exists(os.path.join(path, "state.json")):
+            self.load()
+
+    @property
+    def live_count(self) -> int:
+        return len(self._rows)
+
+    def store_slide(self, slide_data: Dict[str, Any], text_embedding: List[float], image_embedding: List[float] = None):
+        self.add([self._to_data_object(slide_data)], [text_embedding])
+
+    def store_slides(self, slides: Iterable[Tuple[Dict[str, Any], List[float]]], batch_size: int = 100,
+                     **kwargs) -> Dict[str, Any]:
+        """
+        Add slides in chunks of `batch_size`; same result shape as WeaviateClient.store_slides.
+        """
+        stored = 0
+        failed = []
+        chunk = []
+
+        def flush():
+            nonlocal stored
+            data_objects = [data_object for data_object, _ in chunk]
+            try:
+                self.add(data_objects, [vector for _, vector in chunk])
+                stored += len(chunk)
+            except Exception as e:
+                failed.extend({
+                    "id": self._slide_uuid(data_object),
+                    "slide_number": data_object["slideNumber"],
+                    "presentation_id": data_object["presentationId"],
+                    "error": str(e)
+                } for data_object in data_objects)
+            chunk.clear()
+
+        for slide_data, text_embedding in slides:
+            chunk.append((self._to_data_object(slide_data), text_embedding))
+            if len(chunk) >= batch_size:
+                flush()
+        if chunk:
+            flush()
+
+        return {"stored": stored, "failed": failed}
+
+    def add(self, data_objects: List[Dict[str, Any]], vectors) -> List[str]:
+        """
+        Insert or replace slides given their Slide properties and vectors.
+        """
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(data_objects), -1))
+
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = vectors.shape[1]
+                self._vectors = np.empty((0, self.dimensions), dtype=np.float32)
+            if vectors.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dimensional vectors, got {vectors.shape[1]}")
+
+            ids = [self._slide_uuid(data_object) for data_object in data_objects]
+            latest = {slide_id: i for i, slide_id in enumerate(ids)}
+            if len(latest) < len(ids):
+                # The same slide twice in one batch: keep the last copy
+                keep = sorted(latest.values())
+                ids = [ids[i] for i in keep]
+                data_objects = [data_objects[i] for i in keep]
+                vectors = vectors[keep]
+
+            for slide_id in ids:
+                if slide_id in self._rows:
+                    self._delete_row(self._rows[slide_id])
+
+            start = self.count
+            self._reserve(start + len(ids))
+            self._vectors[start:start + len(ids)] = vectors
+
+            for offset, (slide_id, data_object) in enumerate(zip(ids, data_objects)):
+                row = start + offset
+                data_object = {prop: data_object.get(prop) for prop in SLIDE_PROPERTIES}
+                self.ids.append(slide_id)
+                self.metadata.append(data_object)
+                self._index_row(row, data_object)
+                self._rows[slide_id] = row
+
+            if self._ivf is not None:
+                centroids, lists = self._ivf
+                assignments = assign_to_centroids(vectors, centroids)
+                self._assignments[start:start + len(ids)] = assignments
+                for offset, list_id in enumerate(assignments):
+                    lists.add(int(list_id), start + offset)
+
+            self._alive[start:start + len(ids)] = True
+            # Publish the rows last so lock-free readers never see half-written ones
+            self.count = start + len(ids)
+
+            if self.live_count >= self.exact_threshold and (
+                    self._ivf is None or self.live_count >= 4 * self._trained_count):
+                self.train()
+
+        return ids
+
+    def delete_slide(self, slide_id: str) -> bool:
+        with self._lock:
+            row = self._rows.get(slide_id)
+            if row is None:
+                return False
+            self._delete_row(row)
+            return True
+
+    def delete_presentation(self, presentation_id: str) -> int:
+        with self._lock:
+            rows, _ = self._keywords["presentationId"].get(presentation_id)
+            rows = rows[self._alive[rows]]
+            for row in rows:
+                self._delete_row(int(row))
+            return len(rows)
+
+    def iter_slides(self, batch_size: int = 1000) -> Iterable[Tuple[str, Dict[str, Any], List[float]]]:
+        count = self.count
+        for row in np.flatnonzero(self._alive[:count]):
+            yield self.ids[row], self.metadata[row], self._vectors[row]
+
+    def build_where_filter(self, filters: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Every property can be filtered in the index, so nothing is left for local filtering."""
+        where = {key: value for key, value in (filters or {}).items() if not is_empty_filter(value)}
+        return where or None, {}
+
+    def search_by_vector(self, vector: List[float], limit: int = 10,
+                         where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k slides by cosine similarity, restricted to slides matching `where`.
+        """
+        count = self.count
+        if count == 0:
+            return []
+        query = normalize_rows(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        mask = self._filter_mask(where, count)
+        ivf = self._ivf
+
+        if ivf is None or (mask is not None and np.count_nonzero(mask) <= self.exact_threshold):
+            rows = np.flatnonzero(mask if mask is not None else self._alive[:count])
+        else:
+            rows = self._probe(query, ivf, mask, count, limit)
+
+        scores = self._vectors[rows] @ query
+        top = self._top_k(scores, limit)
+        return [self._result(int(rows[i]), distance=float(1.0 - scores[i])) for i in top]
+
+    def search_bm25(self, query: str, limit: int = 10, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k slides by BM25 over content and topics.
+        """
+        count = self.count
+        live = self.live_count
+        if count == 0 or live == 0:
+            return []
+        alive = self._alive[:count]
+        avg_length = max(self._total_length / live, 1e-9)
+        scores = np.zeros(count, dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            rows, tfs = self._terms.get(term)
+            keep = rows < count
+            rows, tfs = rows[keep], tfs[keep]
+            keep = alive[rows]
+            rows, tfs = rows[keep], tfs[keep]
+            if not len(rows):
+                continue
+            idf = math.log(1 + (live - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[rows] / avg_length)
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        mask = self._filter_mask(where, count)
+        if mask is not None:
+            scores[~mask] = 0
+        rows = np.flatnonzero(scores > 0)
+        top = self._top_k(scores[rows], limit)
+        return [self._result(int(rows[i]), score=float(scores[rows[i]])) for i in top]
+
+    def train(self):
+        """
+        Cluster the live vectors with spherical k-means and rebuild the IVF lists.
+        """
+        with self._lock:
+            live_rows = np.flatnonzero(self._alive[:self.count])
+            if not len(live_rows):
+                return
+            nlist = self.nlist or max(1, int(2 * math.sqrt(len(live_rows))))
+            nlist = min(nlist, len(live_rows))
+
+            rng = np.random.default_rng(0)
+            sample = self._vectors[rng.choice(live_rows, min(len(live_rows), max(self.train_sample, nlist)),
+                                              replace=False)]
+            centroids = spherical_kmeans(sample, nlist)
+
+            assignments = assign_to_centroids(self._vectors[:self.count], centroids)
+            self._assignments = np.zeros(len(self._alive), dtype=np.int32)
+            self._assignments[:self.count] = assignments
+            self._ivf = (centroids, _Postings.from_groups(assignments, nlist))
+            self._trained_count = len(live_rows)
+            logger.info("Trained IVF index: %d lists over %d slides", nlist, len(live_rows))
+
+    def save(self, path: str = None):
+        """
+        Write the index to `path` (default: the path it was opened with).
+
+        The arrays go to files named after a fresh version, and state.json,
+        which names that version, is swapped in last with a single rename,
+        so a crash at any point leaves the previous version readable.
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No index path configured")
+
+        with self._lock:
+            if self.count and self.live_count < 0.8 * self.count:
+                self.compact()
+
+            os.makedirs(path, exist_ok=True)
+            arrays = {
+                "alive": self._alive[:self.count],
+                "slide_numbers": self._slide_numbers[:self.count],
+                "doc_lengths": self._doc_lengths[:self.count]
+            }
+            postings = {"terms": self._terms, **{f"keyword_{prop}": self._keywords[prop] for prop in KEYWORD_PROPERTIES}}
+            keys = {}
+            for name, posting in postings.items():
+                keys[name], arrays[f"{name}_offsets"], arrays[f"{name}_rows"], arrays[f"{name}_values"] = posting.to_arrays()
+            if self._ivf is not None:
+                arrays["centroids"] = self._ivf[0]
+                arrays["assignments"] = self._assignments[:self.count]
+
+            previous = self._saved_version(path)
+            version = uuid.uuid4().hex[:12]
+            state = {
+                "version": version,
+                "dimensions": self.dimensions,
+                "trained_count": self._trained_count,
+                "ids": self.ids,
+                "metadata": self.metadata,
+                "keys": keys
+            }
+
+            np.save(os.path.join(path, f"vectors-{version}.npy"), self._vectors[:self.count])
+            np.savez(os.path.join(path, f"arrays-{version}.npz"), **arrays)
+            with open(os.path.join(path, "state.tmp.json"), 'w') as f:
+                json.dump(state, f)
+            os.replace(os.path.join(path, "state.tmp.json"), os.path.join(path, "state.json"))
+
+            # Keep the version just replaced for readers that are still loading it
+            for name in os.listdir(path):
+                match = re.fullmatch(r"(?:vectors|arrays)(?:-(\w+))?\.np[yz]", name)
+                if match and match.group(1) not in (version, previous):
+                    os.remove(os.path.join(path, name))
+
+    @staticmethod
+    def _saved_version(path: str) -> Optional[str]:
+        try:
+            with open(os.path.join(path, "state.json"), 'r') as f:
+                return json.load(f).get("version")
+        except (OSError, ValueError):
+            return None
+
+    def load(self, path: str = None):
+        path = path or self.path
+        with open(os.path.join(path, "state.json"), 'r') as f:
+            state = json.load(f)
+        suffix = f"-{state['version']}" if "version" in state else ""
+        vectors = np.load(os.path.join(path, f"vectors{suffix}.npy"))
+        arrays = np.load(os.path.join(path, f"arrays{suffix}.npz"))
+
+        with self._lock:
+            self.dimensions = state["dimensions"]
+            self.ids = state["ids"]
+            self.metadata = state["metadata"]
+            self.count = len(self.ids)
+            self._vectors = vectors
+            self._alive = arrays["alive"].copy()
+            self._slide_numbers = arrays["slide_numbers"].copy()
+            self._doc_lengths = arrays["doc_lengths"].copy()
+            self._rows = {slide_id: row for row, slide_id in enumerate(self.ids) if self._alive[row]}
+            self._total_length = float(self._doc_lengths[self._alive].sum())
+
+            def postings(name):
+                return _Postings.from_arrays(state["keys"][name], arrays[f"{name}_offsets"],
+                                             arrays[f"{name}_rows"], arrays[f"{name}_values"])
+
+            self._terms = postings("terms")
+            self._keywords = {prop: postings(f"keyword_{prop}") for prop in KEYWORD_PROPERTIES}
+
+            self._ivf = None
+            self._trained_count = state["trained_count"]
+            if "centroids" in arrays:
+                centroids = arrays["centroids"]
+                self._assignments = arrays["assignments"].copy()
+                self._ivf = (centroids, _Postings.from_groups(self._assignments, len(centroids)))
+
+    def compact(self):
+        """
+        Drop deleted rows by rebuilding the index from the live slides.
+        """
+        with self._lock:
+            live_rows = np.flatnonzero(self._alive[:self.count])
+            fresh = LocalVectorIndex(None, self.dimensions, self.nlist, self.nprobe, self.exact_threshold,
+                                     self.train_sample, self.k1, self.b)
+            for start in range(0, len(live_rows), 10000):
+                rows = live_rows[start:start + 10000]
+                fresh.add([self.metadata[row] for row in rows], self._vectors[rows])
+
+            fresh.path = self.path
+            fresh._lock = self._lock
+            self.__dict__.update(fresh.__dict__)
+
+    def _probe(self, query: np.ndarray, ivf, mask: Optional[np.ndarray], count: int, limit: int) -> np.ndarray:
+        """Candidate rows from the nearest lists, probing wider until `limit` candidates pass the filters."""
+        centroids, lists = ivf
+        order = np.argsort(-(centroids @ query))
+        alive = self._alive[:count]
+        nprobe = min(self.nprobe, len(centroids))
+
+        while True:
+            rows = np.concatenate([lists.get(int(list_id))[0] for list_id in order[:nprobe]])
+            rows = rows[rows < count]
+            rows = rows[alive[rows]] if mask is None else rows[mask[rows]]
+            if len(rows) >= limit or nprobe >= len(centroids):
+                return rows
+            nprobe = min(nprobe * 2, len(centroids))
+
+    def _filter_mask(self, where: Optional[Dict[str, Any]], count: int) -> Optional[np.ndarray]:
+        """Boolean mask of live rows matching every filter, or None when there are no filters."""
+        if not where:
+            return None
+        mask = self._alive[:count].copy()
+
+        for key, value in where.items():
+            if is_empty_filter(value):
+                continue
+            if key in self._keywords:
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                matched = np.zeros(count, dtype=bool)
+                for item in values:
+                    rows, _ = self._keywords[key].get(item)
+                    matched[rows[rows < count]] = True
+                mask &= matched
+            elif key == "slideNumber":
+                numbers = self._slide_numbers[:count]
+                if isinstance(value, dict):
+                    ops = {"gt": np.greater, "gte": np.greater_equal, "lt": np.less, "lte": np.less_equal}
+                    for op, bound in value.items():
+                        if op in ops:
+                            mask &= ops[op](numbers, bound)
+                elif isinstance(value, (list, tuple, set)):
+                    mask &= np.isin(numbers, list(value))
+                else:
+                    mask &= numbers == value
+            else:
+                # No index for this property: scan the rows still in play
+                for row in np.flatnonzero(mask):
+                    if not matches_filter(self.metadata[row].get(key), value):
+                        mask[row] = False
+
+        return mask
+
+    def _index_row(self, row: int, data_object: Dict[str, Any]):
+        self._slide_numbers[row] = data_object.get("slideNumber") or 0
+
+        for prop in KEYWORD_PROPERTIES:
+            value = data_object.get(prop)
+            for item in (value if isinstance(value, list) else [value]):
+                if not is_empty_filter(item):
+                    self._keywords[prop].add(item, row)
+
+        tokens = tokenize(data_object.get("content") or "")
+        for topic in data_object.get("topics") or []:
+            tokens.extend(tokenize(topic))
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token, frequency in frequencies.items():
+            self._terms.add(token, row, frequency)
+        self._doc_lengths[row] = len(tokens)
+        self._total_length += len(tokens)
+
+    def _delete_row(self, row: int):
+        self._alive[row] = False
+        self._rows.pop(self.ids[row], None)
+        self._total_length -= float(self._doc_lengths[row])
+
+    def _reserve(self, size: int):
+        """Grow the row arrays geometrically; readers keep using the old arrays until swapped."""
+        capacity = len(self._alive)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+
+        def grow(array, shape):
+            grown = np.zeros(shape, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self._vectors = grow(self._vectors, (capacity, self.dimensions))
+        self._slide_numbers = grow(self._slide_numbers, capacity)
+        self._doc_lengths = grow(self._doc_lengths, capacity)
+        self._assignments = grow(self._assignments, capacity)
+        self._alive = grow(self._alive, capacity)
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the `k` highest scores, best first."""
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind='stable')]
+
+    def _result(self, row: int, **additional) -> Dict[str, Any]:
+        result = dict(self.metadata[row])
+        result["_additional"] = {"id": self.ids[row], **additional}
+        return result
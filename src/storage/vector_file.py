@@ -0,0 +1,213 @@
+from typing import List, Iterable, Optional, Tuple
+import json
+import os
+import struct
+import tempfile
+import numpy as np
+
+MAGIC = b"SLIDEVEC"
+ALIGNMENT = 64
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_vector_file(path: str, items: Iterable[Tuple[str, List[float]]], dtype: str = "int8",
+                      normalize: bool = True, chunk_size: int = 65536) -> int:
+    """
+    Write (slide_id, vector) pairs to a vector file and return the count.
+
+    Layout: magic, header length, JSON header, then 64-byte aligned
+    sections for the vectors, the int8 per-dimension scale and offset, and
+    the newline-separated ids. int8 uses per-dimension min/max scalar
+    quantization. Items are streamed through a float32 scratch file, so the
+    input may be a generator larger than memory.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported dtype {dtype}; expected one of {sorted(DTYPES)}")
+
+    ids = []
+    dimensions = None
+    low = high = None
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.TemporaryFile(dir=directory) as scratch:
+        # Pass 1: raw float32 rows plus per-dimension ranges
+        buffer = []
+
+        def flush():
+            nonlocal low, high
+            block = np.asarray(buffer, dtype=np.float32)
+            if normalize:
+                block /= np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+            low = block.min(axis=0) if low is None else np.minimum(low, block.min(axis=0))
+            high = block.max(axis=0) if high is None else np.maximum(high, block.max(axis=0))
+            scratch.write(block.tobytes())
+            buffer.clear()
+
+        for slide_id, vector in items:
+            vector = np.asarray(vector, dtype=np.float32).ravel()
+            if dimensions is None:
+                dimensions = len(vector)
+            elif len(vector) != dimensions:
+                raise ValueError(f"Expected {dimensions}-dimensional vectors, got {len(vector)} for {slide_id}")
+            if "\n" in slide_id:
+                raise ValueError(f"Slide id contains a newline: {slide_id!r}")
+            ids.append(slide_id)
+            buffer.append(vector)
+            if len(buffer) >= chunk_size:
+                flush()
+        if buffer:
+            flush()
+
+        count = len(ids)
+        dimensions = dimensions or 0
+        if low is None:
+            low = high = np.zeros(dimensions, dtype=np.float32)
+        scale = np.maximum(high - low, 1e-12) / 255.0
+
+        ids_blob = "\n".join(ids).encode("utf-8")
+        header = {"dtype": dtype, "count": count, "dimensions": dimensions, "normalized": normalize}
+        # Offsets depend on the header length, so settle them with a fixed-width placeholder first
+        header_size = len(json.dumps({**header, "data_offset": 10 ** 15, "quant_offset": 10 ** 15,
+                                      "ids_offset": 10 ** 15, "ids_length": 10 ** 15}))
+        header["data_offset"] = _align(16 + header_size)
+        data_size = count * dimensions * np.dtype(DTYPES[dtype]).itemsize
+        header["quant_offset"] = _align(header["data_offset"] + data_size)
+        header["ids_offset"] = _align(header["quant_offset"] + 2 * dimensions * 4)
+        header["ids_length"] = len(ids_blob)
+        encoded = json.dumps(header).ljust(header_size).encode("utf-8")
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+
+            # Pass 2: convert the scratch rows chunk by chunk
+            f.seek(header["data_offset"])
+            scratch.seek(0)
+            row_bytes = dimensions * 4
+            while True:
+                raw = scratch.read(chunk_size * row_bytes) if row_bytes else b""
+                if not raw:
+                    break
+                block = np.frombuffer(raw, dtype=np.float32).reshape(-1, dimensions)
+                if dtype == "int8":
+                    block = np.clip(np.rint((block - low) / scale) - 128, -128, 127)
+                f.write(block.astype(DTYPES[dtype]).tobytes())
+
+            f.seek(header["quant_offset"])
+            f.write(scale.astype(np.float32).tobytes() + low.astype(np.float32).tobytes())
+            f.seek(header["ids_offset"])
+            f.write(ids_blob)
+
+        os.replace(tmp_path, path)
+
+    return count
+
+class VectorFile:
+    """
+    Read-only, memory-mapped view of a vector file.
+
+    The vectors are never copied into process memory: every worker that
+    opens the same file shares its pages through the OS page cache.
+    Scoring dequantizes one chunk of rows at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a slide vector file")
+            header_length = struct.unpack("<Q", f.read(8))[0]
+            self.header = json.loads(f.read(header_length).decode("utf-8"))
+            f.seek(self.header["ids_offset"])
+            ids_blob = f.read(self.header["ids_length"]).decode("utf-8")
+
+        self.dtype = self.header["dtype"]
+        self.count = self.header["count"]
+        self.dimensions = self.header["dimensions"]
+        self.normalized = self.header["normalized"]
+        self.ids = ids_blob.split("\n") if self.count else []
+        self._rows = {slide_id: row for row, slide_id in enumerate(self.ids)}
+
+        self.vectors = np.memmap(path, dtype=DTYPES[self.dtype], mode="r", offset=self.header["data_offset"],
+                                 shape=(self.count, self.dimensions)) if self.count else \
+            np.empty((0, self.dimensions), dtype=DTYPES[self.dtype])
+        quant = np.memmap(path, dtype=np.float32, mode="r", offset=self.header["quant_offset"],
+                          shape=(2, self.dimensions)) if self.dimensions else np.zeros((2, 0), np.float32)
+        self.scale, self.low = np.array(quant[0]), np.array(quant[1])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def row(self, slide_id: str) -> Optional[int]:
+        return self._rows.get(slide_id)
+
+    def get(self, slide_id: str) -> Optional[np.ndarray]:
+        """The (dequantized) float32 vector of one slide, or None."""
+        row = self._rows.get(slide_id)
+        return None if row is None else self.dequantize(self.vectors[row:row + 1])[0]
+
+    def dequantize(self, block: np.ndarray) -> np.ndarray:
+        if self.dtype == "int8":
+            return (block.astype(np.float32) + 128) * self.scale + self.low
+        return np.asarray(block, dtype=np.float32)
+
+    def top_k(self, query, k: int = 10, rows: np.ndarray = None,
+              chunk_size: int = 16384) -> List[Tuple[str, float]]:
+        """
+        The `k` best (slide_id, score) pairs for one query, best first.
+        """
+        return self.top_k_batch(np.asarray(query, dtype=np.float32).reshape(1, -1), k, rows, chunk_size)[0]
+
+    def top_k_batch(self, queries, k: int = 10, rows: np.ndarray = None,
+                    chunk_size: int = 16384) -> List[List[Tuple[str, float]]]:
+        """
+        Score many queries in one pass over the mapped vectors.
+
+        Scores are dot products (cosine similarity when the file is
+        normalized; queries are normalized to match). `rows` restricts the
+        search to a subset of row numbers. For int8 the affine dequantization
+        is folded into the query, so each chunk needs one cast and one
+        matrix product.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dimensions)
+        if self.normalized:
+            queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        if self.dtype == "int8":
+            # q . ((c + 128) * scale + low) == c . (q * scale) + q . (128 * scale + low)
+            weights = queries * self.scale
+            bias = queries @ (128 * self.scale + self.low)
+        else:
+            weights, bias = queries, np.zeros(len(queries), dtype=np.float32)
+
+        total = self.count if rows is None else len(rows)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, total, chunk_size):
+            if rows is None:
+                chunk_rows = np.arange(start, min(start + chunk_size, total))
+                block = self.vectors[start:start + chunk_size]
+            else:
+                chunk_rows = np.asarray(rows[start:start + chunk_size], dtype=np.int64)
+                block = self.vectors[chunk_rows]
+            scores = block.astype(np.float32, copy=False) @ weights.T + bias
+            scores = scores.T
+
+            # Keep a running top-k per query
+            candidates = np.concatenate([best_scores, scores], axis=1)
+            candidate_rows = np.concatenate([best_rows, np.broadcast_to(chunk_rows, scores.shape)], axis=1)
+            if candidates.shape[1] > k:
+                keep = np.argpartition(-candidates, k, axis=1)[:, :k]
+                candidates = np.take_along_axis(candidates, keep, axis=1)
+                candidate_rows = np.take_along_axis(candidate_rows, keep, axis=1)
+            best_scores, best_rows = candidates, candidate_rows
+
+        results = []
+        for scores, rows_ in zip(best_scores, best_rows):
+            order = np.argsort(-scores, kind="stable")
+            results.append([(self.ids[rows_[i]], float(scores[i])) for i in order])
+        return results
@@ -0,0 +1,148 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Iterable, Tuple
+import os
+import uuid
+from src.utils.model_registry import load_config
+
+SLIDE_PROPERTIES = ["slideNumber", "content", "presentationId", "imageUrl", "topics"]
+
+def is_empty_filter(value: Any) -> bool:
+    """Filters with empty values ('', [], {}, None) are ignored."""
+    return value is None or value == "" or value == [] or value == {}
+
+def matches_filter(actual: Any, expected: Any) -> bool:
+    """
+    Evaluate one filter against a property value.
+
+    A dict is a gt/gte/lt/lte range, a list matches any overlapping value,
+    and a scalar matches by equality (or membership for list properties).
+    """
+    if isinstance(expected, dict):
+        if actual is None:
+            return False
+        checks = {
+            "gt": lambda bound: actual > bound,
+            "gte": lambda bound: actual >= bound,
+            "lt": lambda bound: actual < bound,
+            "lte": lambda bound: actual <= bound
+        }
+        return all(checks[op](bound) for op, bound in expected.items() if op in checks)
+    if isinstance(expected, (list, tuple, set)):
+        actual_values = actual if isinstance(actual, (list, tuple, set)) else [actual]
+        return any(value in actual_values for value in expected)
+    if isinstance(actual, (list, tuple, set)):
+        return expected in actual
+    return actual == expected
+
+class VectorStore(ABC):
+    """
+    Interface shared by the slide stores used for ingestion and search.
+
+    Backends must implement the abstract methods; `search_hybrid` is only
+    needed by stores whose `supports_hybrid` is true. Implementations
+    return search results as Slide property dicts with an `_additional`
+    dict holding the object `id` and a `distance` (vector search) or
+    `score` (keyword search).
+    """
+
+    @abstractmethod
+    def store_slide(self, slide_data: Dict[str, Any], text_embedding: List[float], image_embedding: List[float] = None):
+        ...
+
+    @abstractmethod
+    def store_slides(self, slides: Iterable[Tuple[Dict[str, Any], List[float]]], batch_size: int = 100,
+                     **kwargs) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def delete_slide(self, slide_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete_presentation(self, presentation_id: str) -> int:
+        ...
+
+    @abstractmethod
+    def search_by_vector(self, vector: List[float], limit: int = 10,
+                         where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def search_bm25(self, query: str, limit: int = 10, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        ...
+
+    def search_hybrid(self, query: str, vector: List[float], alpha: float = 0.5,
+                      limit: int = 10, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Single-query hybrid search, for stores whose `supports_hybrid` is true."""
+        raise NotImplementedError
+
+    def supports_hybrid(self) -> bool:
+        return False
+
+    def build_where_filter(self, filters: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Split filters into a backend filter and filters to apply locally.
+
+        Returns the backend's filter representation (or None) and the
+        filters it cannot evaluate.
+        """
+        return None, {key: value for key, value in (filters or {}).items() if not is_empty_filter(value)}
+
+    @abstractmethod
+    def iter_slides(self, batch_size: int = 1000) -> Iterable[Tuple[str, Dict[str, Any], List[float]]]:
+        """Yield (slide_id, Slide properties, vector) for every stored slide."""
+
+    def iter_vectors(self, batch_size: int = 1000) -> Iterable[Tuple[str, List[float]]]:
+        """Yield (slide_id, vector) for every stored slide."""
+        for slide_id, _, vector in self.iter_slides(batch_size):
+            yield slide_id, vector
+
+    def export_vectors(self, path: str, dtype: str = "int8") -> int:
+        """
+        Write every slide vector to a memory-mappable vector file (see
+        src/storage/vector_file.py) and return the number written.
+        """
+        from src.storage.vector_file import write_vector_file
+        return write_vector_file(path, self.iter_vectors(), dtype=dtype)
+
+    def save(self):
+        """Persist any in-process state; a no-op for remote stores."""
+
+    def _to_data_object(self, slide_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a slide dict to the Slide class properties."""
+        return {
+            "slideNumber": slide_data["slide_number"],
+            "content": slide_data["text_content"],
+            "presentationId": slide_data["presentation_id"],
+            "imageUrl": slide_data.get("image_url", ""),
+            "topics": slide_data.get("topics", [])
+        }
+
+    def _slide_uuid(self, data_object: Dict[str, Any]) -> str:
+        """Deterministic id so retried objects overwrite instead of duplicating."""
+        # Same scheme as weaviate.util.generate_uuid5(identifier, "Slide")
+        identifier = f"Slide{data_object['presentationId']}:{data_object['slideNumber']}"
+        return str(uuid.uuid5(uuid.NAMESPACE_DNS, identifier))
+
+def vector_store_backend(config_path: str = "config/vector_store_config.json") -> str:
+    """
+    The configured backend name: the `VECTOR_STORE` environment variable
+    ("weaviate" or "local") or else the `backend` setting in the config file.
+    """
+    config = load_config(config_path) if os.path.exists(config_path) else {}
+    return os.getenv("VECTOR_STORE", config.get("backend", "weaviate"))
+
+def create_vector_store(config_path: str = "config/vector_store_config.json") -> VectorStore:
+    """
+    Build the configured vector store (see `vector_store_backend`).
+    """
+    config = load_config(config_path) if os.path.exists(config_path) else {}
+
+    backend = vector_store_backend(config_path)
+    if backend == "local":
+        from src.storage.local_index import LocalVectorIndex
+        return LocalVectorIndex(**config.get("local", {}))
+    if backend == "weaviate":
+        from src.storage.weaviate_client import WeaviateClient
+        return WeaviateClient(**config.get("weaviate", {}))
+    raise ValueError(f"Unknown vector store backend: {backend}")
@@ -1,9 +1,29 @@
 import weaviate
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Iterable, Tuple
+import logging
 import os
+import time
+from src.storage.vector_store import SLIDE_PROPERTIES, VectorStore, is_empty_filter
+from src.utils.model_registry import load_config
 
-class WeaviateClient:
+logger = logging.getLogger(__name__)
+
+# Properties that can be filtered inside Weaviate, with their where-clause value type
+FILTERABLE_PROPERTIES = {
+    "presentationId": "valueString",
+    "imageUrl": "valueString",
+    "slideNumber": "valueNumber",
+    "topics": "valueText"
+}
+
+RANGE_OPERATORS = {
+    "gt": "GreaterThan",
+    "gte": "GreaterThanEqual",
+    "lt": "LessThan",
+    "lte": "LessThanEqual"
+}
+
+class WeaviateClient(VectorStore):
     def __init__(self, url: str = None):
         self.url = url or os.getenv("WEAVIATE_URL", "http://localhost:8080")
         self.client = weaviate.Client(self.url)
@@ -13,10 +33,8 @@ class WeaviateClient:
         """
         Initialize Weaviate schema if it doesn't exist.
         """
-        schema_path = "config/weaviate_schema.json"
-        with open(schema_path, 'r') as f:
-            schema = json.load(f)
-        
+        schema = load_config("config/weaviate_schema.json")
+
         try:
             self.client.schema.create(schema)
         except weaviate.exceptions.UnexpectedStatusCodeException:
@@ -27,20 +45,113 @@ class WeaviateClient:
         """
         Store a slide in Weaviate with its embeddings.
         """
-        data_object = {
-            "slideNumber": slide_data["slide_number"],
-            "content": slide_data["text_content"],
-            "presentationId": slide_data["presentation_id"],
-            "imageUrl": slide_data.get("image_url", ""),
-            "topics": slide_data.get("topics", [])
-        }
-
         self.client.data_object.create(
-            data_object=data_object,
+            data_object=self._to_data_object(slide_data),
             class_name="Slide",
             vector=text_embedding
         )
 
+    def store_slides(self, slides: Iterable[Tuple[Dict[str, Any], List[float]]], batch_size: int = 100,
+                     dynamic: bool = True, max_retries: int = 3, backoff: float = 1.0) -> Dict[str, Any]:
+        """
+        Store many slides using Weaviate batching.
+
+        `slides` may be any iterable (including a generator) of
+        (slide_data, text_embedding) pairs; objects are flushed as the batch
+        fills, so slides can be streamed in without holding a whole deck.
+        Objects that fail are retried with exponential backoff, and those
+        still failing after `max_retries` are reported with their error.
+        """
+        pending = {}
+        failed = {}
+        stored = 0
+
+        def on_results(results):
+            nonlocal stored
+            for result in results or []:
+                uuid = result.get("id")
+                errors = (result.get("result") or {}).get("errors")
+                if errors:
+                    messages = [e.get("message", str(e)) for e in errors.get("error", [])]
+                    failed[uuid] = "; ".join(messages) or str(errors)
+                elif uuid in pending:
+                    pending.pop(uuid)
+                    stored += 1
+
+        self.client.batch.configure(
+            batch_size=batch_size,
+            dynamic=dynamic,
+            timeout_retries=max_retries,
+            callback=on_results
+        )
+
+        with self.client.batch as batch:
+            for slide_data, text_embedding in slides:
+                data_object = self._to_data_object(slide_data)
+                uuid = self._slide_uuid(data_object)
+                pending[uuid] = (data_object, text_embedding)
+                batch.add_data_object(data_object, "Slide", uuid=uuid, vector=text_embedding)
+
+        for attempt in range(max_retries):
+            # Anything still pending without an explicit error was lost with its batch
+            retry = {uuid: pending[uuid] for uuid in pending}
+            if not retry:
+                break
+
+            delay = backoff * (2 ** attempt)
+            logger.warning(f"Retrying {len(retry)} failed slide objects in {delay:.1f}s")
+            time.sleep(delay)
+            failed.clear()
+
+            with self.client.batch as batch:
+                for uuid, (data_object, text_embedding) in retry.items():
+                    batch.add_data_object(data_object, "Slide", uuid=uuid, vector=text_embedding)
+
+        errors = [
+            {"id": uuid, "slide_number": pending[uuid][0]["slideNumber"],
+             "presentation_id": pending[uuid][0]["presentationId"],
+             "error": failed.get(uuid, "object was not acknowledged by the server")}
+            for uuid in pending
+        ]
+
+        return {"stored": stored, "failed": errors}
+
+    def delete_slide(self, slide_id: str) -> bool:
+        """
+        Delete one slide by object id.
+        """
+        try:
+            self.client.data_object.delete(slide_id, class_name="Slide")
+        except weaviate.exceptions.UnexpectedStatusCodeException:
+            return False
+        return True
+
+    def delete_presentation(self, presentation_id: str) -> int:
+        """
+        Delete every slide of a presentation and return how many were removed.
+        """
+        result = self.client.batch.delete_objects(
+            class_name="Slide",
+            where={"path": ["presentationId"], "operator": "Equal", "valueString": presentation_id}
+        )
+        return result["results"]["successful"]
+
+    def iter_slides(self, batch_size: int = 1000) -> Iterable[Tuple[str, Dict[str, Any], List[float]]]:
+        """
+        Page through every Slide object with its vector using the cursor API.
+        """
+        after = None
+        while True:
+            page = self.client.data_object.get(
+                class_name="Slide", with_vector=True, limit=batch_size, after=after
+            )
+            objects = (page or {}).get("objects") or []
+            for obj in objects:
+                yield obj["id"], obj.get("properties", {}), obj["vector"]
+            if len(objects) < batch_size:
+                return
+            after = objects[-1]["id"]
+
     def search_slides(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Search slides using vector similarity.
@@ -53,4 +164,105 @@ class WeaviateClient:
             .do()
         )
 
-        return result["data"]["Get"]["Slide"] 
\ No newline at end of file
+        return result["data"]["Get"]["Slide"]
+
+    def search_by_vector(self, vector: List[float], limit: int = 10,
+                         where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Search slides using a precomputed query vector.
+        """
+        query = (
+            self.client.query
+            .get("Slide", SLIDE_PROPERTIES)
+            .with_near_vector({"vector": [float(x) for x in vector]})
+            .with_additional(["id", "distance"])
+        )
+        return self._run(query, limit, where)
+
+    def search_bm25(self, query: str, limit: int = 10, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Search slides by keyword using Weaviate's BM25 index.
+        """
+        builder = (
+            self.client.query
+            .get("Slide", SLIDE_PROPERTIES)
+            .with_bm25(query=query, properties=["content", "topics"])
+            .with_additional(["id", "score"])
+        )
+        return self._run(builder, limit, where)
+
+    def search_hybrid(self, query: str, vector: List[float], alpha: float = 0.5,
+                      limit: int = 10, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Run vector and BM25 search as one native hybrid query.
+
+        `alpha` weights the vector side (1.0 is pure vector, 0.0 pure BM25).
+        """
+        builder = (
+            self.client.query
+            .get("Slide", SLIDE_PROPERTIES)
+            .with_hybrid(query=query, alpha=alpha, vector=[float(x) for x in vector])
+            .with_additional(["id", "score"])
+        )
+        return self._run(builder, limit, where)
+
+    def _run(self, builder, limit: int, where: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        if where:
+            builder = builder.with_where(where)
+        result = builder.with_limit(limit).do()
+        return result["data"]["Get"]["Slide"]
+
+    def build_where_filter(self, filters: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Translate search filters into a Weaviate where-clause.
+
+        Supports equality on presentationId, imageUrl and slideNumber,
+        ranges on slideNumber (a dict with gt/gte/lt/lte) and contains-any on
+        topics (a list). Empty values are ignored. Returns the where-clause
+        (or None) and the filters that have to be applied locally.
+        """
+        operands = []
+        remaining = {}
+
+        for key, value in (filters or {}).items():
+            if is_empty_filter(value):
+                continue
+
+            value_type = FILTERABLE_PROPERTIES.get(key)
+            if value_type is None:
+                remaining[key] = value
+            elif isinstance(value, dict):
+                if value_type != "valueNumber" or not set(value) <= set(RANGE_OPERATORS):
+                    remaining[key] = value
+                    continue
+                for bound, bound_value in value.items():
+                    operands.append({
+                        "path": [key], "operator": RANGE_OPERATORS[bound], value_type: bound_value
+                    })
+            elif isinstance(value, (list, tuple, set)):
+                # Equal on an array property matches when any element is equal
+                alternatives = [{"path": [key], "operator": "Equal", value_type: item} for item in value]
+                operands.append(alternatives[0] if len(alternatives) == 1
+                                else {"operator": "Or", "operands": alternatives})
+            else:
+                operands.append({"path": [key], "operator": "Equal", value_type: value})
+
+        if not operands:
+            where = None
+        elif len(operands) == 1:
+            where = operands[0]
+        else:
+            where = {"operator": "And", "operands": operands}
+
+        return where, remaining
+
+    def supports_hybrid(self) -> bool:
+        """
+        Whether the server supports native hybrid queries (Weaviate >= 1.17).
+        """
+        try:
+            version = self.client.get_meta().get("version", "0")
+            major, minor = (int(part) for part in version.split(".")[:2])
+        except Exception:
+            return False
+        return (major, minor) >= (1, 17)
@@ -0,0 +1,102 @@
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CONFIG = "config/embedding_config.json"
+VECTOR_STORE_CONFIG = "config/vector_store_config.json"
+
+_config_cache = {}
+_config_lock = threading.Lock()
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Read a JSON config file once per process (again only if it changes).
+
+    Returns a copy, so callers may modify it freely.
+    """
+    key = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    with _config_lock:
+        cached = _config_cache.get(key)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r') as f:
+                cached = (mtime, json.load(f))
+            _config_cache[key] = cached
+    return copy.deepcopy(cached[1])
+
+class ModelRegistry:
+    """
+    Process-wide registry of models and clients.
+
+    Each entry is built by its factory on first `get` and shared by every
+    later caller. Different entries load concurrently; callers asking for
+    an entry that is still loading wait for it instead of loading a copy.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.load_times = {}
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        item = self._items.get(key)
+        if item is not None:
+            return item
+
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            item = self._items.get(key)
+            if item is None:
+                start = time.perf_counter()
+                item = factory()
+                self.load_times[key] = time.perf_counter() - start
+                self._items[key] = item
+                logger.info("Loaded %s in %.2fs", key, self.load_times[key])
+        return item
+
+    def put(self, key: Hashable, item: Any):
+        """Register an already built object (e.g. a test double)."""
+        self._items[key] = item
+
+    def loaded(self) -> List[Hashable]:
+        return list(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._locks.clear()
+            self.load_times.clear()
+
+registry = ModelRegistry()
+
+def get_text_embedder(config_path: str = EMBEDDING_CONFIG):
+    def load():
+        from src.embedding.text_embedder import TextEmbedder
+        return TextEmbedder(config_path)
+    return registry.get(('text_embedder', os.path.abspath(config_path)), load)
+
+def get_image_embedder(config_path: str = EMBEDDING_CONFIG):
+    def load():
+        from src.embedding.image_embedder import ImageEmbedder
+        return ImageEmbedder(config_path)
+    return registry.get(('image_embedder', os.path.abspath(config_path)), load)
+
+def get_topic_tagger(config_path: str = EMBEDDING_CONFIG):
+    def load():
+        from src.embedding.topic_auto_tagger import TopicAutoTagger
+        return TopicAutoTagger(config_path)
+    return registry.get(('topic_tagger', os.path.abspath(config_path)), load)
+
+def get_vector_store(config_path: str = VECTOR_STORE_CONFIG):
+    def load():
+        from src.storage.vector_store import create_vector_store
+        return create_vector_store(config_path)
+    return registry.get(('vector_store', os.path.abspath(config_path), os.getenv("VECTOR_STORE")), load)